@@ -2,6 +2,8 @@
 ASGI config for XIRCLS project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP requests are handled by Django; WebSocket connections are dispatched to
+the plain ASGI apps listed in ``WEBSOCKET_ROUTES``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -13,4 +15,29 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'XIRCLS.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up, since they use settings and the registry.
+from sentiment.streaming import vosk_stream  # noqa: E402
+
+WEBSOCKET_ROUTES = {
+    '/ws/voice-vosk/': vosk_stream,
+}
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        handler = WEBSOCKET_ROUTES.get(scope['path'])
+        if handler is None:
+            await receive()  # websocket.connect
+            await send({'type': 'websocket.close', 'code': 4404})
+            return
+        return await handler(scope, receive, send)
+    return await django_application(scope, receive, send)
+
+
+# Load the models this worker is configured to serve (PRELOAD_MODELS) before
+# the first request instead of on it.
+from XIRCLS.model_registry import preload_configured  # noqa: E402
+
+preload_configured()
@@ -0,0 +1,8 @@
+# XIRCLS/benchmarks/__init__.py
+"""
+Offline benchmarks for the inference paths (sentiment, Vosk, transcription
+and task extraction).
+
+Run them with ``manage.py run_benchmarks``; see ``harness`` for what is
+measured and ``cases`` for the workloads.
+"""
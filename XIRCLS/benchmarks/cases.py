@@ -0,0 +1,254 @@
+# XIRCLS/benchmarks/cases.py
+"""
+Benchmark cases, one per inference path.
+
+Each factory takes ``models`` ("standin" or "real") and a ``scale`` factor
+for the amount of work, and returns a ``Workload``. With "standin", the
+numpy stand-ins from ``standins`` are served through the model registry;
+with "real", the registry loads the configured models from the local cache
+(offline). A case raises ``Skip`` when what it needs isn't available.
+"""
+import importlib.util
+import shutil
+import tempfile
+import wave
+
+import numpy as np
+from django.conf import settings
+
+from XIRCLS import model_registry
+
+from .harness import Skip, Workload
+from .standins import (
+    SAMPLE_RATE,
+    StandInASR,
+    alternating_turns,
+    standin_nlp,
+    standin_sentiment_model,
+    synthetic_speech,
+    synthetic_texts,
+)
+
+# Seconds of audio per transcription call
+CLIP_SECONDS = 60
+# Texts per call in the batched sentiment case
+BATCH_TEXTS = 256
+
+
+def _require(*modules):
+    for module in modules:
+        if importlib.util.find_spec(module) is None:
+            raise Skip(f"{module} is not installed")
+
+
+def _count(base: int, scale: float, minimum: int = 2) -> int:
+    return max(minimum, int(base * scale))
+
+
+def _sentiment_models(models):
+    if models == "standin":
+        return {"sentiment": standin_sentiment_model()}
+    _require("torch", "transformers")
+    return {}
+
+
+def sentiment_single(models, scale):
+    from sentiment.inference import score_texts
+
+    return Workload(
+        lambda text: score_texts([text]),
+        synthetic_texts(_count(200, scale), seed=1),
+        unit="texts",
+        models=_sentiment_models(models),
+    )
+
+
+def sentiment_batched(models, scale):
+    from sentiment.inference import score_texts_bucketed
+
+    batches = [synthetic_texts(BATCH_TEXTS, seed=seed) for seed in range(_count(10, scale))]
+    return Workload(
+        lambda texts: score_texts_bucketed(texts, settings.SENTIMENT_MAX_BATCH_SIZE),
+        batches,
+        items_per_call=BATCH_TEXTS,
+        unit="texts",
+        models=_sentiment_models(models),
+    )
+
+
+def sentiment_timeline(models, scale):
+    """
+    The per-speaker timeline of an hour-long transcript (scaled), with an
+    empty result cache per call that the scores never leave.
+    """
+    from sentiment.inference import result_cache
+    from sentiment.timeline import sentiment_timeline as build
+
+    turns = alternating_turns(max(60, 3600 * scale), turn_seconds=6.0)
+    texts = synthetic_texts(len(turns), seed=3)
+    transcript = [
+        {"speaker": speaker, "start": start, "end": end, "text": text}
+        for (speaker, start, end), text in zip(turns, texts)
+    ]
+
+    def run(segments):
+        # Stand-in scores must not reach the shared cache production reads
+        with result_cache.isolated():
+            return build(segments)
+
+    return Workload(
+        run,
+        [transcript] * 3,
+        items_per_call=len(transcript),
+        unit="segments",
+        models=_sentiment_models(models),
+    )
+
+
+def vosk_recognition(models, scale):
+    """Vosk over 16 kHz PCM, frame by frame as in ``recognize_chunks`` (decoding excluded)."""
+    if models == "standin":
+        raise Skip("Vosk has no stand-in; use --models real with vosk_model/ in place")
+    _require("vosk")
+    from vosk import KaldiRecognizer
+
+    from sentiment.audio import FRAME_BYTES
+
+    try:
+        model = model_registry.get("vosk")
+    except Exception as e:
+        raise Skip(f"Vosk model could not be loaded: {e}")
+
+    def recognize(pcm):
+        rec = KaldiRecognizer(model, SAMPLE_RATE)
+        for start in range(0, len(pcm), FRAME_BYTES):
+            rec.AcceptWaveform(pcm[start:start + FRAME_BYTES])
+        return rec.FinalResult()
+
+    seconds = 10
+    clips = [
+        (synthetic_speech(seconds, seed=seed) * 32767).astype(np.int16).tobytes()
+        for seed in range(_count(5, scale))
+    ]
+    return Workload(recognize, clips, items_per_call=seconds, unit="audio_s")
+
+
+def _clips(scale):
+    return [synthetic_speech(CLIP_SECONDS, seed=seed) for seed in range(_count(4, scale))]
+
+
+def _asr_models(models):
+    if models == "standin":
+        return {"asr": StandInASR()}
+    _require("torch", "transformers")
+    return {}
+
+
+def transcription_decode(models, scale):
+    """Decoding a long WAV to the memory-mapped waveform; peak RSS should stay flat."""
+    if shutil.which("ffmpeg") is None:
+        raise Skip("ffmpeg is not installed")
+    from transcription.transcribe_with_speaker_labels_hf import decode_audio
+
+    seconds = _count(600, scale, minimum=10)
+    # Removed once the workload, which holds it through ``decode``, is collected
+    recording = tempfile.NamedTemporaryFile(suffix=".wav")
+    with wave.open(recording, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        for minute in range(0, seconds, 60):
+            clip = synthetic_speech(min(60, seconds - minute), seed=minute)
+            wav.writeframes((clip * 32767).astype(np.int16).tobytes())
+    recording.flush()
+
+    def decode(path, _recording=recording):
+        # Touch every sample, as diarization does
+        return float(np.abs(decode_audio(path)).max())
+
+    return Workload(decode, [recording.name] * 3, items_per_call=seconds, unit="audio_s")
+
+
+def transcription_segments(models, scale):
+    """Whisper per diarized turn ("segments" mode), turns given."""
+    from transcription.transcribe_with_speaker_labels_hf import ASR_BATCH_SIZE, transcribe_turns
+
+    turns = alternating_turns(CLIP_SECONDS)
+    return Workload(
+        lambda waveform: transcribe_turns(waveform, turns, ASR_BATCH_SIZE),
+        _clips(scale),
+        items_per_call=CLIP_SECONDS,
+        unit="audio_s",
+        models=_asr_models(models),
+    )
+
+
+def transcription_words(models, scale):
+    """Single Whisper pass with word timestamps aligned to turns ("words" mode)."""
+    from transcription.transcribe_with_speaker_labels_hf import ASR_BATCH_SIZE, transcribe_words
+
+    turns = alternating_turns(CLIP_SECONDS)
+    return Workload(
+        lambda waveform: transcribe_words(waveform, turns, ASR_BATCH_SIZE),
+        _clips(scale),
+        items_per_call=CLIP_SECONDS,
+        unit="audio_s",
+        models=_asr_models(models),
+    )
+
+
+def transcription_pipeline(models, scale):
+    """The whole pipeline (diarization + ASR) on an in-memory waveform."""
+    if models == "standin":
+        raise Skip("Pyannote has no stand-in; use --models real")
+    _require("torch", "transformers", "pyannote.audio")
+    from transcription.transcribe_with_speaker_labels_hf import transcribe_with_speaker_labels
+
+    return Workload(
+        lambda waveform: transcribe_with_speaker_labels(waveform=waveform),
+        _clips(scale),
+        items_per_call=CLIP_SECONDS,
+        unit="audio_s",
+    )
+
+
+def task_extraction(models, scale):
+    """Action items from an hour-long transcript (scaled), turn by turn."""
+    _require("spacy")
+    from outlook_integration.benchmark_task_extraction import (
+        REFERENCE_SEGMENTS,
+        build_full_text,
+        long_transcript,
+    )
+    from outlook_integration.task_extraction import SPACY_MODEL, extract_tasks
+
+    if models == "standin":
+        nlp = {"spacy": standin_nlp()}
+    else:
+        import spacy.util
+
+        if not spacy.util.is_package(SPACY_MODEL):
+            raise Skip(f"{SPACY_MODEL} is not installed")
+        nlp = {}
+
+    turns = build_full_text(long_transcript(REFERENCE_SEGMENTS, max(1, int(60 * scale)))).splitlines()
+    return Workload(
+        lambda lines: extract_tasks(lines, n_process=1),
+        [turns] * 3,
+        items_per_call=len(turns),
+        unit="turns",
+        models=nlp,
+    )
+
+
+CASES = {
+    "sentiment.single": sentiment_single,
+    "sentiment.batched": sentiment_batched,
+    "sentiment.timeline": sentiment_timeline,
+    "vosk.recognition": vosk_recognition,
+    "transcription.decode": transcription_decode,
+    "transcription.segments": transcription_segments,
+    "transcription.words": transcription_words,
+    "transcription.pipeline": transcription_pipeline,
+    "tasks.extract": task_extraction,
+}
@@ -0,0 +1,199 @@
+# XIRCLS/benchmarks/harness.py
+"""
+Timing, memory and comparison for the benchmark cases.
+
+Each case builds a ``Workload``: a function and the inputs to call it with.
+Every call is timed separately (after warm-up calls), giving p50/p95/p99
+latency and throughput in items per second. Peak RSS is the process's
+high-water mark while the case ran: on Linux it is reset before each case
+through /proc/self/clear_refs, elsewhere it is the process-wide maximum.
+
+Results are plain JSON so that runs can be saved and compared:
+``compare(baseline, current)`` lists every metric that got worse by more
+than the threshold.
+"""
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import ExitStack
+
+from XIRCLS import model_registry
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class Skip(Exception):
+    """Raised by a case whose models or tools aren't available here."""
+
+
+class Workload:
+    """
+    ``run`` is called once per item of ``inputs``; each call processes
+    ``items_per_call`` ``unit``s (e.g. texts in a batch, seconds of audio)
+    for the throughput. ``models`` maps registry names to stand-in models
+    served while the workload runs.
+    """
+
+    def __init__(self, run, inputs, items_per_call=1, unit="calls", warmup=1, models=None):
+        self.run = run
+        self.inputs = list(inputs)
+        self.items_per_call = items_per_call
+        self.unit = unit
+        self.warmup = warmup
+        self.models = models or {}
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of ``values`` (0–100)."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _reset_peak_rss() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    """High-water resident set size of this process, in MB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(workload: Workload) -> dict:
+    """
+    Time every call of ``workload`` and return its statistics. Warm-up
+    calls (which also load real models on first use) aren't timed.
+    """
+    with ExitStack() as stack:
+        for name, model in workload.models.items():
+            stack.enter_context(model_registry.override(name, model))
+
+        for item in workload.inputs[:workload.warmup]:
+            workload.run(item)
+
+        per_case_peak = _reset_peak_rss()
+        latencies = []
+        start = time.perf_counter()
+        for item in workload.inputs:
+            call_start = time.perf_counter()
+            workload.run(item)
+            latencies.append(time.perf_counter() - call_start)
+        total = time.perf_counter() - start
+
+    items = len(workload.inputs) * workload.items_per_call
+    return {
+        "calls": len(latencies),
+        "items": items,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": total / max(len(latencies), 1) * 1000,
+        "throughput": items / total if total else 0.0,
+        "unit": workload.unit,
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_scope": "case" if per_case_peak else "process",
+    }
+
+
+def run(cases: dict, names, models: str, scale: float = 1.0, log=None) -> dict:
+    """
+    Build and measure each of ``names`` from ``cases`` (name → factory
+    taking ``models`` and ``scale``). Cases raising ``Skip`` are listed
+    with the reason instead.
+    """
+    # Real models must come from the local cache; never download
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+    report = {
+        "meta": {
+            "models": models,
+            "scale": scale,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": {},
+        "skipped": {},
+    }
+    for name in names:
+        try:
+            workload = cases[name](models, scale)
+            report["results"][name] = measure(workload)
+        except Skip as e:
+            report["skipped"][name] = str(e)
+        if log is not None:
+            log(name, report["results"].get(name), report["skipped"].get(name))
+    return report
+
+
+# Metric → True if higher is better
+COMPARED_METRICS = {
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "throughput": True,
+    "peak_rss_mb": False,
+}
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2) -> list[dict]:
+    """
+    Return the metrics of cases present in both reports that got worse by
+    more than ``threshold`` (a fraction, 0.2 = 20 %).
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions.append({
+                    "case": name,
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "change": change,
+                })
+    return regressions
+
+
+def save(report: dict, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,175 @@
+# XIRCLS/benchmarks/standins.py
+"""
+Tiny stand-in models and synthetic fixtures for running the benchmarks
+offline, with nothing downloaded.
+
+The stand-ins implement just the interface the project code calls, and do
+work that scales with the input the way the real models do (tokens, batch
+size, audio length), so the code around the models (batching, bucketing,
+slicing, alignment) is measured realistically. They are numpy-only and say
+nothing about the real models' speed: use ``--models real`` for that.
+"""
+import zlib
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+# Words used to build synthetic texts and stand-in transcripts
+VOCABULARY = (
+    "the meeting budget report send schedule review team we should need to "
+    "customer launch update great terrible okay thanks plan follow up next "
+    "week friday design vendor contract confirm timeline"
+).split()
+
+
+def synthetic_texts(count: int, seed: int = 0, min_words: int = 3, max_words: int = 60) -> list[str]:
+    """``count`` reproducible texts of varying length."""
+    rng = np.random.default_rng(seed)
+    return [
+        " ".join(rng.choice(VOCABULARY, size=rng.integers(min_words, max_words + 1)))
+        for _ in range(count)
+    ]
+
+
+def synthetic_speech(seconds: float, seed: int = 0) -> np.ndarray:
+    """
+    A reproducible 16 kHz mono float32 signal that alternates voiced bursts
+    (harmonics with a wandering pitch) and short pauses, like speech.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 120 + 40 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    # ~4 syllables per second, with a pause every couple of seconds
+    envelope = np.clip(np.sin(2 * np.pi * 2 * t), 0, None) * (np.sin(2 * np.pi * 0.2 * t) > -0.6)
+    noise = rng.normal(0, 0.01, size=t.shape)
+    return (0.3 * voiced * envelope + noise).astype(np.float32)
+
+
+def alternating_turns(seconds: float, turn_seconds: float = 4.0, speakers: int = 2) -> list[tuple]:
+    """(speaker, start, end) turns of ``turn_seconds`` taking turns between speakers."""
+    turns = []
+    start, index = 0.0, 0
+    while start < seconds:
+        end = min(start + turn_seconds, seconds)
+        turns.append((f"SPEAKER_{index % speakers:02d}", start, end))
+        start, index = end, index + 1
+    return turns
+
+
+def _token_id(word: str, vocab_size: int) -> int:
+    return zlib.crc32(word.encode()) % (vocab_size - 3) + 3
+
+
+class StandInTokenizer:
+    """
+    Whitespace tokenizer with the Hugging Face call and ``pad`` signatures
+    used by sentiment.inference. Returns numpy arrays for ``return_tensors``.
+    """
+
+    pad_id, bos_id, eos_id = 1, 0, 2
+
+    def __init__(self, vocab_size: int = 8192):
+        self.vocab_size = vocab_size
+
+    def _encode(self, text, max_length):
+        ids = [self.bos_id] + [_token_id(w, self.vocab_size) for w in text.split()] + [self.eos_id]
+        return ids[:max_length]
+
+    def __call__(self, texts, padding=False, truncation=True, max_length=512, return_tensors=None, **kwargs):
+        single = isinstance(texts, str)
+        ids = [self._encode(text, max_length) for text in ([texts] if single else texts)]
+        encoded = {"input_ids": ids, "attention_mask": [[1] * len(row) for row in ids]}
+        if padding or return_tensors:
+            encoded = self.pad(encoded, return_tensors=return_tensors)
+        return encoded
+
+    def pad(self, encoded, return_tensors=None):
+        rows = encoded["input_ids"]
+        width = max((len(row) for row in rows), default=0)
+        input_ids = np.full((len(rows), width), self.pad_id, dtype=np.int64)
+        attention_mask = np.zeros((len(rows), width), dtype=np.int64)
+        for i, row in enumerate(rows):
+            input_ids[i, :len(row)] = row
+            attention_mask[i, :len(row)] = 1
+        return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+
+class StandInSentimentBackend:
+    """
+    Embedding lookup, a few dense layers over every (padded) position and
+    masked mean pooling into 3 logits. Cost grows with batch × sequence
+    length, like the transformer it stands in for.
+    """
+
+    def __init__(self, vocab_size: int = 8192, hidden: int = 128, layers: int = 2, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.embeddings = rng.normal(0, 0.1, size=(vocab_size, hidden)).astype(np.float32)
+        self.layers = [rng.normal(0, 0.1, size=(hidden, hidden)).astype(np.float32) for _ in range(layers)]
+        self.head = rng.normal(0, 0.1, size=(hidden, 3)).astype(np.float32)
+
+    def logits(self, encoded) -> np.ndarray:
+        ids = np.asarray(encoded["input_ids"])
+        mask = np.asarray(encoded["attention_mask"], dtype=np.float32)[..., None]
+        hidden = self.embeddings[ids]
+        for weights in self.layers:
+            hidden = np.tanh(hidden @ weights)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1.0)
+        return pooled @ self.head
+
+
+def standin_sentiment_model():
+    """(tokenizer, backend) in the shape ``model_registry.get("sentiment")`` returns."""
+    return StandInTokenizer(), StandInSentimentBackend()
+
+
+class StandInASR:
+    """
+    Callable like the Hugging Face ASR pipeline: takes one or a list of
+    ``{"raw", "sampling_rate"}`` dicts. Runs a framed FFT over the audio
+    (cost proportional to its length) and emits one word per voiced 0.5 s.
+    """
+
+    frame = 400  # 25 ms
+    word_seconds = 0.5
+
+    def _words(self, audio):
+        usable = len(audio) - len(audio) % self.frame
+        frames = audio[:usable].reshape(-1, self.frame)
+        energy = np.abs(np.fft.rfft(frames, axis=1)).sum(axis=1)
+        per_word = int(self.word_seconds * SAMPLE_RATE / self.frame)
+        words = []
+        for index in range(0, len(energy), per_word):
+            block = energy[index:index + per_word]
+            if block.size and block.mean() > 1.0:
+                word = VOCABULARY[int(block.mean()) % len(VOCABULARY)]
+                start = index * self.frame / SAMPLE_RATE
+                words.append((start, start + self.word_seconds, " " + word))
+        return words
+
+    def _result(self, item, return_timestamps):
+        words = self._words(np.asarray(item["raw"]))
+        result = {"text": "".join(text for _, _, text in words)}
+        if return_timestamps == "word":
+            result["chunks"] = [{"text": text, "timestamp": (start, end)} for start, end, text in words]
+        return result
+
+    def __call__(self, inputs, batch_size=None, return_timestamps=None, **kwargs):
+        if isinstance(inputs, dict):
+            return self._result(inputs, return_timestamps)
+        return [self._result(item, return_timestamps) for item in inputs]
+
+
+def standin_nlp():
+    """
+    spaCy's blank English pipeline with a rule-based sentencizer: no
+    download needed, but spaCy itself must be installed. Without a tagger,
+    only the trigger patterns flag tasks.
+    """
+    import spacy
+
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    return nlp
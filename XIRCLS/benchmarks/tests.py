@@ -0,0 +1,72 @@
+# XIRCLS/benchmarks/tests.py
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from XIRCLS import model_registry
+
+from . import harness
+from .cases import CASES
+from .standins import standin_sentiment_model, synthetic_texts
+
+
+class HarnessTest(SimpleTestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(harness.percentile(values, 50), 50.5)
+        self.assertAlmostEqual(harness.percentile(values, 99), 99.01)
+        self.assertEqual(harness.percentile([3.0], 95), 3.0)
+
+    def test_compare_reports_only_regressions(self):
+        baseline = {"results": {"a": {"p50_ms": 10.0, "throughput": 100.0}}}
+        current = {"results": {
+            "a": {"p50_ms": 13.0, "throughput": 150.0},
+            "new": {"p50_ms": 1.0},
+        }}
+        regressions = harness.compare(baseline, current, threshold=0.2)
+        self.assertEqual([(r["case"], r["metric"]) for r in regressions], [("a", "p50_ms")])
+
+    def test_standin_run(self):
+        report = harness.run(CASES, ["sentiment.single", "sentiment.batched", "vosk.recognition"], "standin", scale=0.05)
+        for name in ("sentiment.single", "sentiment.batched"):
+            result = report["results"][name]
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+            self.assertGreater(result["throughput"], 0)
+        self.assertIn("vosk.recognition", report["skipped"])
+        # Stand-ins are only served while their case runs
+        self.assertFalse(model_registry.is_loaded("sentiment"))
+
+    def test_standin_scores_stay_out_of_the_result_cache(self):
+        from sentiment.inference import result_cache
+
+        report = harness.run(CASES, ["sentiment.timeline"], "standin", scale=0.02)
+        self.assertIn("sentiment.timeline", report["results"])
+        self.assertIsNone(result_cache.get(synthetic_texts(1, seed=3)[0]))
+
+    def test_override_restores_previous_model(self):
+        standin = standin_sentiment_model()
+        with model_registry.override("sentiment", standin):
+            self.assertIs(model_registry.get("sentiment"), standin)
+        self.assertFalse(model_registry.is_loaded("sentiment"))
+
+
+class RunBenchmarksCommandTest(SimpleTestCase):
+    def test_output_and_compare(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.json")
+            call_command("run_benchmarks", "sentiment.single", "--scale", "0.05", "--output", path, stdout=StringIO())
+            report = harness.load(path)
+            self.assertEqual(list(report["results"]), ["sentiment.single"])
+
+            # A baseline that was much faster is a regression
+            report["results"]["sentiment.single"]["p50_ms"] /= 100
+            harness.save(report, path)
+            with self.assertRaises(CommandError):
+                call_command("run_benchmarks", "sentiment.single", "--scale", "0.05", "--compare", path, stdout=StringIO())
+
+    def test_unknown_case(self):
+        with self.assertRaises(CommandError):
+            call_command("run_benchmarks", "nope", stdout=StringIO())
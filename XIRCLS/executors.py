@@ -0,0 +1,90 @@
+# XIRCLS/executors.py
+"""
+Thread pools for the blocking calls made by async views.
+
+An async view must not block the event loop, so model inference and network
+calls are handed to a thread pool and awaited. Each kind of work gets its own
+pool (``EXECUTOR_WORKERS``): a burst of Vosk uploads then can't use up the
+threads that sentiment requests or Graph calls need, and the size of the
+inference pools caps how many model calls run at once, however many
+connections are open. At most ``EXECUTOR_MAX_PENDING`` calls per pool may be
+running or queued; beyond that ``ExecutorBusy`` is raised (views answer 503)
+rather than letting the backlog grow without bound.
+
+    scores = await executors.run("sentiment", score_many, texts)
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+
+class ExecutorBusy(Exception):
+    """Raised when a pool already has EXECUTOR_MAX_PENDING calls."""
+
+
+class BoundedExecutor:
+    """A lazily started thread pool that refuses work beyond ``max_pending`` calls."""
+
+    def __init__(self, name, workers, max_pending):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_pending = max(max_pending, self.workers)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix=f"executor-{self.name}"
+                )
+            return self._executor
+
+    async def run(self, fn, *args, **kwargs):
+        """Run ``fn(*args, **kwargs)`` on this pool and await its result."""
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorBusy(f"{self.max_pending} {self.name} calls already pending.")
+        try:
+            future = self._get_executor().submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._slots.release()
+            raise
+        # Released when the call ends, not when the caller stops waiting (a
+        # client disconnect cancels the await but not the running thread)
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get(name) -> BoundedExecutor:
+    """The pool for ``name`` (a key of ``EXECUTOR_WORKERS``), created on first use."""
+    try:
+        return _executors[name]
+    except KeyError:
+        pass
+    if name not in settings.EXECUTOR_WORKERS:
+        raise KeyError(f"Unknown executor '{name}'. Known executors: {', '.join(settings.EXECUTOR_WORKERS)}")
+    with _executors_lock:
+        if name not in _executors:
+            _executors[name] = BoundedExecutor(
+                name, settings.EXECUTOR_WORKERS[name], settings.EXECUTOR_MAX_PENDING
+            )
+    return _executors[name]
+
+
+async def run(name, fn, *args, **kwargs):
+    """Run ``fn(*args, **kwargs)`` on the ``name`` pool and await its result."""
+    return await get(name).run(fn, *args, **kwargs)
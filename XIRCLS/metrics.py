@@ -0,0 +1,328 @@
+# XIRCLS/metrics.py
+"""
+Lightweight counters and histograms, exposed in the Prometheus text format
+on ``/metrics``.
+
+Each process keeps its metrics in memory and, when ``METRICS_DIR`` is set,
+writes them to its own JSON file there every ``METRICS_FLUSH_SECONDS`` (and
+at exit). ``/metrics`` sums the files of all processes, so the numbers
+cover every web worker, the transcription worker and the Vosk pool
+processes, not just the one that answered the scrape. Files are named by
+pid plus a random token, so a restarted process never overwrites the
+totals of an earlier one; clear the directory on deploy to reset.
+
+Stage timings go through ``stage(pipeline, name)``:
+
+    with metrics.stage("transcription", "diarization"):
+        ...
+"""
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.core.signals import setting_changed
+
+# Seconds; wide enough for a 12-minute diarization
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800,
+)
+
+
+def _settings(name, default):
+    from django.conf import settings
+
+    # The benchmark scripts import instrumented modules without Django set up
+    if not settings.configured:
+        return default
+    return getattr(settings, name, default)
+
+
+class Registry:
+    """The metrics of one process, plus reading the files of all of them."""
+
+    def __init__(self, directory=None, token=None):
+        # None: read METRICS_DIR on first use
+        self._default_directory = directory
+        self._directory = directory
+        self.token = token or f"{os.getpid()}_{uuid.uuid4().hex[:8]}"
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self._dirty = False
+        self._flusher = None
+        self._flush_at_exit_registered = False
+
+    @property
+    def directory(self):
+        if self._directory is None:
+            self._directory = _settings("METRICS_DIR", "") or ""
+        return self._directory
+
+    def reset_directory(self):
+        """
+        Read METRICS_DIR again on next use (e.g. after override_settings).
+        The running flusher stops; the next update starts one for the new
+        directory.
+        """
+        with self.lock:
+            self._directory = self._default_directory
+            self._flusher = None
+
+    def register(self, metric):
+        with self.lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self.metrics[metric.name] = metric
+        metric.registry = self
+        return metric
+
+    def changed(self):
+        """Called (under ``lock``) after every update."""
+        self._dirty = True
+        if self._flusher is None and self.directory:
+            self._flusher = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+            self._flusher.start()
+            if not self._flush_at_exit_registered:
+                atexit.register(self._flush_at_exit)
+                self._flush_at_exit_registered = True
+
+    def _flush_loop(self):
+        interval = _settings("METRICS_FLUSH_SECONDS", 5)
+        while True:
+            time.sleep(interval)
+            if self._flusher is not threading.current_thread():
+                return  # replaced by reset_directory()
+            self.flush()
+
+    def _flush_at_exit(self):
+        if self._flusher is not None:
+            self.flush()
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            self._dirty = False
+            return {name: metric.dump() for name, metric in self.metrics.items()}
+
+    def flush(self):
+        """Write this process's metrics to its file in ``directory``."""
+        if not self.directory or not self._dirty:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"metrics_{self.token}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def collect(self) -> dict:
+        """This process's metrics merged with every other process's file."""
+        if not self.directory:
+            return self.snapshot()
+        self._dirty = True
+        self.flush()
+        merged = {}
+        for filename in sorted(os.listdir(self.directory)):
+            if not (filename.startswith("metrics_") and filename.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename), encoding="utf-8") as f:
+                    dumped = json.load(f)
+            except (OSError, ValueError):
+                continue  # being written or removed
+            for name, data in dumped.items():
+                _merge(merged, name, data)
+        return merged
+
+
+def _merge(merged, name, data):
+    target = merged.setdefault(name, {**data, "samples": {}})
+    for key, value in data["samples"].items():
+        current = target["samples"].get(key)
+        if current is None:
+            target["samples"][key] = value
+        elif data["type"] == "counter":
+            target["samples"][key] = current + value
+        else:
+            target["samples"][key] = {
+                "buckets": [a + b for a, b in zip(current["buckets"], value["buckets"])],
+                "sum": current["sum"] + value["sum"],
+                "count": current["count"] + value["count"],
+            }
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.samples = {}
+        self.registry = None
+
+    def _key(self, labels) -> str:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        # JSON keys must be strings; the label values are kept in order
+        return json.dumps([str(labels[name]) for name in self.labelnames])
+
+    def dump(self) -> dict:
+        return {
+            "type": self.type,
+            "help": self.help,
+            "labelnames": list(self.labelnames),
+            "samples": dict(self.samples),
+        }
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.samples[key] = self.samples.get(key, 0.0) + amount
+            self.registry.changed()
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            sample = self.samples.get(key)
+            if sample is None:
+                sample = self.samples[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    sample["buckets"][i] += 1
+                    break
+            sample["sum"] += value
+            sample["count"] += 1
+            self.registry.changed()
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def dump(self) -> dict:
+        data = super().dump()
+        data["samples"] = {
+            key: {"buckets": list(s["buckets"]), "sum": s["sum"], "count": s["count"]}
+            for key, s in self.samples.items()
+        }
+        data["bucket_bounds"] = list(self.buckets)
+        return data
+
+
+registry = Registry()
+
+
+def _metrics_dir_changed(setting, **kwargs):
+    if setting == "METRICS_DIR":
+        registry.reset_directory()
+
+
+setting_changed.connect(_metrics_dir_changed)
+
+
+def counter(name, help_text, labelnames=()) -> Counter:
+    return registry.register(Counter(name, help_text, labelnames))
+
+
+def histogram(name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return registry.register(Histogram(name, help_text, labelnames, buckets))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Project metrics
+# ─────────────────────────────────────────────────────────────────────────────
+
+STAGE_SECONDS = histogram(
+    "xircls_stage_duration_seconds",
+    "Time spent in each stage of an inference pipeline.",
+    ["pipeline", "stage"],
+)
+STAGE_ERRORS = counter(
+    "xircls_stage_errors_total",
+    "Inference stages that raised an exception.",
+    ["pipeline", "stage"],
+)
+REQUEST_SECONDS = histogram(
+    "xircls_http_request_duration_seconds",
+    "HTTP request latency by view.",
+    ["method", "view", "status"],
+)
+SENTIMENT_TEXTS = counter(
+    "xircls_sentiment_texts_total",
+    "Texts run through the sentiment model.",
+)
+
+
+@contextmanager
+def stage(pipeline: str, name: str):
+    """Time a pipeline stage, counting it as an error if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(pipeline=pipeline, stage=name)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, pipeline=pipeline, stage=name)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Text exposition format
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{value}"' for name, value in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render(collected: dict = None) -> str:
+    """The Prometheus text format (version 0.0.4) for ``collected`` metrics."""
+    collected = registry.collect() if collected is None else collected
+    lines = []
+    for name in sorted(collected):
+        data = collected[name]
+        lines.append(f"# HELP {name} {data['help']}")
+        lines.append(f"# TYPE {name} {data['type']}")
+        for key in sorted(data["samples"]):
+            values = json.loads(key)
+            sample = data["samples"][key]
+            if data["type"] == "counter":
+                lines.append(f"{name}{_labels(data['labelnames'], values)} {_number(sample)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(data["bucket_bounds"], sample["buckets"]):
+                cumulative += count
+                le = (("le", _number(bound)),)
+                lines.append(f"{name}_bucket{_labels(data['labelnames'], values, le)} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(data['labelnames'], values, (('le', '+Inf'),))} {sample['count']}")
+            lines.append(f"{name}_sum{_labels(data['labelnames'], values)} {_number(sample['sum'])}")
+            lines.append(f"{name}_count{_labels(data['labelnames'], values)} {sample['count']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,176 @@
+# XIRCLS/middleware.py
+import cProfile
+import logging
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.crypto import constant_time_compare
+
+from . import metrics, profiling
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """
+    Record every request's latency in ``xircls_http_request_duration_seconds``,
+    labelled by URL name (or route pattern, to keep the label set bounded),
+    method and status code. For streaming responses this is the time until
+    the response starts.
+
+    Works both sync and async, so under ASGI it doesn't push the async views
+    onto a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self._observe(request, response, start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self._observe(request, response, start)
+        return response
+
+    def _observe(self, request, response, start):
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name or match.route) if match else "unmatched"
+        metrics.REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            view=view,
+            status=response.status_code,
+        )
+
+
+class ProfilingMiddleware:
+    """
+    Profile a request with cProfile when it carries an ``X-Profile`` header
+    (from a staff user, or equal to ``PROFILING_TOKEN`` for API clients), or
+    at random for ``PROFILING_SAMPLE_RATE`` of requests. The profile is saved
+    through ``XIRCLS.profiling`` and its id returned in ``X-Profile-Id``.
+
+    Unprofiled requests only pay for a header lookup (and a random number when
+    sampling), and an empty ``PROFILING_DIR`` removes the middleware. Only one
+    request per process is profiled at a time; for streaming responses the
+    profile ends when the response starts.
+
+    Async requests (under ASGI) are profiled too, but cProfile only sees the
+    event loop's thread: work awaited on ``XIRCLS.executors`` pools shows up
+    as time spent waiting, not as the calls made in the pool, and whatever
+    other requests run on the loop meanwhile is included.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_DIR:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.token = settings.PROFILING_TOKEN
+        self.active = threading.Lock()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _header_trigger(self, request):
+        """"token" for a matching token, "user" if the header needs a staff user, else None."""
+        header = request.META.get("HTTP_X_PROFILE")
+        if header is None:
+            return None
+        if self.token and constant_time_compare(header, self.token):
+            return "token"
+        return "user"
+
+    def _sampled(self):
+        return "sample" if self.sample_rate and random.random() < self.sample_rate else None
+
+    def _trigger(self, request):
+        trigger = self._header_trigger(request)
+        if trigger == "user":
+            user = getattr(request, "user", None)
+            trigger = "header" if user is not None and user.is_staff else None
+        return trigger or self._sampled()
+
+    async def _atrigger(self, request):
+        trigger = self._header_trigger(request)
+        if trigger == "user":
+            # request.user would hit the database from the event loop
+            user = await request.auser() if hasattr(request, "auser") else None
+            trigger = "header" if user is not None and user.is_staff else None
+        return trigger or self._sampled()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        trigger = self._trigger(request)
+        if trigger is None or not self.active.acquire(blocking=False):
+            return self.get_response(request)
+
+        try:
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            duration = time.perf_counter() - start
+        finally:
+            self.active.release()
+
+        self._save(request, response, profiler, duration, trigger, getattr(request, "user", None))
+        return response
+
+    async def __acall__(self, request):
+        trigger = await self._atrigger(request)
+        if trigger is None or not self.active.acquire(blocking=False):
+            return await self.get_response(request)
+
+        try:
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = await self.get_response(request)
+            finally:
+                profiler.disable()
+            duration = time.perf_counter() - start
+        finally:
+            self.active.release()
+
+        user = await request.auser() if hasattr(request, "auser") else None
+        await sync_to_async(self._save)(request, response, profiler, duration, trigger, user)
+        return response
+
+    def _save(self, request, response, profiler, duration, trigger, user):
+        match = getattr(request, "resolver_match", None)
+        try:
+            response["X-Profile-Id"] = profiling.save(profiler, {
+                "method": request.method,
+                "path": request.path,
+                "view": (match.view_name or match.route) if match else "",
+                "status": response.status_code,
+                "duration_ms": round(duration * 1000, 1),
+                "trigger": trigger,
+                "user": user.get_username() if user is not None and user.is_authenticated else "",
+            })
+        except OSError:
+            logger.exception("Could not save the profile of %s %s", request.method, request.path)
@@ -0,0 +1,101 @@
+# XIRCLS/model_registry.py
+"""
+Central registry of the heavy ML models used by the project.
+
+Nothing is loaded at import time: each model is built by its loader the first
+time ``get(name)`` is called and then reused for the life of the process.
+Loading is guarded by a per-model lock, so concurrent first requests load a
+model only once and requests for other models are not blocked meanwhile.
+
+Worker processes can warm a subset of models at boot through the
+``PRELOAD_MODELS`` setting (see ``preload_configured``), or ahead of time
+with ``manage.py warmup_models``.
+"""
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+# Model name -> dotted path of a zero-argument loader returning the model
+LOADERS = {
+    "sentiment": "sentiment.inference.load_sentiment_model",
+    "vosk": "sentiment.recognition.load_vosk_model",
+    "diarization": "transcription.transcribe_with_speaker_labels_hf.load_diarizer",
+    "asr": "transcription.transcribe_with_speaker_labels_hf.load_asr",
+    "spacy": "outlook_integration.task_extraction.load_nlp",
+}
+
+_models = {}
+_MISSING = object()
+_locks = {name: threading.Lock() for name in LOADERS}
+
+
+def _loader(name):
+    if name not in LOADERS:
+        raise KeyError(f"Unknown model '{name}'. Known models: {', '.join(LOADERS)}")
+    module_path, func_name = LOADERS[name].rsplit(".", 1)
+    return getattr(importlib.import_module(module_path), func_name)
+
+
+def get(name):
+    """Return the model registered as ``name``, loading it on first use."""
+    try:
+        return _models[name]
+    except KeyError:
+        pass
+    loader = _loader(name)
+    with _locks[name]:
+        if name not in _models:
+            _models[name] = loader()
+    return _models[name]
+
+
+def is_loaded(name) -> bool:
+    return name in _models
+
+
+@contextmanager
+def override(name, model):
+    """
+    Serve ``model`` as ``name`` inside the ``with`` block, then restore
+    whatever was registered before (e.g. the benchmarks' stand-in models).
+    """
+    _loader(name)
+    with _locks[name]:
+        previous = _models.get(name, _MISSING)
+        _models[name] = model
+    try:
+        yield model
+    finally:
+        with _locks[name]:
+            if previous is _MISSING:
+                _models.pop(name, None)
+            else:
+                _models[name] = previous
+
+
+def resolve(names) -> list[str]:
+    """Expand ``"all"`` and validate a list of model names."""
+    names = [name.strip() for name in names if name.strip()]
+    if "all" in names:
+        return list(LOADERS)
+    for name in names:
+        _loader(name)
+    return names
+
+
+def preload(names) -> dict:
+    """Load each of ``names`` now and return how long each one took, in seconds."""
+    timings = {}
+    for name in resolve(names):
+        start = time.perf_counter()
+        get(name)
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def preload_configured() -> dict:
+    """Preload the models listed in ``settings.PRELOAD_MODELS`` for this worker."""
+    return preload(getattr(settings, "PRELOAD_MODELS", []))
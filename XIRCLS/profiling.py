@@ -0,0 +1,100 @@
+# XIRCLS/profiling.py
+"""
+On-disk store of request profiles taken by ``ProfilingMiddleware``.
+
+Each profile is a cProfile stats file (``<id>.prof``, readable with
+``pstats`` or as a flame graph with e.g. ``snakeviz``) plus a small JSON
+file describing the request. Only the newest ``PROFILING_MAX_FILES``
+profiles younger than ``PROFILING_MAX_AGE_DAYS`` are kept; older ones are
+removed whenever a profile is saved.
+"""
+import io
+import json
+import os
+import pstats
+import re
+import time
+import uuid
+
+from django.conf import settings
+
+# Profile ids are generated by ``save``; anything else is never opened
+PROFILE_ID = re.compile(r"^\d{8}-\d{6}-[0-9a-f]{8}$")
+
+
+def directory() -> str:
+    return settings.PROFILING_DIR
+
+
+def _path(profile_id: str, extension: str) -> str:
+    if not PROFILE_ID.match(profile_id):
+        raise FileNotFoundError(profile_id)
+    return os.path.join(directory(), f"{profile_id}.{extension}")
+
+
+def save(profiler, info: dict) -> str:
+    """Write ``profiler``'s stats and the request ``info``; returns the profile id."""
+    os.makedirs(directory(), exist_ok=True)
+    profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    profiler.dump_stats(_path(profile_id, "prof"))
+    with open(_path(profile_id, "json"), "w", encoding="utf-8") as f:
+        json.dump({**info, "id": profile_id, "created_at": time.time()}, f)
+    enforce_retention()
+    return profile_id
+
+
+def list_profiles() -> list[dict]:
+    """The stored profiles' request info, newest first."""
+    if not os.path.isdir(directory()):
+        return []
+    profiles = []
+    for filename in os.listdir(directory()):
+        profile_id, extension = os.path.splitext(filename)
+        if extension != ".json" or not PROFILE_ID.match(profile_id):
+            continue
+        try:
+            with open(os.path.join(directory(), filename), encoding="utf-8") as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue  # being written or removed
+    profiles.sort(key=lambda p: p.get("created_at", 0), reverse=True)
+    return profiles
+
+
+def get(profile_id: str) -> dict:
+    with open(_path(profile_id, "json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def stats_path(profile_id: str) -> str:
+    path = _path(profile_id, "prof")
+    if not os.path.exists(path):
+        raise FileNotFoundError(profile_id)
+    return path
+
+
+def summary(profile_id: str, sort: str = "cumulative", limit: int = 40) -> str:
+    """The ``limit`` most expensive functions of a profile, as pstats prints them."""
+    out = io.StringIO()
+    stats = pstats.Stats(stats_path(profile_id), stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+def delete(profile_id: str):
+    for extension in ("prof", "json"):
+        try:
+            os.remove(_path(profile_id, extension))
+        except FileNotFoundError:
+            pass
+
+
+def enforce_retention() -> int:
+    """Remove profiles beyond the count and age limits; returns how many."""
+    cutoff = time.time() - settings.PROFILING_MAX_AGE_DAYS * 86400
+    removed = 0
+    for i, profile in enumerate(list_profiles()):
+        if i >= settings.PROFILING_MAX_FILES or profile.get("created_at", 0) < cutoff:
+            delete(profile["id"])
+            removed += 1
+    return removed
@@ -9,7 +9,7 @@ https://docs.djangoproject.com/en/5.1/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
-from decouple import config
+from decouple import config, Csv
 import os
 from pathlib import Path
 
@@ -45,11 +45,13 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'XIRCLS.middleware.MetricsMiddleware',  # first, so it times the whole stack
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'XIRCLS.middleware.ProfilingMiddleware',  # after auth, to check for staff
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -59,7 +61,7 @@ ROOT_URLCONF = 'XIRCLS.urls'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
+        'DIRS': [BASE_DIR / 'XIRCLS' / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -82,6 +84,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Web and transcription worker processes write to the same file
+        'OPTIONS': {'timeout': 20},
     }
 }
 
@@ -117,6 +121,31 @@ USE_I18N = True
 USE_TZ = True
 
 
+# Uploads
+# Voice uploads are kept in memory up to this size (instead of Django's
+# 2.5 MB default) so they can be piped to ffmpeg without touching the disk.
+
+FILE_UPLOAD_MAX_MEMORY_SIZE = config('FILE_UPLOAD_MAX_MEMORY_SIZE', default=25 * 1024 * 1024, cast=int)
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Shared between worker processes on the same host
+    'sentiment': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('SENTIMENT_CACHE_DIR', default=str(BASE_DIR / '.cache' / 'sentiment')),
+        # Seconds; entries from a retired model eventually go away
+        'TIMEOUT': config('SENTIMENT_CACHE_SHARED_TIMEOUT', default=7 * 24 * 3600, cast=int),
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.1/howto/static-files/
 
@@ -126,3 +155,130 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Model registry
+# Models are loaded on first use (see XIRCLS/model_registry.py). List the ones
+# a worker should load at boot, e.g. PRELOAD_MODELS=sentiment,vosk for API-only
+# workers, or "all". `manage.py warmup_models` loads them on demand.
+
+PRELOAD_MODELS = config('PRELOAD_MODELS', default='', cast=Csv())
+
+
+# Sentiment inference
+# Concurrent /api/sentiment/ requests are grouped into one forward pass of up
+# to SENTIMENT_MAX_BATCH_SIZE texts, waiting at most SENTIMENT_MAX_WAIT_MS for
+# the batch to fill up.
+
+SENTIMENT_MAX_BATCH_SIZE = config('SENTIMENT_MAX_BATCH_SIZE', default=32, cast=int)
+SENTIMENT_MAX_WAIT_MS = config('SENTIMENT_MAX_WAIT_MS', default=10, cast=int)
+SENTIMENT_BULK_MAX_TEXTS = config('SENTIMENT_BULK_MAX_TEXTS', default=1000, cast=int)
+
+# Long-text mode ("long_text": true) splits the input into windows of
+# SENTIMENT_LONG_WINDOW_TOKENS overlapping by SENTIMENT_LONG_STRIDE_TOKENS and
+# scores at most SENTIMENT_LONG_MAX_WINDOWS of them.
+SENTIMENT_LONG_WINDOW_TOKENS = config('SENTIMENT_LONG_WINDOW_TOKENS', default=512, cast=int)
+SENTIMENT_LONG_STRIDE_TOKENS = config('SENTIMENT_LONG_STRIDE_TOKENS', default=128, cast=int)
+SENTIMENT_LONG_MAX_WINDOWS = config('SENTIMENT_LONG_MAX_WINDOWS', default=16, cast=int)
+
+# Transcribed meetings get a per-speaker sentiment timeline, averaged over
+# windows of SENTIMENT_TIMELINE_WINDOW_SECONDS.
+SENTIMENT_TIMELINE_WINDOW_SECONDS = config('SENTIMENT_TIMELINE_WINDOW_SECONDS', default=60, cast=float)
+
+# Sentiment inference backend: "torch" (eager), "torch-int8" (dynamic int8
+# quantization) or "onnx" (onnxruntime). The ONNX graph is exported to
+# SENTIMENT_ONNX_PATH on first load; SENTIMENT_ONNX_THREADS=0 lets onnxruntime
+# choose. Check a backend against eager torch with
+# `manage.py check_sentiment_backend <backend>`.
+
+SENTIMENT_BACKEND = config('SENTIMENT_BACKEND', default='torch')
+SENTIMENT_ONNX_PATH = config('SENTIMENT_ONNX_PATH', default=str(BASE_DIR / '.cache' / 'onnx' / 'twitter-roberta-base-sentiment.onnx'))
+SENTIMENT_ONNX_THREADS = config('SENTIMENT_ONNX_THREADS', default=0, cast=int)
+SENTIMENT_PARITY_TOLERANCE = config('SENTIMENT_PARITY_TOLERANCE', default=0.01, cast=float)
+
+
+# Sentiment result cache
+# Per-process LRU bounded by entry count and approximate bytes, with an
+# optional TTL in seconds (0 disables expiry). Misses fall through to the
+# Django cache named by SENTIMENT_CACHE_SHARED_BACKEND (empty to disable).
+
+SENTIMENT_CACHE_MAX_ENTRIES = config('SENTIMENT_CACHE_MAX_ENTRIES', default=10000, cast=int)
+SENTIMENT_CACHE_MAX_BYTES = config('SENTIMENT_CACHE_MAX_BYTES', default=16 * 1024 * 1024, cast=int)
+SENTIMENT_CACHE_TTL = config('SENTIMENT_CACHE_TTL', default=0, cast=int)
+SENTIMENT_CACHE_SHARED_BACKEND = config('SENTIMENT_CACHE_SHARED_BACKEND', default='sentiment')
+
+# Vosk worker pool
+# With VOSK_POOL_WORKERS > 0, voice uploads are recognized on that many worker
+# processes (each loads vosk_model/ once). At most VOSK_POOL_MAX_PENDING jobs
+# may be running or queued (503 beyond that) and each waits at most
+# VOSK_POOL_TIMEOUT seconds (504). 0 recognizes in the web process.
+
+VOSK_POOL_WORKERS = config('VOSK_POOL_WORKERS', default=0, cast=int)
+VOSK_POOL_MAX_PENDING = config('VOSK_POOL_MAX_PENDING', default=16, cast=int)
+VOSK_POOL_TIMEOUT = config('VOSK_POOL_TIMEOUT', default=120, cast=float)
+
+# Async views
+# The async endpoints (/api/async/..., /outlook/async/...) await blocking work
+# on one thread pool per kind: EXECUTOR_WORKERS threads for sentiment
+# inference, Vosk uploads, live recognition on /ws/voice-vosk/, and
+# network/disk I/O (Graph calls, the shared sentiment cache). At most
+# EXECUTOR_MAX_PENDING calls per pool may be running or queued (503, or a 1013
+# WebSocket close, beyond that). Serve them with an ASGI server, e.g.
+# `uvicorn XIRCLS.asgi:application`.
+
+EXECUTOR_WORKERS = {
+    'sentiment': config('EXECUTOR_SENTIMENT_WORKERS', default=2, cast=int),
+    'vosk': config('EXECUTOR_VOSK_WORKERS', default=2, cast=int),
+    'vosk_stream': config('EXECUTOR_VOSK_STREAM_WORKERS', default=4, cast=int),
+    'io': config('EXECUTOR_IO_WORKERS', default=16, cast=int),
+}
+EXECUTOR_MAX_PENDING = config('EXECUTOR_MAX_PENDING', default=256, cast=int)
+
+# Transcription jobs
+# Meeting transcription runs in `manage.py run_transcription_worker`, not in
+# the request. Jobs stuck in "running" without progress for
+# TRANSCRIPTION_JOB_STALE_SECONDS are re-queued when a worker starts.
+
+TRANSCRIPTION_WORKER_CONCURRENCY = config('TRANSCRIPTION_WORKER_CONCURRENCY', default=1, cast=int)
+TRANSCRIPTION_WORKER_POLL_SECONDS = config('TRANSCRIPTION_WORKER_POLL_SECONDS', default=2, cast=float)
+TRANSCRIPTION_JOB_STALE_SECONDS = config('TRANSCRIPTION_JOB_STALE_SECONDS', default=3600, cast=int)
+
+# Finished transcripts are stored per recording version (item id + eTag +
+# size + model versions); the least recently viewed are evicted beyond this
+# many bytes of stored segments and tasks.
+
+TRANSCRIPT_CACHE_MAX_BYTES = config('TRANSCRIPT_CACHE_MAX_BYTES', default=200 * 1024 * 1024, cast=int)
+
+# Outlook dashboard
+# Calendar events are cached, and the local index of OneDrive recordings is
+# delta-synced, at most once per OUTLOOK_DASHBOARD_CACHE_TTL seconds per
+# account; the dashboard's Refresh link does both again.
+
+OUTLOOK_DASHBOARD_CACHE_TTL = config('OUTLOOK_DASHBOARD_CACHE_TTL', default=300, cast=int)
+OUTLOOK_RECORDINGS_PAGE_SIZE = config('OUTLOOK_RECORDINGS_PAGE_SIZE', default=25, cast=int)
+
+# Metrics
+# Counters and histograms for requests and inference stages, served on
+# /metrics to METRICS_ALLOWED_IPS (empty allows anyone). Each process writes
+# its metrics to METRICS_DIR every METRICS_FLUSH_SECONDS so the endpoint can
+# sum all workers; an empty METRICS_DIR keeps them per process.
+
+METRICS_DIR = config('METRICS_DIR', default=str(BASE_DIR / '.cache' / 'metrics'))
+METRICS_FLUSH_SECONDS = config('METRICS_FLUSH_SECONDS', default=5, cast=float)
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='127.0.0.1,::1', cast=Csv())
+
+# Keeps the test run's metrics out of METRICS_DIR
+TEST_RUNNER = 'XIRCLS.test_runner.TestRunner'
+
+# Request profiling
+# Requests with an X-Profile header from a staff user (or equal to
+# PROFILING_TOKEN), plus PROFILING_SAMPLE_RATE of all requests, are profiled
+# with cProfile. Profiles are kept in PROFILING_DIR, at most PROFILING_MAX_FILES
+# of them for PROFILING_MAX_AGE_DAYS, and listed at /admin/profiles/. An empty
+# PROFILING_DIR turns profiling off.
+
+PROFILING_DIR = config('PROFILING_DIR', default=str(BASE_DIR / '.cache' / 'profiles'))
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+PROFILING_TOKEN = config('PROFILING_TOKEN', default='')
+PROFILING_MAX_FILES = config('PROFILING_MAX_FILES', default=200, cast=int)
+PROFILING_MAX_AGE_DAYS = config('PROFILING_MAX_AGE_DAYS', default=7, cast=float)
@@ -0,0 +1,22 @@
+# XIRCLS/test_runner.py
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Runs the tests with an empty METRICS_DIR, so the metrics recorded by the
+    test run stay in the test process instead of being written next to the
+    real ones, where /metrics would add them to the production counters.
+    Tests that need metric files point METRICS_DIR at a temporary directory.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._metrics_override = override_settings(METRICS_DIR="")
+        self._metrics_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._metrics_override.disable()
+        super().teardown_test_environment(**kwargs)
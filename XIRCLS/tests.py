@@ -0,0 +1,164 @@
+# XIRCLS/tests.py
+import asyncio
+import os
+import tempfile
+import threading
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from . import executors, metrics, profiling
+
+
+class TemporaryMetricsDirMixin:
+    """Point the global registry at a temporary METRICS_DIR for each test."""
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.metrics_dir = tmp.name
+        # The registry re-reads METRICS_DIR when the setting changes
+        self.enterContext(override_settings(METRICS_DIR=self.metrics_dir))
+
+
+class MetricsTest(TemporaryMetricsDirMixin, SimpleTestCase):
+    def _registry(self, directory, token):
+        registry = metrics.Registry(directory, token)
+        return (
+            registry,
+            registry.register(metrics.Counter("jobs_total", "Jobs.", ["kind"])),
+            registry.register(metrics.Histogram("stage_seconds", "Stages.", ["stage"], buckets=(0.1, 1))),
+        )
+
+    def test_collect_sums_every_process(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            web, web_jobs, web_stages = self._registry(tmp, "web")
+            worker, worker_jobs, worker_stages = self._registry(tmp, "worker")
+            web_jobs.inc(kind="a")
+            worker_jobs.inc(2, kind="a")
+            worker_jobs.inc(kind="b")
+            web_stages.observe(0.05, stage="asr")
+            worker_stages.observe(0.5, stage="asr")
+            worker_stages.observe(5, stage="asr")
+            worker.flush()
+
+            collected = web.collect()
+
+        self.assertEqual(collected["jobs_total"]["samples"], {'["a"]': 3.0, '["b"]': 1.0})
+        asr = collected["stage_seconds"]["samples"]['["asr"]']
+        self.assertEqual(asr["buckets"], [1, 1])
+        self.assertEqual(asr["count"], 3)
+        self.assertAlmostEqual(asr["sum"], 5.55)
+
+    def test_render(self):
+        registry, jobs, stages = self._registry(None, "local")
+        registry._directory = ""
+        jobs.inc(kind='say "hi"')
+        stages.observe(0.5, stage="asr")
+        stages.observe(5, stage="asr")
+
+        text = metrics.render(registry.collect())
+
+        self.assertIn("# TYPE jobs_total counter", text)
+        self.assertIn('jobs_total{kind="say \\"hi\\""} 1', text)
+        self.assertIn("# TYPE stage_seconds histogram", text)
+        self.assertIn('stage_seconds_bucket{stage="asr",le="0.1"} 0', text)
+        self.assertIn('stage_seconds_bucket{stage="asr",le="1"} 1', text)
+        self.assertIn('stage_seconds_bucket{stage="asr",le="+Inf"} 2', text)
+        self.assertIn('stage_seconds_sum{stage="asr"} 5.5', text)
+        self.assertIn('stage_seconds_count{stage="asr"} 2', text)
+
+    def test_stage_counts_errors(self):
+        labels = {"pipeline": "test", "stage": "boom"}
+        key = metrics.STAGE_SECONDS._key(labels)
+        before = metrics.STAGE_ERRORS.samples.get(key, 0)
+        with self.assertRaises(RuntimeError):
+            with metrics.stage("test", "boom"):
+                raise RuntimeError
+        self.assertEqual(metrics.STAGE_ERRORS.samples[key], before + 1)
+        self.assertGreaterEqual(metrics.STAGE_SECONDS.samples[key]["count"], 1)
+        self.assertEqual(metrics.registry.directory, self.metrics_dir)
+
+
+@override_settings(METRICS_ALLOWED_IPS=["127.0.0.1"])
+class MetricsViewTest(TemporaryMetricsDirMixin, SimpleTestCase):
+    def test_scrape(self):
+        self.client.get(reverse("metrics"))
+        response = self.client.get(reverse("metrics"))
+        # The scrape wrote this process's file to the temporary directory only
+        self.assertEqual(len(os.listdir(self.metrics_dir)), 1)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        # The first scrape went through the middleware
+        self.assertIn('xircls_http_request_duration_seconds_count{method="GET",view="metrics",status="200"}',
+                      response.content.decode())
+
+    def test_other_addresses_are_refused(self):
+        response = self.client.get(reverse("metrics"), REMOTE_ADDR="10.0.0.5")
+        self.assertEqual(response.status_code, 403)
+
+
+class ProfilingTest(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.settings_override = override_settings(PROFILING_DIR=tmp.name, PROFILING_TOKEN="s3cret")
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.staff = get_user_model().objects.create_user("admin", password="pw", is_staff=True)
+
+    def test_header_from_staff_or_with_token(self):
+        response = self.client.get(reverse("metrics"), HTTP_X_PROFILE="1")
+        self.assertNotIn("X-Profile-Id", response)
+
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("metrics"), HTTP_X_PROFILE="1")
+        profile = profiling.get(response["X-Profile-Id"])
+        self.assertEqual((profile["view"], profile["status"], profile["user"]), ("metrics", 200, "admin"))
+        self.assertIn("metrics_view", profiling.summary(profile["id"]))
+
+        self.client.logout()
+        response = self.client.get(reverse("metrics"), HTTP_X_PROFILE="s3cret")
+        self.assertEqual(profiling.get(response["X-Profile-Id"])["trigger"], "token")
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_MAX_FILES=2)
+    def test_sampling_and_retention(self):
+        ids = [self.client.get(reverse("metrics"))["X-Profile-Id"] for _ in range(3)]
+        self.assertEqual(sorted(p["id"] for p in profiling.list_profiles()), sorted(ids[1:]))
+        self.assertFalse(os.path.exists(os.path.join(profiling.directory(), f"{ids[0]}.prof")))
+
+    def test_admin_views(self):
+        self.client.force_login(self.staff)
+        profile_id = self.client.get(reverse("metrics"), HTTP_X_PROFILE="1")["X-Profile-Id"]
+
+        response = self.client.get(reverse("profile_list"))
+        self.assertContains(response, reverse("profile_detail", args=[profile_id]))
+        self.assertContains(self.client.get(reverse("profile_detail", args=[profile_id])), "metrics_view")
+        response = self.client.get(reverse("profile_download", args=[profile_id]))
+        self.assertEqual(response["Content-Disposition"], f'attachment; filename="{profile_id}.prof"')
+        self.assertEqual(self.client.get(reverse("profile_download", args=["..settings"])).status_code, 404)
+
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse("profile_list")).status_code, 302)
+
+
+class BoundedExecutorTest(SimpleTestCase):
+    async def test_refuses_work_beyond_max_pending(self):
+        pool = executors.BoundedExecutor("test", workers=1, max_pending=2)
+        self.addCleanup(pool.shutdown)
+        release = threading.Event()
+        running = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with self.assertRaises(executors.ExecutorBusy):
+            await pool.run(lambda: None)
+
+        release.set()
+        self.assertEqual(await asyncio.gather(*running), [True, True])
+        # Slots are freed as calls finish
+        self.assertEqual(await pool.run(lambda x, y=0: x + y, 1, y=2), 3)
+
+    def test_unknown_pool(self):
+        with self.assertRaises(KeyError):
+            executors.get("gpu")
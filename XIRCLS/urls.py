@@ -2,14 +2,31 @@
 
 from django.contrib import admin
 from django.urls import path, include  # <-- include added
-from sentiment.api_views import SentimentAnalysisAPIView
+from sentiment.api_views import (
+    SentimentAnalysisAPIView,
+    SentimentBatchAPIView,
+    SentimentCacheStatsAPIView,
+)
 from sentiment.voice_api_views import VoiceVoskAPIView
+from sentiment import async_views
 from sentiment.views import voice_vosk_view
+from XIRCLS.views import metrics_view, profile_detail, profile_download, profile_list
 
 urlpatterns = [
+    # Before admin.site.urls, which would otherwise catch these
+    path('admin/profiles/', profile_list, name='profile_list'),
+    path('admin/profiles/<str:profile_id>/', profile_detail, name='profile_detail'),
+    path('admin/profiles/<str:profile_id>/download/', profile_download, name='profile_download'),
     path('admin/', admin.site.urls),
     path('api/sentiment/', SentimentAnalysisAPIView.as_view(), name='api_sentiment'),
+    path('api/sentiment/batch/', SentimentBatchAPIView.as_view(), name='api_sentiment_batch'),
+    path('api/sentiment/cache/', SentimentCacheStatsAPIView.as_view(), name='api_sentiment_cache'),
     path('api/voice-vosk/', VoiceVoskAPIView.as_view(), name='api_voice_vosk'),
+    # Async versions of the above, for ASGI servers
+    path('api/async/sentiment/', async_views.sentiment_analysis, name='api_async_sentiment'),
+    path('api/async/sentiment/batch/', async_views.sentiment_batch, name='api_async_sentiment_batch'),
+    path('api/async/voice-vosk/', async_views.voice_vosk, name='api_async_voice_vosk'),
     path('voice/', voice_vosk_view, name='voice_vosk'),
     path('outlook/', include('outlook_integration.urls')),  # [NEW] Outlook integration endpoints
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -0,0 +1,62 @@
+# XIRCLS/views.py
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
+from django.shortcuts import render
+
+from . import metrics, profiling
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint: the metrics of all processes in text format.
+    Only served to METRICS_ALLOWED_IPS (empty to allow anyone).
+    """
+    allowed = settings.METRICS_ALLOWED_IPS
+    if allowed and request.META.get("REMOTE_ADDR") not in allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@staff_member_required
+def profile_list(request):
+    """Stored request profiles, newest first."""
+    context = {
+        **admin.site.each_context(request),
+        "title": "Request profiles",
+        "profiles": profiling.list_profiles(),
+        "sample_rate": settings.PROFILING_SAMPLE_RATE,
+    }
+    return render(request, "profiling/profile_list.html", context)
+
+
+@staff_member_required
+def profile_detail(request, profile_id):
+    """A profile's request info and its most expensive functions."""
+    sort = request.GET.get("sort", "cumulative")
+    if sort not in ("cumulative", "tottime", "ncalls"):
+        sort = "cumulative"
+    try:
+        profile = profiling.get(profile_id)
+        summary = profiling.summary(profile_id, sort)
+    except (OSError, ValueError):
+        raise Http404("Profile not found")
+    context = {
+        **admin.site.each_context(request),
+        "title": f"Profile of {profile['method']} {profile['path']}",
+        "profile": profile,
+        "summary": summary,
+        "sort": sort,
+    }
+    return render(request, "profiling/profile_detail.html", context)
+
+
+@staff_member_required
+def profile_download(request, profile_id):
+    """The raw cProfile stats, e.g. for ``snakeviz`` or ``python -m pstats``."""
+    try:
+        path = profiling.stats_path(profile_id)
+    except FileNotFoundError:
+        raise Http404("Profile not found")
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=f"{profile_id}.prof")
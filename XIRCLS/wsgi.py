@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'XIRCLS.settings')
 
 application = get_wsgi_application()
+
+# Load the models this worker is configured to serve (PRELOAD_MODELS) before
+# the first request instead of on it.
+from XIRCLS.model_registry import preload_configured  # noqa: E402
+
+preload_configured()
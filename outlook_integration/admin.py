@@ -0,0 +1,29 @@
+# outlook_integration/admin.py
+
+from django.contrib import admin
+
+from .models import CachedTranscript, DeltaSyncState, Recording, TranscriptionJob
+
+
+@admin.register(TranscriptionJob)
+class TranscriptionJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "recording_name", "item_id", "status", "stage", "progress", "created_at")
+    list_filter = ("status",)
+    search_fields = ("recording_name", "item_id")
+
+
+@admin.register(CachedTranscript)
+class CachedTranscriptAdmin(admin.ModelAdmin):
+    list_display = ("recording_name", "item_id", "size", "model_version", "size_bytes", "last_accessed_at")
+    search_fields = ("recording_name", "item_id")
+
+
+@admin.register(Recording)
+class RecordingAdmin(admin.ModelAdmin):
+    list_display = ("name", "item_id", "size", "last_modified", "synced_at")
+    search_fields = ("name", "item_id")
+
+
+@admin.register(DeltaSyncState)
+class DeltaSyncStateAdmin(admin.ModelAdmin):
+    list_display = ("folder_path", "folder_id", "last_synced_at")
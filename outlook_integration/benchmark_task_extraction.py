@@ -0,0 +1,144 @@
+# outlook_integration/benchmark_task_extraction.py
+"""
+Compare the batched task extractor with the original single-document one.
+
+The original ran the full spaCy pipeline over the whole joined transcript
+and checked five regexes per sentence; it is kept here as the reference.
+Both are run on REFERENCE_SEGMENTS and on an hour-long transcript built
+from them (or on segments saved from a transcription job), their outputs
+are compared, and the batched extractor is timed with each process count.
+
+Usage (from the repository root):
+
+    python -m outlook_integration.benchmark_task_extraction [--minutes 60] [--processes 1 2 4]
+        [--segments job_segments.json] [--json out.json]
+"""
+import argparse
+import itertools
+import json
+import re
+import time
+
+from XIRCLS import model_registry
+from outlook_integration.task_extraction import SPACY_MODEL, extract_tasks
+
+# Speaker turns covering each trigger, imperatives, and non-tasks
+REFERENCE_SEGMENTS = [
+    {"speaker": "SPEAKER_00", "text": "Good morning everyone. Let's get started with the budget review."},
+    {"speaker": "SPEAKER_01", "text": "Thanks. I looked at the numbers yesterday and they mostly line up."},
+    {"speaker": "SPEAKER_00", "text": "Send the updated budget report to finance by Friday."},
+    {"speaker": "SPEAKER_02", "text": "We need to confirm the vendor contract before the end of the month."},
+    {"speaker": "SPEAKER_01", "text": "I think that's fine. The vendor was happy with the terms."},
+    {"speaker": "SPEAKER_00", "text": "Okay. Schedule a follow-up meeting with the design team next week."},
+    {"speaker": "SPEAKER_02", "text": "Someone should update the project timeline in the tracker."},
+    {"speaker": "SPEAKER_01", "text": "Action: Maria reviews the onboarding document. Review the slides too."},
+    {"speaker": "SPEAKER_00", "text": "The launch went well and customers liked the new dashboard."},
+    {"speaker": "SPEAKER_02", "text": "Lets plan the retrospective for Thursday afternoon."},
+    {"speaker": "SPEAKER_01", "text": "Create a ticket for the login bug and assign it to the mobile team."},
+    {"speaker": "SPEAKER_00", "text": "Great, that's everything for today. Thank you all."},
+]
+
+WORDS_PER_MINUTE = 150
+
+# The original extractor's five trigger patterns
+_REFERENCE_PATTERNS = [
+    re.compile(r"^(?:schedule|send|follow up|update|assign|create|plan|review|confirm)\b", re.IGNORECASE),
+    re.compile(r"\bshould\b", re.IGNORECASE),
+    re.compile(r"\bneed to\b", re.IGNORECASE),
+    re.compile(r"\blet'?s\b", re.IGNORECASE),
+    re.compile(r"\baction[:\-]\b", re.IGNORECASE),
+]
+
+
+def reference_extract(nlp, transcription: str) -> list[str]:
+    """The original extractor: one document, full pipeline, regex list."""
+    tasks = []
+    for sent in nlp(transcription).sents:
+        text = sent.text.strip()
+        if not text:
+            continue
+        if sent[0].tag_ == "VB" or any(p.search(text) for p in _REFERENCE_PATTERNS):
+            tasks.append(re.sub(r"\s+", " ", text))
+    return tasks
+
+
+def long_transcript(segments, minutes):
+    """Repeat ``segments`` until they hold about ``minutes`` of speech."""
+    target_words = minutes * WORDS_PER_MINUTE
+    out, words = [], 0
+    for seg in itertools.cycle(segments):
+        if words >= target_words:
+            return out
+        out.append(seg)
+        words += len(seg["text"].split())
+
+
+def build_full_text(segments):
+    """Same layout as ``jobs.build_full_text`` (which needs Django set up)."""
+    return "\n".join(f"{seg['speaker']}: {seg['text']}" for seg in segments)
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run(segments=None, minutes=60, processes=(1, 2, 4)):
+    import spacy
+
+    full_nlp = spacy.load(SPACY_MODEL)
+    model_registry.get("spacy")
+
+    # Parity on the reference set
+    reference_text = build_full_text(REFERENCE_SEGMENTS)
+    expected = reference_extract(full_nlp, reference_text)
+    actual = extract_tasks(reference_text.splitlines(), n_process=1)
+    report = {
+        "reference_set": {"matches": actual == expected, "tasks": len(expected)},
+    }
+
+    # Speed on a long transcript
+    long_segments = segments or long_transcript(REFERENCE_SEGMENTS, minutes)
+    text = build_full_text(long_segments)
+    full_nlp.max_length = max(full_nlp.max_length, len(text) + 1)
+    expected, reference_seconds = _timed(reference_extract, full_nlp, text)
+    report["transcript"] = {
+        "turns": len(long_segments),
+        "words": len(text.split()),
+        "reference_seconds": reference_seconds,
+        "tasks": len(expected),
+        "batched": {},
+    }
+    for n_process in processes:
+        actual, seconds = _timed(extract_tasks, text.splitlines(), n_process=n_process)
+        report["transcript"]["batched"][str(n_process)] = {
+            "seconds": seconds,
+            "speedup": reference_seconds / max(seconds, 1e-9),
+            "matches": actual == expected,
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--minutes", type=int, default=60, help="Length of the generated transcript.")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--segments", help="JSON list of transcript segments to use instead.")
+    parser.add_argument("--json", help="Also write the report to this file.")
+    args = parser.parse_args()
+
+    segments = None
+    if args.segments:
+        with open(args.segments, encoding="utf-8") as f:
+            segments = json.load(f)
+
+    report = run(segments, args.minutes, args.processes)
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
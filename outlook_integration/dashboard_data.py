@@ -0,0 +1,121 @@
+# outlook_integration/dashboard_data.py
+"""
+Calendar events and OneDrive recordings for the dashboard.
+
+Events are fetched from Graph while the local recordings index is synced
+(``recording_index``), so a dashboard load takes as long as the slower
+call. Each result is cached for OUTLOOK_DASHBOARD_CACHE_TTL seconds per
+account, so the index is synced at most that often. ``refresh=True`` skips the
+cache (the dashboard's "Refresh" link).
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from requests.exceptions import HTTPError
+
+from . import recording_index
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_DAYS = 30
+CACHE_PREFIX = "outlook-dashboard"
+
+# Shared by all requests; each dashboard load submits one task per fetcher
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="dashboard")
+
+
+def fetch_events(account) -> list[dict]:
+    """Calendar events for the next CALENDAR_DAYS days."""
+    calendar = account.schedule().get_default_calendar()
+
+    now = datetime.now(timezone.utc)
+    future = now + timedelta(days=CALENDAR_DAYS)
+    q = (
+        calendar.new_query("start")
+        .greater_equal(now)
+        .chain("and")
+        .on_attribute("end")
+        .less_equal(future)
+    )
+    return [
+        {
+            "subject": ev.subject,
+            "start": ev.start,
+            "end": ev.end,
+            "online_meeting_url": ev.online_meeting_url,
+            "attachments": [
+                {
+                    "name": att.name,
+                    "content_url": getattr(att, "content_url", None),
+                    "size": getattr(att, "size", None),
+                }
+                for att in getattr(ev, "attachments", [])
+            ],
+        }
+        for ev in calendar.get_events(query=q, include_recurring=True)
+    ]
+
+
+def sync_recordings(account):
+    """
+    Bring the local index of the Recordings folder up to date with a Graph
+    delta query. Returns the sync counts, or ``None`` if Graph failed (the
+    index then keeps its last synced state).
+    """
+    try:
+        return recording_index.sync(account.con)
+    except HTTPError:
+        logger.warning("Recordings sync failed", exc_info=True)
+        return None
+    finally:
+        # Runs on an executor thread, which has its own DB connection
+        close_old_connections()
+
+
+FETCHERS = {
+    "events": fetch_events,
+    "recordings": sync_recordings,
+}
+
+
+def _cache_key(account, name: str) -> str:
+    return f"{CACHE_PREFIX}:{account.username or 'me'}:{name}"
+
+
+def load_dashboard(account, refresh: bool = False, fetchers=None) -> dict:
+    """
+    Return ``{name: result}`` for each of ``fetchers`` (default: events and
+    recordings). Cached results are used unless ``refresh`` is set; the rest
+    are fetched concurrently and cached.
+    """
+    fetchers = fetchers or FETCHERS
+    keys = {name: _cache_key(account, name) for name in fetchers}
+
+    data = {}
+    if not refresh:
+        cached = cache.get_many(keys.values())
+        data = {name: cached[key] for name, key in keys.items() if key in cached}
+
+    futures = {
+        name: _executor.submit(fetch, account)
+        for name, fetch in fetchers.items()
+        if name not in data
+    }
+    fresh = {name: future.result() for name, future in futures.items()}
+    if fresh:
+        cache.set_many(
+            {keys[name]: result for name, result in fresh.items()},
+            timeout=settings.OUTLOOK_DASHBOARD_CACHE_TTL,
+        )
+    data.update(fresh)
+    return data
+
+
+def invalidate(account, names=None):
+    """Drop the cached dashboard data for ``account`` (e.g. on logout)."""
+    cache.delete_many([_cache_key(account, name) for name in names or FETCHERS])
@@ -0,0 +1,34 @@
+# outlook_integration/graph.py
+"""
+Direct Microsoft Graph calls for data the O365 SDK objects don't expose
+(e.g. a drive item's eTag).
+
+``con`` is anything with a requests-style ``get(url, params=...)``: the
+SDK's ``account.con`` in production, or a plain ``requests.Session`` pointed
+at a local stand-in server in tests.
+"""
+
+GRAPH_URL = "https://graph.microsoft.com/v1.0"
+
+# Fields that identify a specific version of a file
+ITEM_FIELDS = "id,name,size,eTag,cTag,lastModifiedDateTime,webUrl"
+
+
+def get_item_metadata(con, item_id: str, base_url: str = GRAPH_URL) -> dict:
+    """Fetch the id, name, size, eTag and modification time of a drive item."""
+    response = con.get(
+        f"{base_url}/me/drive/items/{item_id}", params={"$select": ITEM_FIELDS}
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def open_item_content(con, item_id: str, base_url: str = GRAPH_URL):
+    """
+    Start downloading a drive item's content as a stream. Graph answers with
+    a redirect to a pre-authenticated download URL, which is followed.
+    Use the response as a context manager and read it with ``iter_content``.
+    """
+    response = con.get(f"{base_url}/me/drive/items/{item_id}/content", stream=True)
+    response.raise_for_status()
+    return response
@@ -0,0 +1,155 @@
+# outlook_integration/job_events.py
+"""
+Server-Sent Events feed of a transcription job.
+
+The worker appends segments and action items to the job as they are
+produced (as ``TranscriptChunk`` rows, see ``jobs.TranscriptStream``); the
+feed polls for chunks past what the browser has seen and sends them:
+
+    event: segment   {"index": n, "speaker", "start", "end", "text"}
+    event: task      {"index": n, "text"}
+    event: progress  the job's ``as_status()``, whenever it changes
+    event: reset     the job was re-queued and starts over
+    event: done      final ``as_status()`` plus the sentiment timeline; the
+                     stream then ends
+
+Each event carries the id "<segments sent>:<tasks sent>", so a reconnecting
+EventSource (which sends it back as Last-Event-ID) resumes where it left off.
+
+``job_events`` is a plain generator for WSGI servers, where each open stream
+occupies a worker thread; ``ajob_events`` is the same feed as an async
+generator for ASGI servers, where an open stream costs no thread between
+polls.
+"""
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+
+from .models import TranscriptChunk, TranscriptionJob
+
+POLL_SECONDS = 0.5
+HEARTBEAT_SECONDS = 15
+RETRY_MS = 3000
+
+
+def _event(name: str, data, event_id: str = None) -> str:
+    lines = [f"event: {name}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def parse_cursor(value: str) -> tuple[int, int]:
+    """Parse a "<segments>:<tasks>" cursor; anything invalid starts from 0:0."""
+    try:
+        segments, tasks = (max(0, int(part)) for part in value.split(":"))
+        return segments, tasks
+    except (AttributeError, ValueError):
+        return 0, 0
+
+
+class JobFeed:
+    """The state of one client's feed: what it has been sent so far."""
+
+    def __init__(self, job_id: int, cursor: str = ""):
+        self.job_id = job_id
+        self.segments_sent, self.tasks_sent = parse_cursor(cursor)
+        self.last_status = None
+        self.last_sent = time.monotonic()
+        self.finished = False
+
+    def _new_chunks(self):
+        return list(
+            TranscriptChunk.objects.filter(job_id=self.job_id).filter(
+                Q(segment_end__gt=self.segments_sent) | Q(task_end__gt=self.tasks_sent)
+            )
+        )
+
+    def _from_chunks(self, chunks):
+        segments, tasks = [], []
+        for chunk in chunks:
+            first = chunk.segment_end - len(chunk.segments)
+            segments += chunk.segments[max(self.segments_sent - first, 0):]
+            first = chunk.task_end - len(chunk.actionable_tasks)
+            tasks += chunk.actionable_tasks[max(self.tasks_sent - first, 0):]
+        return segments, tasks
+
+    def poll(self) -> list[str]:
+        """Read the job once and return the SSE messages to send."""
+        # Chunks are read before the job: finishing a job saves its full
+        # transcript and deletes the chunks in one transaction, so a job
+        # still unfinished here had all its chunks when they were read
+        latest = TranscriptChunk.objects.filter(job_id=self.job_id).order_by("-id").first()
+        chunks = self._new_chunks()
+        job = TranscriptionJob.objects.filter(pk=self.job_id).first()
+        if job is None:
+            self.finished = True
+            return [_event("done", {"status": "failed", "error": "Job not found."})]
+
+        messages = []
+        if job.is_finished:
+            total_segments, total_tasks = len(job.segments), len(job.actionable_tasks)
+        else:
+            total_segments = latest.segment_end if latest else 0
+            total_tasks = latest.task_end if latest else 0
+        if total_segments < self.segments_sent or total_tasks < self.tasks_sent:
+            self.segments_sent = self.tasks_sent = 0
+            messages.append(("reset", {}))
+            chunks = [] if job.is_finished else self._new_chunks()
+
+        if job.is_finished:
+            segments = job.segments[self.segments_sent:]
+            tasks = job.actionable_tasks[self.tasks_sent:]
+        else:
+            segments, tasks = self._from_chunks(chunks)
+        for index, segment in enumerate(segments, self.segments_sent):
+            messages.append(("segment", {"index": index, **segment}))
+        for index, text in enumerate(tasks, self.tasks_sent):
+            messages.append(("task", {"index": index, "text": text}))
+        self.segments_sent += len(segments)
+        self.tasks_sent += len(tasks)
+
+        status = job.as_status()
+        if job.is_finished:
+            messages.append(("done", {**status, "sentiment_timeline": job.sentiment_timeline}))
+            self.finished = True
+        elif status != self.last_status:
+            messages.append(("progress", status))
+        self.last_status = status
+
+        event_id = f"{self.segments_sent}:{self.tasks_sent}"
+        sent = [_event(name, data, event_id) for name, data in messages]
+        if sent:
+            self.last_sent = time.monotonic()
+        elif time.monotonic() - self.last_sent >= HEARTBEAT_SECONDS:
+            # Comment line: keeps proxies from closing an idle connection
+            sent.append(": keep-alive\n\n")
+            self.last_sent = time.monotonic()
+        return sent
+
+
+def job_events(job_id: int, cursor: str = "", poll_seconds: float = POLL_SECONDS):
+    """Yield SSE messages for ``job_id`` until it is done or failed."""
+    feed = JobFeed(job_id, cursor)
+    yield f"retry: {RETRY_MS}\n\n"
+    while True:
+        yield from feed.poll()
+        if feed.finished:
+            return
+        time.sleep(poll_seconds)
+
+
+async def ajob_events(job_id: int, cursor: str = "", poll_seconds: float = POLL_SECONDS):
+    """``job_events`` for ASGI: waits between polls without holding a thread."""
+    feed = JobFeed(job_id, cursor)
+    yield f"retry: {RETRY_MS}\n\n"
+    while True:
+        for message in await sync_to_async(feed.poll)():
+            yield message
+        if feed.finished:
+            return
+        await asyncio.sleep(poll_seconds)
@@ -0,0 +1,319 @@
+# outlook_integration/jobs.py
+"""
+Background transcription jobs.
+
+``transcribe_recording`` only enqueues a ``TranscriptionJob``; the slow part
+(download, diarization, ASR, task extraction) runs in
+``manage.py run_transcription_worker``, which claims queued jobs from the
+database. Everything goes through the regular Django database, so it works
+locally with SQLite and needs no external broker.
+"""
+import logging
+import os
+import socket
+import tempfile
+import threading
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from sentiment.audio import AudioDecodeError
+from sentiment.timeline import sentiment_timeline
+from transcription.transcribe_with_speaker_labels_hf import (
+    decode_audio_stream,
+    iter_speaker_segments,
+)
+from XIRCLS import metrics
+
+from . import transcript_cache
+from .graph import GRAPH_URL, get_item_metadata, open_item_content
+from .models import TranscriptChunk, TranscriptionJob
+from .task_extraction import extract_tasks_rule_based
+
+logger = logging.getLogger(__name__)
+
+# Share of the progress bar given to each stage, in percent
+DOWNLOAD_PERCENT = 10
+TRANSCRIPTION_PERCENT = 80  # 10 → 90, tasks are extracted along the way
+SENTIMENT_PERCENT = 5  # 90 → 95
+# Storing the finished transcript takes the remaining 95 → 100
+
+# Recordings are downloaded and fed to the decoder in pieces of this size
+DOWNLOAD_CHUNK_BYTES = 256 * 1024
+
+
+def enqueue(item_id: str) -> TranscriptionJob:
+    """
+    Queue ``item_id`` for transcription, or return the job already queued or
+    running for it so that repeated clicks don't start duplicate work.
+    """
+    active = (
+        TranscriptionJob.objects.filter(item_id=item_id)
+        .filter(Q(status=TranscriptionJob.Status.QUEUED) | Q(status=TranscriptionJob.Status.RUNNING))
+        .first()
+    )
+    if active is not None:
+        return active
+    return TranscriptionJob.objects.create(item_id=item_id)
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def claim_next(worker: str):
+    """
+    Atomically move the oldest queued job to "running" and return it, or
+    return ``None`` if there is nothing to do. The conditional UPDATE makes
+    sure two workers never claim the same job.
+    """
+    while True:
+        job = (
+            TranscriptionJob.objects.filter(status=TranscriptionJob.Status.QUEUED)
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+        claimed = TranscriptionJob.objects.filter(
+            pk=job.pk, status=TranscriptionJob.Status.QUEUED
+        ).update(
+            status=TranscriptionJob.Status.RUNNING,
+            stage="starting",
+            worker=worker,
+            started_at=timezone.now(),
+            updated_at=timezone.now(),
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+        # Another worker got there first; try the next one
+
+
+def requeue_stale(older_than) -> int:
+    """
+    Put "running" jobs that haven't reported progress for ``older_than`` (a
+    timedelta) back in the queue, e.g. after a worker was killed.
+    """
+    with transaction.atomic():
+        stale = list(
+            TranscriptionJob.objects.filter(
+                status=TranscriptionJob.Status.RUNNING,
+                updated_at__lt=timezone.now() - older_than,
+            ).values_list("pk", flat=True)
+        )
+        # Partial results are dropped; the job starts over
+        TranscriptChunk.objects.filter(job__in=stale).delete()
+        return TranscriptionJob.objects.filter(
+            pk__in=stale, status=TranscriptionJob.Status.RUNNING
+        ).update(
+            status=TranscriptionJob.Status.QUEUED,
+            stage="",
+            progress=0,
+            worker="",
+            segments=[],
+            actionable_tasks=[],
+        )
+
+
+def build_full_text(segments: list[dict]) -> str:
+    """Combine all segments into one big text blob, e.g. "SpeakerA: text…"."""
+    full_text_lines = []
+    for seg in segments:
+        speaker = seg.get("speaker", "Speaker")
+        text = seg.get("text", "").strip()
+        if text:
+            full_text_lines.append(f"{speaker}: {text}")
+    return "\n".join(full_text_lines)
+
+
+class JobProgress:
+    """
+    Records a job's stage and percentage, only writing to the database when
+    either actually changes.
+    """
+
+    def __init__(self, job: TranscriptionJob):
+        self.job = job
+
+    def __call__(self, stage: str, percent: float):
+        percent = max(0, min(100, int(percent)))
+        if stage == self.job.stage and percent == self.job.progress:
+            return
+        self.job.stage = stage
+        self.job.progress = percent
+        self.job.save(update_fields=["stage", "progress", "updated_at"])
+
+    def transcription(self, stage: str, fraction: float):
+        """Callback for transcribe_with_speaker_labels(progress=...)."""
+        self(stage, DOWNLOAD_PERCENT + TRANSCRIPTION_PERCENT * fraction)
+
+
+class TranscriptStream:
+    """
+    Collects segments as the transcriber yields them, extracts action items
+    from each new batch, and saves both as a ``TranscriptChunk`` so the
+    events endpoint can push them to the browser while the rest is still
+    transcribing. Only the new batch is written each time; the full
+    transcript is saved on the job once, when it is finished.
+    """
+
+    def __init__(self, job: TranscriptionJob):
+        self.job = job
+        self.segments = []
+        self.actionable_tasks = []
+
+    def extend(self, segments: list[dict]):
+        if not segments:
+            return
+        self.segments.extend(segments)
+        # Turns are parsed independently, so extracting per batch gives the
+        # same tasks as extracting from the whole transcript at the end
+        with metrics.stage("transcription", "task_extraction"):
+            tasks = extract_tasks_rule_based(build_full_text(segments))
+        self.actionable_tasks.extend(tasks)
+        TranscriptChunk.objects.create(
+            job=self.job,
+            segments=segments,
+            actionable_tasks=tasks,
+            segment_end=len(self.segments),
+            task_end=len(self.actionable_tasks),
+        )
+        # Shows the job is alive (see requeue_stale)
+        self.job.save(update_fields=["updated_at"])
+
+
+def _track_download(chunks, total_bytes: int, progress):
+    """Pass ``chunks`` through while reporting download progress."""
+    done = 0
+    for chunk in chunks:
+        done += len(chunk)
+        if total_bytes:
+            progress("downloading", DOWNLOAD_PERCENT * min(done / total_bytes, 1.0))
+        yield chunk
+
+
+def download_waveform(con, item_id: str, size: int, progress, base_url: str = GRAPH_URL):
+    """
+    Stream a recording from OneDrive straight into the decoder, so decoding
+    runs while the download is in progress and the encoded file is never
+    written to disk. Returns the memory-mapped 16 kHz waveform, or ``None``
+    if the file can't be decoded from a stream.
+    """
+    with open_item_content(con, item_id, base_url) as response:
+        chunks = response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES)
+        try:
+            return decode_audio_stream(_track_download(chunks, size, progress))
+        except AudioDecodeError:
+            return None
+
+
+def run_job(job: TranscriptionJob):
+    """Download, transcribe and extract tasks for ``job``, recording the outcome."""
+    # Imported here because views imports this module
+    from .views import get_account
+
+    progress = JobProgress(job)
+    stream = TranscriptStream(job)
+    try:
+        # Step 1) Look up the recording and stream it from OneDrive
+        progress("downloading", 0)
+        account = get_account()
+        if not account.is_authenticated:
+            raise RuntimeError("Outlook account is not authenticated.")
+        metadata = get_item_metadata(account.con, job.item_id)
+        job.recording_name = metadata.get("name", "")
+        job.save(update_fields=["recording_name", "updated_at"])
+
+        # The same version of this recording may have been transcribed since
+        # the job was queued
+        cached = transcript_cache.lookup(job.item_id, metadata.get("eTag"), metadata.get("size"))
+        if cached is not None:
+            return _finish(job, cached.segments, cached.actionable_tasks, cached.sentiment_timeline)
+
+        with metrics.stage("transcription", "download"):
+            waveform = download_waveform(
+                account.con, job.item_id, metadata.get("size") or 0, progress
+            )
+        progress("downloading", DOWNLOAD_PERCENT)
+
+        # Step 2) Run Hugging Face + PyAnnote transcription, and
+        # Step 3) extract actionable tasks with our spaCy-based extractor,
+        # saving both batch by batch as the segments come in
+        if waveform is not None:
+            for batch in iter_speaker_segments(waveform=waveform, progress=progress.transcription):
+                stream.extend(batch)
+        else:
+            # Containers that need a seekable input are downloaded to a
+            # temp dir, which is removed as soon as transcription is done.
+            item = account.storage().get_default_drive().get_item(job.item_id)
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                if not item.download(to_path=tmp_dir, name=item.name):
+                    raise RuntimeError("Could not download recording.")
+                for batch in iter_speaker_segments(
+                    mp3_path=os.path.join(tmp_dir, item.name),
+                    progress=progress.transcription,
+                ):
+                    stream.extend(batch)
+
+        # Step 4) Score every segment's sentiment in batches
+        progress("sentiment", DOWNLOAD_PERCENT + TRANSCRIPTION_PERCENT)
+        segments, actionable_tasks = stream.segments, stream.actionable_tasks
+        timeline = analyse_sentiment(segments)
+
+        progress("saving", DOWNLOAD_PERCENT + TRANSCRIPTION_PERCENT + SENTIMENT_PERCENT)
+        # Cached hits are served without a job, so a transcript missing its
+        # timeline is left out of the cache for the next request to retry
+        if timeline:
+            transcript_cache.store(
+                job.item_id,
+                metadata.get("eTag"),
+                metadata.get("size"),
+                job.recording_name,
+                segments,
+                actionable_tasks,
+                timeline,
+            )
+    except Exception as e:
+        job.status = TranscriptionJob.Status.FAILED
+        job.error = str(e) or e.__class__.__name__
+        job.finished_at = timezone.now()
+        # Keep whatever was transcribed before the failure
+        job.segments = stream.segments
+        job.actionable_tasks = stream.actionable_tasks
+        with transaction.atomic():
+            job.save()
+            job.chunks.all().delete()
+        return job
+
+    return _finish(job, segments, actionable_tasks, timeline)
+
+
+def analyse_sentiment(segments: list[dict]) -> dict:
+    """
+    The per-speaker sentiment timeline of a transcript, or ``{}`` if the
+    sentiment model fails: the job still finishes with its transcript, but
+    the transcript isn't cached.
+    """
+    try:
+        with metrics.stage("transcription", "sentiment"):
+            return sentiment_timeline(segments)
+    except Exception:
+        logger.warning("Sentiment timeline failed", exc_info=True)
+        return {}
+
+
+def _finish(job, segments, actionable_tasks, timeline=None):
+    job.segments = segments
+    job.actionable_tasks = actionable_tasks
+    job.sentiment_timeline = timeline or {}
+    job.status = TranscriptionJob.Status.DONE
+    job.stage = "done"
+    job.progress = 100
+    job.finished_at = timezone.now()
+    # Together, so the events feed never sees an unfinished job without its chunks
+    with transaction.atomic():
+        job.save()
+        job.chunks.all().delete()
+    return job
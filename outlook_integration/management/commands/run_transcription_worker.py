@@ -0,0 +1,78 @@
+# outlook_integration/management/commands/run_transcription_worker.py
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from outlook_integration import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Process queued meeting transcription jobs. Runs until interrupted; "
+        "--concurrency controls how many jobs are processed at once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.TRANSCRIPTION_WORKER_CONCURRENCY,
+            help="Number of jobs to process in parallel.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.TRANSCRIPTION_WORKER_POLL_SECONDS,
+            help="Seconds to wait before checking an empty queue again.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty instead of polling forever.",
+        )
+
+    def handle(self, *args, **options):
+        stale = jobs.requeue_stale(timedelta(seconds=settings.TRANSCRIPTION_JOB_STALE_SECONDS))
+        if stale:
+            self.stdout.write(f"Re-queued {stale} stale job(s).")
+
+        concurrency = max(1, options["concurrency"])
+        self.stdout.write(f"Transcription worker started with concurrency {concurrency}.")
+        threads = [
+            threading.Thread(
+                target=self.work,
+                args=(options["poll_interval"], options["once"]),
+                name=f"transcription-worker-{i}",
+                daemon=True,
+            )
+            for i in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping transcription worker.")
+
+    def work(self, poll_interval, once):
+        name = jobs.worker_name()
+        try:
+            while True:
+                close_old_connections()
+                job = jobs.claim_next(name)
+                if job is None:
+                    if once:
+                        return
+                    time.sleep(poll_interval)
+                    continue
+                self.stdout.write(f"[{name}] Job {job.pk}: {job.item_id}")
+                job = jobs.run_job(job)
+                self.stdout.write(f"[{name}] Job {job.pk}: {job.status}")
+        finally:
+            close_old_connections()
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_id', models.CharField(max_length=255)),
+                ('recording_name', models.CharField(blank=True, max_length=512)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='queued', max_length=16)),
+                ('stage', models.CharField(blank=True, max_length=64)),
+                ('progress', models.PositiveSmallIntegerField(default=0)),
+                ('segments', models.JSONField(blank=True, default=list)),
+                ('actionable_tasks', models.JSONField(blank=True, default=list)),
+                ('error', models.TextField(blank=True)),
+                ('worker', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
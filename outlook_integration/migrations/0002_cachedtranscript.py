@@ -0,0 +1,32 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outlook_integration', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CachedTranscript',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_id', models.CharField(db_index=True, max_length=255)),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('size', models.BigIntegerField(default=0)),
+                ('model_version', models.CharField(max_length=255)),
+                ('recording_name', models.CharField(blank=True, max_length=512)),
+                ('segments', models.JSONField(blank=True, default=list)),
+                ('actionable_tasks', models.JSONField(blank=True, default=list)),
+                ('size_bytes', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_accessed_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('item_id', 'etag', 'size', 'model_version'), name='unique_transcript_per_recording_version')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outlook_integration', '0002_cachedtranscript'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeltaSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('folder_path', models.CharField(max_length=512, unique=True)),
+                ('folder_id', models.CharField(blank=True, max_length=255)),
+                ('delta_link', models.TextField(blank=True)),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Recording',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_id', models.CharField(max_length=255, unique=True)),
+                ('name', models.CharField(max_length=512)),
+                ('size', models.BigIntegerField(default=0)),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('web_url', models.URLField(blank=True, max_length=2048)),
+                ('last_modified', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-last_modified', 'name'],
+            },
+        ),
+    ]
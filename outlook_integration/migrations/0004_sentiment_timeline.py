@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outlook_integration', '0003_deltasyncstate_recording'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cachedtranscript',
+            name='sentiment_timeline',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='transcriptionjob',
+            name='sentiment_timeline',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:40
+
+import uuid
+
+from django.db import migrations, models
+
+
+def gen_public_ids(apps, schema_editor):
+    TranscriptionJob = apps.get_model('outlook_integration', 'TranscriptionJob')
+    for job in TranscriptionJob.objects.only('pk'):
+        job.public_id = uuid.uuid4()
+        job.save(update_fields=['public_id'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outlook_integration', '0004_sentiment_timeline'),
+    ]
+
+    # A unique field with a callable default needs three steps, so that
+    # existing jobs get distinct values
+    operations = [
+        migrations.AddField(
+            model_name='transcriptionjob',
+            name='public_id',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, null=True),
+        ),
+        migrations.RunPython(gen_public_ids, reverse_code=migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='transcriptionjob',
+            name='public_id',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outlook_integration', '0005_transcriptionjob_public_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('segments', models.JSONField(blank=True, default=list)),
+                ('actionable_tasks', models.JSONField(blank=True, default=list)),
+                ('segment_end', models.PositiveIntegerField()),
+                ('task_end', models.PositiveIntegerField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='outlook_integration.transcriptionjob')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,154 @@
+# outlook_integration/models.py
+import uuid
+
+from django.db import models
+
+
+class TranscriptionJob(models.Model):
+    """
+    A meeting recording queued for transcription.
+
+    Jobs are created by the ``transcribe_recording`` view and processed
+    outside the request by ``manage.py run_transcription_worker``, which
+    records the current stage and percentage as it goes so the transcription
+    page can poll for progress.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    # Identifies the job in URLs; the sequential pk would let anyone walk
+    # through every transcript
+    public_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    item_id = models.CharField(max_length=255)
+    recording_name = models.CharField(max_length=512, blank=True)
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.QUEUED, db_index=True
+    )
+    stage = models.CharField(max_length=64, blank=True)
+    progress = models.PositiveSmallIntegerField(default=0)  # 0–100
+    segments = models.JSONField(default=list, blank=True)
+    actionable_tasks = models.JSONField(default=list, blank=True)
+    sentiment_timeline = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+
+    def __str__(self):
+        return f"{self.recording_name or self.item_id} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.Status.DONE, self.Status.FAILED)
+
+    def as_status(self) -> dict:
+        return {
+            "id": str(self.public_id),
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "recording_name": self.recording_name,
+            "error": self.error,
+        }
+
+
+class TranscriptChunk(models.Model):
+    """
+    One batch of segments (and the action items found in it) appended by the
+    worker while a job runs. Each batch is a new row, so saving it costs the
+    size of the batch rather than of the transcript so far. ``segment_end``
+    and ``task_end`` are the totals including this chunk, which lets the
+    events feed fetch just what a client hasn't seen. The chunks are removed
+    once the full transcript is saved on the job.
+    """
+
+    job = models.ForeignKey(TranscriptionJob, on_delete=models.CASCADE, related_name="chunks")
+    segments = models.JSONField(default=list, blank=True)
+    actionable_tasks = models.JSONField(default=list, blank=True)
+    segment_end = models.PositiveIntegerField()
+    task_end = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.job} up to segment {self.segment_end}"
+
+
+class CachedTranscript(models.Model):
+    """
+    Stored result of transcribing one version of a recording.
+
+    Entries are keyed by the OneDrive item id together with the file's eTag
+    and size, and the versions of the models that produced them, so a
+    changed file or a model upgrade never serves a stale transcript.
+    """
+
+    item_id = models.CharField(max_length=255, db_index=True)
+    etag = models.CharField(max_length=255, blank=True)
+    size = models.BigIntegerField(default=0)
+    model_version = models.CharField(max_length=255)
+    recording_name = models.CharField(max_length=512, blank=True)
+    segments = models.JSONField(default=list, blank=True)
+    actionable_tasks = models.JSONField(default=list, blank=True)
+    sentiment_timeline = models.JSONField(default=dict, blank=True)
+    size_bytes = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_accessed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["item_id", "etag", "size", "model_version"],
+                name="unique_transcript_per_recording_version",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.recording_name or self.item_id} [{self.model_version}]"
+
+
+class Recording(models.Model):
+    """
+    Local index of the OneDrive "Recordings" folder, kept up to date by
+    ``recording_index.sync`` so the dashboard doesn't list the folder from
+    Graph on every load.
+    """
+
+    item_id = models.CharField(max_length=255, unique=True)
+    name = models.CharField(max_length=512)
+    size = models.BigIntegerField(default=0)
+    etag = models.CharField(max_length=255, blank=True)
+    web_url = models.URLField(max_length=2048, blank=True)
+    last_modified = models.DateTimeField(null=True, blank=True, db_index=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-last_modified", "name"]
+
+    def __str__(self):
+        return self.name
+
+
+class DeltaSyncState(models.Model):
+    """
+    Where the last Graph delta query for a drive folder left off. The stored
+    ``delta_link`` returns only the changes made since that sync.
+    """
+
+    folder_path = models.CharField(max_length=512, unique=True)
+    folder_id = models.CharField(max_length=255, blank=True)
+    delta_link = models.TextField(blank=True)
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.folder_path
@@ -0,0 +1,158 @@
+# outlook_integration/recording_index.py
+"""
+Keep the local ``Recording`` table in step with the OneDrive "Recordings"
+folder using Graph delta queries.
+
+The first sync enumerates the drive once; after that the stored delta link
+returns only items that changed since the previous sync. Delta queries on
+sub-folders aren't available on OneDrive for Business, so the drive root is
+tracked and changes are filtered by parent folder. If Graph reports the
+delta link as expired (410 Gone), the index is rebuilt from a full sync.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from requests.exceptions import HTTPError
+
+from .graph import GRAPH_URL
+from .models import DeltaSyncState, Recording
+
+RECORDINGS_PATH = "/Recordings"
+DELTA_FIELDS = "id,name,size,eTag,lastModifiedDateTime,webUrl,parentReference,file,folder,deleted"
+
+# Sort options accepted by the dashboard's ?sort= parameter
+SORT_FIELDS = {
+    "name": "name",
+    "-name": "-name",
+    "size": "size",
+    "-size": "-size",
+    "modified": "last_modified",
+    "-modified": "-last_modified",
+}
+DEFAULT_SORT = "-modified"
+
+
+class ResyncRequired(Exception):
+    """The stored delta link has expired and a full sync is needed."""
+
+
+def _get(con, url, params=None) -> dict:
+    try:
+        response = con.get(url, params=params)
+        response.raise_for_status()
+    except HTTPError as e:
+        if e.response is not None and e.response.status_code == 410:
+            raise ResyncRequired() from e
+        raise
+    return response.json()
+
+
+def _find_folder(con, base_url) -> str:
+    """Item id of the Recordings folder, or "" if it doesn't exist."""
+    try:
+        return _get(con, f"{base_url}/me/drive/root:{RECORDINGS_PATH}").get("id", "")
+    except HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            return ""
+        raise
+
+
+def _apply(item: dict, folder_id: str, seen: set, gone: set) -> bool:
+    """
+    Apply one delta item to the index and return whether it was indexed.
+    Items that don't belong in the index are added to ``gone``, for the
+    caller to delete a page at a time.
+    """
+    parent_id = item.get("parentReference", {}).get("id")
+    if "deleted" in item or parent_id != folder_id or "file" not in item:
+        # Deleted, moved out of the folder, or not a file
+        gone.add(item["id"])
+        return False
+
+    seen.add(item["id"])
+    gone.discard(item["id"])
+    Recording.objects.update_or_create(
+        item_id=item["id"],
+        defaults={
+            "name": item.get("name", ""),
+            "size": item.get("size") or 0,
+            "etag": item.get("eTag", ""),
+            "web_url": item.get("webUrl", ""),
+            "last_modified": parse_datetime(item.get("lastModifiedDateTime") or ""),
+        },
+    )
+    return True
+
+
+def sync(con, base_url: str = GRAPH_URL) -> dict:
+    """
+    Bring the index up to date and return counts of what changed:
+    ``{"full": bool, "pages": int, "updated": int, "removed": int}``.
+    """
+    state, _ = DeltaSyncState.objects.get_or_create(folder_path=RECORDINGS_PATH)
+    try:
+        return _sync(con, base_url, state)
+    except ResyncRequired:
+        state.delta_link = ""
+        return _sync(con, base_url, state)
+
+
+def _sync(con, base_url, state) -> dict:
+    full = not state.delta_link
+    if full:
+        # A full sync also re-checks that the folder still exists
+        state.folder_id = _find_folder(con, base_url)
+        if not state.folder_id:
+            with transaction.atomic():
+                removed, _ = Recording.objects.all().delete()
+                state.last_synced_at = timezone.now()
+                state.save()
+            return {"full": True, "pages": 0, "updated": 0, "removed": removed}
+        url, params = f"{base_url}/me/drive/root/delta", {"$select": DELTA_FIELDS}
+    else:
+        url, params = state.delta_link, None
+
+    stats = {"full": full, "pages": 0, "updated": 0, "removed": 0}
+    seen = set()
+    delta_link = ""
+    # Each page is fetched outside any transaction and applied in a short
+    # one, so a long enumeration doesn't hold SQLite's write lock. The delta
+    # link is only saved at the end: an interrupted sync restarts from the
+    # old one, and applying its pages again is harmless.
+    while url:
+        page = _get(con, url, params)
+        stats["pages"] += 1
+        gone = set()
+        with transaction.atomic():
+            for item in page.get("value", []):
+                if item["id"] == state.folder_id and ("deleted" in item or "folder" not in item):
+                    # The folder itself was removed; start over next time
+                    removed, _ = Recording.objects.all().delete()
+                    state.folder_id = state.delta_link = ""
+                    state.last_synced_at = timezone.now()
+                    state.save()
+                    return {**stats, "removed": stats["removed"] + removed}
+                stats["updated"] += _apply(item, state.folder_id, seen, gone)
+            # A full sync lists every item in the drive, so delete in one query
+            removed, _ = Recording.objects.filter(item_id__in=gone).delete()
+            stats["removed"] += removed
+        url, params = page.get("@odata.nextLink"), None
+        if not url:
+            delta_link = page.get("@odata.deltaLink", "")
+
+    with transaction.atomic():
+        if full:
+            # Anything not enumerated by a full sync is gone
+            stale, _ = Recording.objects.exclude(item_id__in=seen).delete()
+            stats["removed"] += stale
+        state.delta_link = delta_link
+        state.last_synced_at = timezone.now()
+        state.save()
+    return stats
+
+
+def list_recordings(sort: str = DEFAULT_SORT):
+    """Indexed recordings ordered by one of ``SORT_FIELDS``."""
+    field = SORT_FIELDS.get(sort, SORT_FIELDS[DEFAULT_SORT])
+    return Recording.objects.order_by(field, "name")
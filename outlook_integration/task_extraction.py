@@ -1,40 +1,92 @@
 import re
-import spacy
 
-# Load spaCy’s English model once at import time
-nlp = spacy.load("en_core_web_sm")
+from decouple import config
 
-# Regex patterns that often signal action items
-TRIGGER_PATTERNS = [
-    re.compile(r"^(?:schedule|send|follow up|update|assign|create|plan|review|confirm)\b", re.IGNORECASE),
-    re.compile(r"\bshould\b", re.IGNORECASE),
-    re.compile(r"\bneed to\b", re.IGNORECASE),
-    re.compile(r"\blet'?s\b", re.IGNORECASE),
-    re.compile(r"\baction[:\-]\b", re.IGNORECASE),
-]
+from XIRCLS import model_registry
+
+# spaCy pipeline used for sentence splitting and POS tags
+SPACY_MODEL = "en_core_web_sm"
+# Components the extractor never reads; excluding them skips their work
+# entirely. The tagger (tag_) and parser (sentence boundaries) are kept.
+EXCLUDED_COMPONENTS = ["ner", "lemmatizer"]
+
+# Speaker turns per nlp.pipe batch, and worker processes for nlp.pipe.
+# Multiple processes only pay off on long transcripts, so they are used from
+# TASK_EXTRACTION_MIN_TURNS_PER_PROCESS turns per process upwards.
+TASK_EXTRACTION_BATCH_SIZE = config("TASK_EXTRACTION_BATCH_SIZE", default=64, cast=int)
+TASK_EXTRACTION_PROCESSES = config("TASK_EXTRACTION_PROCESSES", default=1, cast=int)
+TASK_EXTRACTION_MIN_TURNS_PER_PROCESS = config(
+    "TASK_EXTRACTION_MIN_TURNS_PER_PROCESS", default=500, cast=int
+)
 
-def extract_tasks_rule_based(transcription: str) -> list[str]:
-    """
-    Given a full transcription string, return a list of sentences that look like "action items."
-    """
-    doc = nlp(transcription)
-    tasks: list[str] = []
 
+def load_nlp():
+    """Registry loader: spaCy’s English model, loaded once per process."""
+    import spacy
+
+    return spacy.load(SPACY_MODEL, exclude=EXCLUDED_COMPONENTS)
+
+
+# Phrases that often signal action items, as one alternation: a sentence
+# matches if it starts with a task verb or contains any other trigger
+TRIGGER_PATTERN = re.compile(
+    r"^(?:schedule|send|follow up|update|assign|create|plan|review|confirm)\b"
+    r"|\bshould\b"
+    r"|\bneed to\b"
+    r"|\blet'?s\b"
+    r"|\baction[:\-]\b",
+    re.IGNORECASE,
+)
+WHITESPACE = re.compile(r"\s+")
+
+
+def _sentence_tasks(doc) -> list[str]:
+    tasks: list[str] = []
     for sent in doc.sents:
         text = sent.text.strip()
         if not text:
             continue
 
-        # 1) Check if the first token is an imperative (base‐form verb, POS tag "VB")
-        first_token = sent[0]
-        is_imperative = first_token.tag_ == "VB"
+        # 1) The first token is an imperative (base‐form verb, POS tag "VB"),
+        # 2) or a trigger phrase matches anywhere in the sentence
+        if sent[0].tag_ == "VB" or TRIGGER_PATTERN.search(text):
+            # Collapse multiple spaces/newlines into a single space
+            tasks.append(WHITESPACE.sub(" ", text))
+    return tasks
 
-        # 2) Check if any trigger regex matches anywhere in the sentence
-        has_trigger = any(pattern.search(text) for pattern in TRIGGER_PATTERNS)
 
-        if is_imperative or has_trigger:
-            # Collapse multiple spaces/newlines into a single space
-            cleaned = re.sub(r"\s+", " ", text)
-            tasks.append(cleaned)
+def _processes_for(turns: int, n_process: int | None) -> int:
+    if n_process is None:
+        n_process = min(TASK_EXTRACTION_PROCESSES, turns // TASK_EXTRACTION_MIN_TURNS_PER_PROCESS)
+    return max(1, min(n_process, turns))
 
+
+def extract_tasks(turns: list[str], n_process: int | None = None, batch_size: int | None = None) -> list[str]:
+    """
+    Return the sentences that look like "action items" from a list of
+    speaker turns (e.g. "SPEAKER_00: text…"), in order. Turns are parsed as
+    a batch through ``nlp.pipe``, across ``n_process`` processes (by
+    default up to TASK_EXTRACTION_PROCESSES, for long transcripts only).
+    """
+    turns = [turn for turn in turns if turn.strip()]
+    if not turns:
+        return []
+
+    nlp = model_registry.get("spacy")
+    docs = nlp.pipe(
+        turns,
+        batch_size=batch_size or TASK_EXTRACTION_BATCH_SIZE,
+        n_process=_processes_for(len(turns), n_process),
+    )
+    tasks: list[str] = []
+    for doc in docs:
+        tasks.extend(_sentence_tasks(doc))
     return tasks
+
+
+def extract_tasks_rule_based(transcription: str) -> list[str]:
+    """
+    Given a full transcription string, return a list of sentences that look like "action items."
+    Each line (one speaker turn, see ``jobs.build_full_text``) is parsed separately.
+    """
+    return extract_tasks(transcription.splitlines())
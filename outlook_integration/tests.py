@@ -0,0 +1,894 @@
+# outlook_integration/tests.py
+import io
+import json
+import math
+import shutil
+import struct
+import tempfile
+import importlib.util
+import itertools
+import threading
+import time
+import unittest
+import wave
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import requests
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from transcription import waveform as waveform_file
+from transcription.transcribe_with_speaker_labels_hf import (
+    _transcribe_batch,
+    _word_timestamps,
+    assign_words_to_speakers,
+    diarization_windows,
+    link_speakers,
+    stitch_windows,
+    transcribe_pipelined,
+)
+from XIRCLS import model_registry
+from XIRCLS.benchmarks.standins import StandInASR, alternating_turns, synthetic_speech
+
+from . import dashboard_data, job_events, jobs, recording_index, task_extraction, transcript_cache, views
+from .benchmark_task_extraction import (
+    REFERENCE_SEGMENTS,
+    _REFERENCE_PATTERNS,
+    build_full_text,
+    reference_extract,
+)
+from .graph import get_item_metadata
+from .models import CachedTranscript, DeltaSyncState, Recording, TranscriptChunk, TranscriptionJob
+
+SEGMENTS = [{"speaker": "SPEAKER_00", "start": 0.0, "end": 2.5, "text": "Send the budget report."}]
+TASKS = ["SPEAKER_00: Send the budget report."]
+
+
+def signed_in(account=True):
+    """Patch the views' Outlook sign-in check; ``account=None`` means signed out."""
+    return mock.patch.object(views, "_authenticated_account", return_value=StubAccount() if account else None)
+
+
+class FakeGraphServer:
+    """
+    Local HTTP stand-in for the Microsoft Graph endpoints the app calls.
+
+    ``routes`` maps a path (e.g. "/v1.0/me/drive/items/abc") to either a
+    (status, headers, body) tuple or a callable taking the parsed query
+    string and returning one. "{server}" in headers and JSON bodies is
+    replaced with the server's URL. Use ``url`` + "/v1.0" as the Graph base
+    URL.
+    """
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                server.requests.append(self.path)
+                route = server.routes.get(parts.path)
+                if route is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                if callable(route):
+                    route = route(parse_qs(parts.query))
+                status, headers, body = route
+                if isinstance(body, (dict, list)):
+                    body = json.dumps(body).replace("{server}", server.url).encode()
+                    headers = {"Content-Type": "application/json", **headers}
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value.replace("{server}", server.url))
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FakeOneDrive:
+    """
+    An in-memory drive with a "Recordings" folder, exposing the item-by-path
+    and root delta endpoints through ``FakeGraphServer`` routes. Delta
+    tokens are positions in the drive's change log; results are paged
+    ``page_size`` items at a time.
+    """
+
+    FOLDER_ID = "folder-recordings"
+
+    def __init__(self, page_size=2):
+        self.page_size = page_size
+        self.items = {
+            self.FOLDER_ID: {
+                "id": self.FOLDER_ID, "name": "Recordings", "folder": {},
+                "parentReference": {"id": "root"},
+            }
+        }
+        self.changes = [self.FOLDER_ID]
+        self.expired = False
+        self.delta_requests = 0
+
+    def put(self, item_id, name, size=100, parent=FOLDER_ID, modified="2026-01-01T10:00:00Z"):
+        version = self.items.get(item_id, {}).get("version", 0) + 1
+        self.items[item_id] = {
+            "id": item_id, "name": name, "size": size, "file": {},
+            "eTag": f"\"{item_id},{version}\"", "version": version,
+            "lastModifiedDateTime": modified, "webUrl": f"https://onedrive.test/{item_id}",
+            "parentReference": {"id": parent},
+        }
+        self.changes.append(item_id)
+
+    def delete(self, item_id):
+        parent = self.items[item_id]["parentReference"]
+        self.items[item_id] = {"id": item_id, "deleted": {}, "parentReference": parent}
+        self.changes.append(item_id)
+
+    def routes(self):
+        return {
+            "/v1.0/me/drive/root:/Recordings": (200, {}, self.items[self.FOLDER_ID]),
+            "/v1.0/me/drive/root/delta": self.delta,
+        }
+
+    def delta(self, query):
+        self.delta_requests += 1
+        token = query.get("token", [None])[0]
+        if token is not None and self.expired:
+            return 410, {}, {"error": {"code": "resyncRequired"}}
+        if token is None:
+            ids = [i for i, item in self.items.items() if "deleted" not in item]
+        else:
+            ids = list(dict.fromkeys(self.changes[int(token):]))
+        skip = int(query.get("skip", ["0"])[0])
+        body = {"value": [self.items[i] for i in ids[skip:skip + self.page_size]]}
+        if skip + self.page_size < len(ids):
+            next_token = "" if token is None else f"token={token}&"
+            body["@odata.nextLink"] = (
+                f"{{server}}/v1.0/me/drive/root/delta?{next_token}skip={skip + self.page_size}"
+            )
+        else:
+            body["@odata.deltaLink"] = f"{{server}}/v1.0/me/drive/root/delta?token={len(self.changes)}"
+        return 200, {}, body
+
+
+def make_wav(seconds, sample_rate=44100):
+    """A stereo 440 Hz tone as WAV bytes, to be resampled to 16 kHz mono."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        frames = b"".join(
+            struct.pack("<hh", sample, sample)
+            for sample in (
+                int(8000 * math.sin(2 * math.pi * 440 * i / sample_rate))
+                for i in range(int(seconds * sample_rate))
+            )
+        )
+        wav.writeframes(frames)
+    return buffer.getvalue()
+
+
+class TranscriptionJobQueueTest(TestCase):
+    def test_enqueue_reuses_active_job_for_same_item(self):
+        first = jobs.enqueue("item-1")
+        self.assertEqual(jobs.enqueue("item-1").pk, first.pk)
+        self.assertNotEqual(jobs.enqueue("item-2").pk, first.pk)
+
+        first.status = TranscriptionJob.Status.DONE
+        first.save()
+        self.assertNotEqual(jobs.enqueue("item-1").pk, first.pk)
+
+    def test_claim_next_takes_oldest_queued_job_once(self):
+        older = jobs.enqueue("item-1")
+        jobs.enqueue("item-2")
+
+        claimed = jobs.claim_next("worker-a")
+        self.assertEqual(claimed.pk, older.pk)
+        self.assertEqual(claimed.status, TranscriptionJob.Status.RUNNING)
+        self.assertEqual(claimed.worker, "worker-a")
+
+        self.assertNotEqual(jobs.claim_next("worker-b").pk, older.pk)
+        self.assertIsNone(jobs.claim_next("worker-c"))
+
+    def test_job_progress_only_writes_changes(self):
+        job = jobs.enqueue("item-1")
+        progress = jobs.JobProgress(job)
+        progress.transcription("transcribing", 0.5)
+        job.refresh_from_db()
+        self.assertEqual(job.stage, "transcribing")
+        self.assertEqual(job.progress, jobs.DOWNLOAD_PERCENT + jobs.TRANSCRIPTION_PERCENT // 2)
+
+    def test_status_endpoint(self):
+        job = jobs.enqueue("item-1")
+        with signed_in():
+            response = self.client.get(reverse("transcription_job_status", args=[job.public_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["id"], str(job.public_id))
+        self.assertEqual(response.json()["status"], "queued")
+        self.assertEqual(response.json()["progress"], 0)
+
+    def test_job_pages_require_sign_in_and_public_id(self):
+        job = jobs.enqueue("item-1")
+        with signed_in(None):
+            response = self.client.get(reverse("transcription_job", args=[job.public_id]))
+            self.assertRedirects(response, reverse("outlook_login"), fetch_redirect_response=False)
+            response = self.client.get(reverse("transcription_job_status", args=[job.public_id]))
+            self.assertEqual(response.status_code, 401)
+        with signed_in():
+            self.assertEqual(self.client.get(reverse("transcription_job", args=[job.public_id])).status_code, 200)
+            self.assertEqual(self.client.get(f"/outlook/jobs/{job.pk}/").status_code, 404)
+
+    def test_failed_timeline_keeps_transcript_out_of_cache(self):
+        account = mock.Mock(is_authenticated=True, con=None)
+        metadata = {"eTag": "v1", "size": 10, "name": "standup.mp3"}
+
+        def run(timeline):
+            job = jobs.enqueue("item-1")
+            with mock.patch.object(views, "get_account", return_value=account), \
+                    mock.patch.object(jobs, "get_item_metadata", return_value=metadata), \
+                    mock.patch.object(jobs, "download_waveform", return_value=np.zeros(16000)), \
+                    mock.patch.object(jobs, "iter_speaker_segments", return_value=iter([SEGMENTS])), \
+                    mock.patch.object(jobs, "extract_tasks_rule_based", return_value=TASKS), \
+                    mock.patch.object(jobs, "sentiment_timeline", side_effect=timeline):
+                return jobs.run_job(job)
+
+        with self.assertLogs(jobs.logger, "WARNING"):
+            job = run(RuntimeError("model unavailable"))
+        self.assertEqual(job.status, TranscriptionJob.Status.DONE)
+        self.assertEqual((job.segments, job.sentiment_timeline), (SEGMENTS, {}))
+        self.assertIsNone(transcript_cache.lookup("item-1", "v1", 10))
+
+        timeline = {"window_seconds": 60, "windows": 1, "speakers": []}
+        run(lambda segments: timeline)
+        self.assertEqual(transcript_cache.lookup("item-1", "v1", 10).sentiment_timeline, timeline)
+
+
+def parse_events(messages):
+    """(event, id, data) for each SSE message, skipping retry/comment lines."""
+    events = []
+    for message in messages:
+        fields = dict(
+            line.split(": ", 1) for line in message.strip().splitlines() if not line.startswith(":")
+        )
+        if "event" in fields:
+            events.append((fields["event"], fields.get("id"), json.loads(fields["data"])))
+    return events
+
+
+class JobEventsTest(TestCase):
+    def running_job(self, segments=SEGMENTS, tasks=TASKS):
+        job = TranscriptionJob.objects.create(
+            item_id="item-1",
+            status=TranscriptionJob.Status.RUNNING,
+            stage="transcribing",
+            progress=40,
+        )
+        if segments or tasks:
+            TranscriptChunk.objects.create(
+                job=job, segments=segments, actionable_tasks=tasks,
+                segment_end=len(segments), task_end=len(tasks),
+            )
+        return job
+
+    def finish(self, job, **fields):
+        jobs._finish(job, SEGMENTS, TASKS, fields.get("timeline"))
+
+    def test_sends_new_segments_and_tasks(self):
+        job = self.running_job()
+        events = parse_events(itertools.islice(job_events.job_events(job.pk, poll_seconds=0), 4))
+
+        self.assertEqual([name for name, _, _ in events], ["segment", "task", "progress"])
+        self.assertEqual(events[0][2]["text"], SEGMENTS[0]["text"])
+        self.assertEqual(events[1][2], {"index": 0, "text": TASKS[0]})
+        self.assertEqual(events[2][2]["progress"], 40)
+        self.assertEqual(events[-1][1], "1:1")
+
+    def test_stream_saves_each_batch_once(self):
+        job = self.running_job(segments=[], tasks=[])
+        stream = jobs.TranscriptStream(job)
+        second = {**SEGMENTS[0], "start": 3.0, "end": 4.0, "text": "Nothing to do here."}
+        # A stand-in for the spaCy extractor: a task per line mentioning "Send"
+        def extract(text):
+            return [line for line in text.splitlines() if "Send" in line]
+
+        with mock.patch.object(jobs, "extract_tasks_rule_based", extract):
+            stream.extend(SEGMENTS)
+            stream.extend([second])
+
+        chunks = list(job.chunks.all())
+        self.assertEqual([c.segments for c in chunks], [SEGMENTS, [second]])
+        self.assertEqual([(c.segment_end, c.task_end) for c in chunks], [(1, 1), (2, 1)])
+        # A client that has seen the first batch only gets the second
+        events = parse_events(itertools.islice(job_events.job_events(job.pk, cursor="1:1", poll_seconds=0), 3))
+        self.assertEqual([(name, data.get("index")) for name, _, data in events], [("segment", 1), ("progress", None)])
+        self.assertEqual(events[-1][1], "2:1")
+
+    def test_resumes_from_cursor_and_ends_when_done(self):
+        job = self.running_job()
+        self.finish(job, timeline={"window_seconds": 60, "windows": 1, "speakers": []})
+        self.assertFalse(job.chunks.exists())
+
+        events = parse_events(job_events.job_events(job.pk, cursor="1:1", poll_seconds=0))
+        self.assertEqual([name for name, _, _ in events], ["done"])
+        self.assertEqual(events[0][2]["status"], "done")
+        self.assertEqual(events[0][2]["sentiment_timeline"]["windows"], 1)
+
+    def test_reset_when_job_starts_over(self):
+        job = self.running_job(segments=[], tasks=[])
+        events = parse_events(itertools.islice(job_events.job_events(job.pk, cursor="5:2", poll_seconds=0), 3))
+        self.assertEqual([name for name, _, _ in events], ["reset", "progress"])
+        self.assertEqual(events[-1][1], "0:0")
+
+    def test_requeue_drops_partial_results(self):
+        job = self.running_job()
+        TranscriptionJob.objects.filter(pk=job.pk).update(
+            updated_at=timezone.now() - timedelta(hours=2)
+        )
+        self.assertEqual(jobs.requeue_stale(timedelta(hours=1)), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, TranscriptionJob.Status.QUEUED)
+        self.assertFalse(job.chunks.exists())
+
+    def test_events_endpoint(self):
+        job = self.running_job()
+        self.finish(job)
+        with signed_in(None):
+            response = self.client.get(reverse("transcription_job_events", args=[job.public_id]))
+        self.assertEqual(response.status_code, 401)
+        with signed_in():
+            response = self.client.get(reverse("transcription_job_events", args=[job.public_id]))
+            self.assertEqual(response["Content-Type"], "text/event-stream")
+            body = b"".join(response.streaming_content).decode()
+        names = [name for name, _, _ in parse_events(body.split("\n\n"))]
+        self.assertEqual(names, ["segment", "task", "done"])
+
+    async def test_events_endpoint_under_asgi(self):
+        job = await sync_to_async(self.running_job)()
+        await sync_to_async(self.finish)(job)
+        with signed_in():
+            response = await self.async_client.get(reverse("transcription_job_events", args=[job.public_id]))
+        self.assertTrue(response.is_async)
+        body = "".join([chunk.decode() async for chunk in response.streaming_content])
+        names = [name for name, _, _ in parse_events(body.split("\n\n"))]
+        self.assertEqual(names, ["segment", "task", "done"])
+
+
+class TranscriptCacheTest(TestCase):
+    def test_hit_requires_same_file_version(self):
+        transcript_cache.store("item-1", "etag-1", 1000, "standup.mp3", SEGMENTS, TASKS)
+
+        entry = transcript_cache.lookup("item-1", "etag-1", 1000)
+        self.assertEqual(entry.segments, SEGMENTS)
+        self.assertEqual(entry.actionable_tasks, TASKS)
+        self.assertIsNone(transcript_cache.lookup("item-1", "etag-2", 1000))
+        self.assertIsNone(transcript_cache.lookup("item-1", "etag-1", 2000))
+
+    def test_stores_sentiment_timeline(self):
+        timeline = {"window_seconds": 60, "windows": 1, "speakers": []}
+        transcript_cache.store("item-1", "etag-1", 1000, "standup.mp3", SEGMENTS, TASKS, timeline)
+        self.assertEqual(transcript_cache.lookup("item-1", "etag-1", 1000).sentiment_timeline, timeline)
+
+    def test_concurrent_store_keeps_the_transaction_usable(self):
+        create = CachedTranscript.objects.create
+
+        def create_twice(**fields):
+            # Another worker inserts the same transcript first
+            create(**fields)
+            return create(**fields)
+
+        with mock.patch.object(CachedTranscript.objects, "create", create_twice):
+            self.assertIsNone(transcript_cache.store("item-1", "etag-1", 1000, "standup.mp3", SEGMENTS, TASKS))
+        # Only the failed insert's savepoint was rolled back
+        self.assertIsNotNone(transcript_cache.store("item-1", "etag-1", 1000, "standup.mp3", SEGMENTS, TASKS))
+        self.assertEqual(transcript_cache.lookup("item-1", "etag-1", 1000).segments, SEGMENTS)
+
+    def test_new_version_replaces_old_one(self):
+        transcript_cache.store("item-1", "etag-1", 1000, "standup.mp3", SEGMENTS, TASKS)
+        transcript_cache.store("item-1", "etag-2", 1200, "standup.mp3", SEGMENTS, TASKS)
+        self.assertEqual(CachedTranscript.objects.filter(item_id="item-1").count(), 1)
+        self.assertIsNotNone(transcript_cache.lookup("item-1", "etag-2", 1200))
+
+    def test_model_change_invalidates(self):
+        transcript_cache.store("item-1", "etag-1", 1000, "standup.mp3", SEGMENTS, TASKS)
+        CachedTranscript.objects.update(model_version="asr=old-model")
+        self.assertIsNone(transcript_cache.lookup("item-1", "etag-1", 1000))
+
+    def test_evicts_least_recently_viewed(self):
+        with override_settings(TRANSCRIPT_CACHE_MAX_BYTES=10 ** 9):
+            for i in range(3):
+                transcript_cache.store(f"item-{i}", "etag", 1000, "", SEGMENTS, TASKS)
+        transcript_cache.lookup("item-0", "etag", 1000)
+
+        entry_size = CachedTranscript.objects.first().size_bytes
+        evicted = transcript_cache.evict(max_bytes=2 * entry_size)
+        self.assertEqual(evicted, 1)
+        remaining = set(CachedTranscript.objects.values_list("item_id", flat=True))
+        self.assertEqual(remaining, {"item-0", "item-2"})
+
+
+class GraphDownloadTest(SimpleTestCase):
+    def test_item_metadata(self):
+        routes = {
+            "/v1.0/me/drive/items/abc": (
+                200, {}, {"id": "abc", "name": "standup.mp3", "size": 1234, "eTag": "\"{E1},2\""}
+            ),
+        }
+        with FakeGraphServer(routes) as graph:
+            metadata = get_item_metadata(requests.Session(), "abc", base_url=graph.url + "/v1.0")
+        self.assertEqual(metadata["size"], 1234)
+        self.assertEqual(metadata["eTag"], "\"{E1},2\"")
+
+    @unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg is required to decode audio")
+    def test_streaming_download_and_decode(self):
+        audio = make_wav(seconds=1.5)
+        routes = {
+            # Graph redirects /content to a pre-authenticated download URL
+            "/v1.0/me/drive/items/abc/content": (
+                302, {"Location": "{server}/download/abc"}, b""
+            ),
+            "/download/abc": (200, {"Content-Type": "audio/wav"}, audio),
+        }
+        reported = []
+        with FakeGraphServer(routes) as graph:
+            waveform = jobs.download_waveform(
+                requests.Session(), "abc", len(audio),
+                lambda stage, percent: reported.append(percent),
+                base_url=graph.url + "/v1.0",
+            )
+
+        # 1.5 s resampled to 16 kHz mono, mapped from a temp file
+        self.assertIsInstance(waveform, np.memmap)
+        self.assertAlmostEqual(len(waveform) / 16000, 1.5, delta=0.05)
+        self.assertLessEqual(abs(waveform).max(), 1.0)
+        self.assertEqual(reported[-1], jobs.DOWNLOAD_PERCENT)
+
+
+class WaveformTest(SimpleTestCase):
+    def test_mapped_samples_and_views(self):
+        samples = np.linspace(-1, 1, 40000, dtype=np.float32)
+        waveform = waveform_file.map_pcm([samples[:15000].tobytes(), samples[15000:].tobytes()])
+
+        self.assertIsInstance(waveform, np.memmap)
+        np.testing.assert_array_equal(waveform, samples)
+        # Turns are sliced without copying
+        self.assertTrue(np.shares_memory(waveform[16000:32000], waveform))
+        self.assertEqual(len(waveform_file.map_pcm([])), 0)
+
+    @unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg is required to decode audio")
+    def test_decode_file(self):
+        with tempfile.NamedTemporaryFile(suffix=".wav") as f:
+            f.write(make_wav(seconds=0.5))
+            f.flush()
+            waveform = waveform_file.decode_file(f.name)
+        self.assertAlmostEqual(len(waveform) / 16000, 0.5, delta=0.05)
+        self.assertEqual(waveform.dtype, np.float32)
+
+
+class ChunkedDiarizationTest(SimpleTestCase):
+    def test_windows_keep_every_instant_once(self):
+        windows = diarization_windows(2500, window=1200, overlap=60)
+        self.assertEqual([w[:2] for w in windows], [(0, 1200), (1140, 2340), (2280, 2500)])
+        self.assertEqual(windows[0][2], 0)
+        for previous, current in zip(windows, windows[1:]):
+            self.assertEqual(previous[3], current[2])
+            self.assertTrue(current[0] < current[2] < previous[1])
+        self.assertEqual(windows[-1][3], 2500)
+        self.assertEqual(diarization_windows(600, 1200, 60), [(0.0, 600, 0.0, 600)])
+
+    def test_link_speakers(self):
+        rng = np.random.default_rng(0)
+        alice, bob = rng.normal(size=(2, 16))
+        embeddings = np.stack([
+            alice + rng.normal(0, 0.05, 16),
+            bob + rng.normal(0, 0.05, 16),
+            bob + rng.normal(0, 0.05, 16),
+            np.full(16, np.nan),  # too little speech for an embedding
+            alice + rng.normal(0, 0.05, 16),
+        ])
+        labels = link_speakers(embeddings, threshold=0.5)
+        self.assertEqual(labels[0], labels[4])
+        self.assertEqual(labels[1], labels[2])
+        self.assertNotEqual(labels[0], labels[1])
+        self.assertIn(labels[3], (labels[0], labels[1]))
+
+    def test_speakers_of_one_window_are_never_linked(self):
+        rng = np.random.default_rng(1)
+        alice = rng.normal(size=16)
+        # Two similar voices Pyannote told apart in window 0, then one of
+        # them (or someone like them) again in window 1
+        embeddings = np.stack([
+            alice + rng.normal(0, 0.05, 16),
+            alice + rng.normal(0, 0.05, 16),
+            alice + rng.normal(0, 0.05, 16),
+            np.full(16, np.nan),
+        ])
+        groups = [0, 0, 1, 1]
+        self.assertEqual(len(set(link_speakers(embeddings, threshold=0.5))), 1)
+        labels = link_speakers(embeddings, threshold=0.5, groups=groups)
+        self.assertNotEqual(labels[0], labels[1])
+        self.assertIn(labels[2], (labels[0], labels[1]))
+        # The embedding-less speaker takes the cluster its window left free
+        self.assertEqual({labels[2], labels[3]}, {labels[0], labels[1]})
+
+    def test_stitch_windows_links_and_joins_turns(self):
+        alice, bob = np.eye(2)
+        windows = [
+            (0, 90, [("A", 0, 50), ("B", 50, 100)], {"A": alice, "B": bob}),
+            # The window diarizer numbers its speakers independently
+            (90, 200, [("A", 80, 100), ("B", 100, 150), ("A", 150, 200)], {"A": bob, "B": alice}),
+        ]
+        self.assertEqual(stitch_windows(windows, threshold=0.5), [
+            ("SPEAKER_00", 0, 50),
+            ("SPEAKER_01", 50, 100),
+            ("SPEAKER_00", 100, 150),
+            ("SPEAKER_01", 150, 200),
+        ])
+
+
+class WordAlignmentTest(SimpleTestCase):
+    def test_overlapping_turns_go_to_the_larger_overlap(self):
+        turns = [("B", 1.5, 4.0), ("A", 0.0, 2.0)]
+        words = [(0.2, 0.8, " Hello"), (1.0, 1.8, " there,"), (1.9, 2.5, " hi"), (2.5, 3.0, " back.")]
+        self.assertEqual(assign_words_to_speakers(words, turns), [
+            {"speaker": "A", "start": 0.2, "end": 1.8, "text": "Hello there,"},
+            {"speaker": "B", "start": 1.9, "end": 3.0, "text": "hi back."},
+        ])
+
+    def test_words_in_gaps_go_to_the_nearest_turn(self):
+        turns = [("A", 0.0, 1.0), ("B", 3.0, 4.0)]
+        words = [(1.2, 1.4, " um"), (2.6, 2.8, " So"), (5.0, 5.5, " bye")]
+        self.assertEqual(
+            [(s["speaker"], s["text"]) for s in assign_words_to_speakers(words, turns)],
+            [("A", "um"), ("B", "So bye")],
+        )
+        self.assertEqual(assign_words_to_speakers(words, []), [])
+
+    def test_word_timestamps(self):
+        result = {"chunks": [
+            {"text": " Hello", "timestamp": (0.0, 0.4)},
+            {"text": " lost", "timestamp": (None, 0.6)},
+            {"text": " world", "timestamp": (0.7, None)},  # last word of the chunk
+        ]}
+        self.assertEqual(_word_timestamps(result, duration=1.5, offset=10.0), [
+            (10.0, 10.4, " Hello"),
+            (10.7, 11.5, " world"),
+        ])
+        self.assertEqual(_word_timestamps({"text": ""}, duration=1.0), [])
+
+
+class FlakyASR:
+    """Fails every batch, and every slice that is all zeros."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, inputs, batch_size=None, **kwargs):
+        self.calls.append(len(inputs) if isinstance(inputs, list) else 1)
+        if isinstance(inputs, list):
+            raise RuntimeError("batch failed")
+        if not inputs["raw"].any():
+            raise RuntimeError("bad slice")
+        return {"text": f" {len(inputs['raw'])} samples "}
+
+
+class BatchRetryTest(SimpleTestCase):
+    def test_failed_batch_is_retried_slice_by_slice(self):
+        asr = FlakyASR()
+        group = [np.ones(100, dtype=np.float32), np.zeros(50, dtype=np.float32), np.ones(30, dtype=np.float32)]
+        texts = _transcribe_batch(asr, group, batch_size=3)
+        # Only the bad slice loses its text
+        self.assertEqual(texts, ["100 samples", "", "30 samples"])
+        self.assertEqual(asr.calls, [3, 1, 1, 1])
+
+
+class StubDiarizer:
+    """Pyannote stand-in: alternating two-second turns of A and B, whatever the audio."""
+
+    class Segment:
+        def __init__(self, start, end):
+            self.start, self.end = start, end
+
+    class Annotation:
+        def __init__(self, turns):
+            self.turns = turns
+
+        def itertracks(self, yield_label=False):
+            for i, (label, start, end) in enumerate(self.turns):
+                yield StubDiarizer.Segment(start, end), i, label
+
+    def __init__(self):
+        self.threads = []
+
+    def __call__(self, inputs, **kwargs):
+        self.threads.append(threading.current_thread().name)
+        seconds = inputs["waveform"].shape[-1] / inputs["sample_rate"]
+        turns = [("AB"[int(speaker[-1])], start, end)
+                 for speaker, start, end in alternating_turns(seconds, turn_seconds=2.0)]
+        return self.Annotation(turns)
+
+
+class PipelinedTranscriptionTest(SimpleTestCase):
+    @unittest.skipUnless(importlib.util.find_spec("torch"), "torch is required to hand audio to the diarizer")
+    def test_diarizes_alongside_asr_and_aligns(self):
+        diarizer = StubDiarizer()
+        reported = []
+        with model_registry.override("diarization", diarizer), model_registry.override("asr", StandInASR()):
+            segments = transcribe_pipelined(
+                None, batch_size=4, waveform=synthetic_speech(8.0),
+                progress=lambda stage, fraction: reported.append((stage, fraction)),
+            )
+
+        # Diarization ran on the background thread
+        self.assertEqual(len(diarizer.threads), 1)
+        self.assertTrue(diarizer.threads[0].startswith("diarization"))
+        self.assertEqual({segment["speaker"] for segment in segments}, {"A", "B"})
+        for segment in segments:
+            turn = int(segment["start"] // 2)
+            self.assertEqual(segment["speaker"], "AB"[turn % 2])
+            self.assertTrue(segment["text"])
+        self.assertEqual(reported[-1], ("done", 1.0))
+
+
+class StubAccount:
+    username = "user@example.com"
+    con = None
+
+
+class AsyncTranscribeTest(TestCase):
+    async def test_requires_login(self):
+        with signed_in(None):
+            response = await self.async_client.get(reverse("transcribe_recording_async"), {"item_id": "item-1"})
+        self.assertRedirects(response, reverse("outlook_login"), fetch_redirect_response=False)
+
+    async def test_serves_cached_transcript_or_enqueues(self):
+        metadata = {"eTag": "v1", "size": 10, "name": "standup.mp3"}
+        with signed_in(), mock.patch.object(views, "get_item_metadata", return_value=metadata):
+            response = await self.async_client.get(reverse("transcribe_recording_async"), {"item_id": "item-1"})
+            job = await TranscriptionJob.objects.aget(item_id="item-1")
+            self.assertRedirects(response, reverse("transcription_job", args=[job.public_id]), fetch_redirect_response=False)
+
+            await sync_to_async(transcript_cache.store)("item-2", "v1", 10, "standup.mp3", SEGMENTS, TASKS)
+            response = await self.async_client.get(reverse("transcribe_recording_async"), {"item_id": "item-2"})
+        self.assertContains(response, "Send the budget report.")
+
+
+class DashboardDataTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = []
+
+    def slow_fetcher(self, name, result):
+        def fetch(account):
+            self.calls.append(name)
+            time.sleep(0.2)
+            return result
+        return fetch
+
+    def fetchers(self):
+        return {
+            "events": self.slow_fetcher("events", [{"subject": "Standup"}]),
+            "recordings": self.slow_fetcher("recordings", [{"name": "a.mp3"}]),
+        }
+
+    def test_fetches_concurrently(self):
+        # Neither fetcher returns until both have started; run one after the
+        # other, the first one's wait would time out
+        entered = threading.Barrier(2, timeout=5)
+
+        def fetcher(result):
+            def fetch(account):
+                entered.wait()
+                return result
+            return fetch
+
+        fetchers = {"events": fetcher([{"subject": "Standup"}]), "recordings": fetcher([{"name": "a.mp3"}])}
+        data = dashboard_data.load_dashboard(StubAccount(), fetchers=fetchers)
+
+        self.assertEqual(data["events"], [{"subject": "Standup"}])
+        self.assertEqual(data["recordings"], [{"name": "a.mp3"}])
+
+    def test_cached_until_refresh(self):
+        account = StubAccount()
+        dashboard_data.load_dashboard(account, fetchers=self.fetchers())
+        dashboard_data.load_dashboard(account, fetchers=self.fetchers())
+        self.assertEqual(sorted(self.calls), ["events", "recordings"])
+
+        dashboard_data.load_dashboard(account, refresh=True, fetchers=self.fetchers())
+        self.assertEqual(len(self.calls), 4)
+
+    @override_settings(OUTLOOK_DASHBOARD_CACHE_TTL=1)
+    def test_expires_after_ttl(self):
+        account = StubAccount()
+        dashboard_data.load_dashboard(account, fetchers=self.fetchers())
+        time.sleep(1.1)
+        dashboard_data.load_dashboard(account, fetchers=self.fetchers())
+        self.assertEqual(len(self.calls), 4)
+
+    def test_invalidate(self):
+        account = StubAccount()
+        fetchers = self.fetchers()
+        dashboard_data.load_dashboard(account, fetchers=fetchers)
+        dashboard_data.invalidate(account, names=fetchers)
+        dashboard_data.load_dashboard(account, fetchers=fetchers)
+        self.assertEqual(len(self.calls), 4)
+
+
+class RecordingIndexTest(TestCase):
+    def setUp(self):
+        self.drive = FakeOneDrive(page_size=2)
+        self.drive.put("r1", "standup.mp3", size=300, modified="2026-01-01T10:00:00Z")
+        self.drive.put("r2", "retro.mp3", size=100, modified="2026-01-03T10:00:00Z")
+        self.drive.put("r3", "planning.mp3", size=200, modified="2026-01-02T10:00:00Z")
+        self.drive.put("other", "notes.docx", parent="root")
+
+    def sync(self, graph):
+        return recording_index.sync(requests.Session(), base_url=graph.url + "/v1.0")
+
+    def test_full_then_incremental_sync(self):
+        with FakeGraphServer(self.drive.routes()) as graph:
+            stats = self.sync(graph)
+            self.assertTrue(stats["full"])
+            self.assertEqual(stats["pages"], 3)
+            self.assertEqual(
+                set(Recording.objects.values_list("item_id", flat=True)), {"r1", "r2", "r3"}
+            )
+
+            # Only the changed items are transferred
+            self.drive.put("r2", "retro-v2.mp3", size=150)
+            self.drive.delete("r3")
+            self.drive.put("r4", "demo.mp3")
+            stats = self.sync(graph)
+
+        self.assertFalse(stats["full"])
+        self.assertEqual(stats["pages"], 2)
+        self.assertEqual((stats["updated"], stats["removed"]), (2, 1))
+        r2 = Recording.objects.get(item_id="r2")
+        self.assertEqual((r2.name, r2.size, r2.etag), ("retro-v2.mp3", 150, '"r2,2"'))
+        self.assertEqual(
+            set(Recording.objects.values_list("item_id", flat=True)), {"r1", "r2", "r4"}
+        )
+
+    def test_removals_are_deleted_a_page_at_a_time(self):
+        drive = FakeOneDrive(page_size=20)
+        drive.put("r1", "standup.mp3")
+        for i in range(10):
+            drive.put(f"doc-{i}", f"notes-{i}.docx", parent="root")
+        with FakeGraphServer(drive.routes()) as graph:
+            with CaptureQueriesContext(connection) as queries:
+                stats = self.sync(graph)
+            Recording.objects.create(item_id="doc-0", name="notes-0.docx")
+            Recording.objects.create(item_id="doc-1", name="notes-1.docx")
+            drive.put("doc-0", "notes-0.docx", parent="root")
+            drive.delete("doc-1")
+            incremental = self.sync(graph)
+
+        deletes = [q["sql"] for q in queries.captured_queries if q["sql"].startswith("DELETE")]
+        # One for the page, one for whatever the full sync didn't see
+        self.assertLessEqual(len(deletes), 2)
+        self.assertEqual((stats["pages"], stats["updated"]), (1, 1))
+        self.assertEqual((incremental["updated"], incremental["removed"]), (0, 2))
+        self.assertEqual(list(Recording.objects.values_list("item_id", flat=True)), ["r1"])
+
+    def test_pages_are_fetched_outside_transactions(self):
+        # TestCase's own atomic blocks are open throughout
+        outer = len(connection.atomic_blocks)
+        depths = []
+        get = recording_index._get
+
+        def recording_get(con, url, params=None):
+            depths.append(len(connection.atomic_blocks) - outer)
+            return get(con, url, params)
+
+        routes = self.drive.routes()
+        delta = routes["/v1.0/me/drive/root/delta"]
+        with FakeGraphServer(routes) as graph, \
+                mock.patch.object(recording_index, "_get", recording_get):
+            self.sync(graph)
+            link = DeltaSyncState.objects.get().delta_link
+            self.drive.put("r4", "demo.mp3")
+            self.drive.put("r5", "review.mp3")
+            self.drive.put("r6", "kickoff.mp3")
+
+            # The connection drops after the first page of changes
+            routes["/v1.0/me/drive/root/delta"] = (
+                lambda query: (500, {}, {}) if "skip" in query else delta(query)
+            )
+            with self.assertRaises(requests.HTTPError):
+                self.sync(graph)
+            # The applied page is kept, and the next sync replays from the old link
+            self.assertEqual(DeltaSyncState.objects.get().delta_link, link)
+            self.assertEqual(Recording.objects.filter(item_id__in=["r4", "r5", "r6"]).count(), 2)
+
+            routes["/v1.0/me/drive/root/delta"] = delta
+            self.sync(graph)
+
+        self.assertEqual(set(depths), {0})
+        self.assertEqual(Recording.objects.count(), 6)
+
+    def test_moved_out_of_folder_is_removed(self):
+        with FakeGraphServer(self.drive.routes()) as graph:
+            self.sync(graph)
+            self.drive.put("r1", "standup.mp3", parent="root")
+            self.sync(graph)
+        self.assertFalse(Recording.objects.filter(item_id="r1").exists())
+
+    def test_expired_delta_link_resyncs(self):
+        with FakeGraphServer(self.drive.routes()) as graph:
+            self.sync(graph)
+            Recording.objects.create(item_id="ghost", name="ghost.mp3")
+            self.drive.expired = True
+            stats = self.sync(graph)
+
+        self.assertTrue(stats["full"])
+        self.assertFalse(Recording.objects.filter(item_id="ghost").exists())
+        self.assertTrue(DeltaSyncState.objects.get().delta_link)
+
+    def test_sorting(self):
+        with FakeGraphServer(self.drive.routes()) as graph:
+            self.sync(graph)
+        names = lambda sort: [r.name for r in recording_index.list_recordings(sort)]
+        self.assertEqual(names("-modified"), ["retro.mp3", "planning.mp3", "standup.mp3"])
+        self.assertEqual(names("name"), ["planning.mp3", "retro.mp3", "standup.mp3"])
+        self.assertEqual(names("-size"), ["standup.mp3", "planning.mp3", "retro.mp3"])
+        self.assertEqual(names("bogus"), names("-modified"))
+
+
+def spacy_model_available():
+    if importlib.util.find_spec("spacy") is None:
+        return False
+    import spacy.util
+
+    return spacy.util.is_package(task_extraction.SPACY_MODEL)
+
+
+class TaskExtractionTest(SimpleTestCase):
+    def test_combined_pattern_matches_original_list(self):
+        sentences = [
+            seg["text"] for seg in REFERENCE_SEGMENTS
+        ] + [
+            "schedule it", "We rescheduled.", "Lets go", "action-items later",
+            "SPEAKER_00: Send the report.", "You shouldn't worry", "need tolerance",
+        ]
+        for text in sentences:
+            expected = any(p.search(text) for p in _REFERENCE_PATTERNS)
+            self.assertEqual(bool(task_extraction.TRIGGER_PATTERN.search(text)), expected, text)
+
+    def test_explicit_process_count_is_capped_by_turns(self):
+        self.assertEqual(task_extraction._processes_for(3, 8), 3)
+        self.assertEqual(task_extraction._processes_for(0, None), 1)
+
+    @unittest.skipUnless(spacy_model_available(), "spaCy and en_core_web_sm are required")
+    def test_matches_original_extractor(self):
+        import spacy
+
+        text = build_full_text(REFERENCE_SEGMENTS)
+        expected = reference_extract(spacy.load(task_extraction.SPACY_MODEL), text)
+        self.assertEqual(task_extraction.extract_tasks_rule_based(text), expected)
+        self.assertEqual(
+            task_extraction.extract_tasks(text.splitlines(), n_process=2, batch_size=4), expected
+        )
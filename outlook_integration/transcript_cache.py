@@ -0,0 +1,93 @@
+# outlook_integration/transcript_cache.py
+"""
+Database cache of finished transcripts.
+
+A transcript is looked up by the recording's OneDrive item id, eTag and size
+plus ``model_version()``, so it is invalidated automatically when the file
+changes or when the ASR, diarization or task-extraction models change. The
+total stored size is capped by ``TRANSCRIPT_CACHE_MAX_BYTES``; the least
+recently viewed transcripts are evicted first.
+"""
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from sentiment.inference import MODEL as SENTIMENT_MODEL
+from transcription.transcribe_with_speaker_labels_hf import (
+    ASR_MODEL,
+    DIARIZATION_MODEL,
+    TRANSCRIPTION_MODE,
+)
+
+from .models import CachedTranscript
+from .task_extraction import SPACY_MODEL
+
+
+def model_version() -> str:
+    """Identify the models and mode that produce a transcript."""
+    return (
+        f"asr={ASR_MODEL};diarization={DIARIZATION_MODEL};mode={TRANSCRIPTION_MODE};"
+        f"tasks={SPACY_MODEL};sentiment={SENTIMENT_MODEL}"
+    )
+
+
+def lookup(item_id: str, etag: str, size: int):
+    """Return the cached transcript for this version of the recording, or ``None``."""
+    entry = CachedTranscript.objects.filter(
+        item_id=item_id, etag=etag or "", size=size or 0, model_version=model_version()
+    ).first()
+    if entry is not None:
+        CachedTranscript.objects.filter(pk=entry.pk).update(last_accessed_at=timezone.now())
+    return entry
+
+
+def store(item_id, etag, size, recording_name, segments, actionable_tasks, sentiment_timeline=None):
+    """
+    Save a finished transcript, replacing any older version stored for the
+    same recording, then evict old entries if the cache is over its limit.
+    """
+    sentiment_timeline = sentiment_timeline or {}
+    size_bytes = sum(len(json.dumps(data)) for data in (segments, actionable_tasks, sentiment_timeline))
+    with transaction.atomic():
+        # Older versions of the file, or results from other models, are stale
+        CachedTranscript.objects.filter(item_id=item_id).delete()
+        try:
+            # A savepoint, so a failed insert doesn't abort the outer
+            # transaction on PostgreSQL
+            with transaction.atomic():
+                entry = CachedTranscript.objects.create(
+                    item_id=item_id,
+                    etag=etag or "",
+                    size=size or 0,
+                    model_version=model_version(),
+                    recording_name=recording_name,
+                    segments=segments,
+                    actionable_tasks=actionable_tasks,
+                    sentiment_timeline=sentiment_timeline,
+                    size_bytes=size_bytes,
+                )
+        except IntegrityError:
+            # Another worker stored the same transcript concurrently
+            entry = None
+    evict(settings.TRANSCRIPT_CACHE_MAX_BYTES)
+    return entry
+
+
+def evict(max_bytes: int) -> int:
+    """Delete least recently viewed transcripts until at most ``max_bytes`` remain."""
+    total = CachedTranscript.objects.aggregate(total=Sum("size_bytes"))["total"] or 0
+    evicted = 0
+    if total <= max_bytes:
+        return evicted
+    for pk, size_bytes in CachedTranscript.objects.order_by("last_accessed_at").values_list(
+        "pk", "size_bytes"
+    ):
+        if total <= max_bytes:
+            break
+        CachedTranscript.objects.filter(pk=pk).delete()
+        total -= size_bytes
+        evicted += 1
+    return evicted
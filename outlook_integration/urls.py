@@ -7,5 +7,9 @@ urlpatterns = [
     path("callback/", views.outlook_callback, name="outlook_callback"),
     path("dashboard/", views.outlook_dashboard, name="outlook_dashboard"),
     path("transcribe/", views.transcribe_recording, name="transcribe_recording"),
+    path("async/transcribe/", views.transcribe_recording_async, name="transcribe_recording_async"),
+    path("jobs/<uuid:job_id>/", views.transcription_job, name="transcription_job"),
+    path("jobs/<uuid:job_id>/status/", views.transcription_job_status, name="transcription_job_status"),
+    path("jobs/<uuid:job_id>/events/", views.transcription_job_events, name="transcription_job_events"),
     path("logout/", views.outlook_logout, name="outlook_logout"),
 ]
@@ -1,21 +1,24 @@
 # outlook_integration/views.py
 
 import os
-import tempfile
-from datetime import datetime, timedelta, timezone
+import threading
 
+from asgiref.sync import sync_to_async
 from dotenv import load_dotenv, find_dotenv
-from django.shortcuts import render, redirect
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import Paginator
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render, redirect
 from O365 import Account, FileSystemTokenBackend
-from requests.exceptions import HTTPError
 
-# Import your transcription function here; adjust the path as needed
-from transcription.transcribe_with_speaker_labels_hf import (
-    transcribe_with_speaker_labels,
-)
+from XIRCLS import executors
+from XIRCLS.executors import ExecutorBusy
 
-# Import our new task extractor
-from .task_extraction import extract_tasks_rule_based
+# Transcription and task extraction run in the background job worker
+from . import dashboard_data, job_events, jobs, recording_index, transcript_cache
+from .graph import get_item_metadata
+from .models import TranscriptionJob
 
 load_dotenv(find_dotenv())
 
@@ -27,19 +30,40 @@ SCOPES = [
     "https://graph.microsoft.com/Files.Read.All",
 ]
 REDIRECT_URI = "http://localhost:8000/outlook/callback/"  # must exactly match your Azure app registration
+TOKEN_PATH = "."
+TOKEN_FILENAME = "o365_token.txt"
+
+# One Account per token store, reused across requests so its HTTP session
+# (connection pool) and the token loaded in memory are kept
+_accounts = {}
+_accounts_lock = threading.Lock()
 
 
 def get_account():
-    creds = (CLIENT_ID, CLIENT_SECRET)
-    token_backend = FileSystemTokenBackend(
-        token_path=".", token_filename="o365_token.txt"
-    )
-    return Account(
-        creds,
-        tenant_id="common",
-        token_backend=token_backend,
-        auth_flow_type="authorization",
-    )
+    key = os.path.join(TOKEN_PATH, TOKEN_FILENAME)
+    with _accounts_lock:
+        account = _accounts.get(key)
+        if account is None:
+            creds = (CLIENT_ID, CLIENT_SECRET)
+            token_backend = FileSystemTokenBackend(
+                token_path=TOKEN_PATH, token_filename=TOKEN_FILENAME
+            )
+            account = Account(
+                creds,
+                tenant_id="common",
+                token_backend=token_backend,
+                auth_flow_type="authorization",
+            )
+            _accounts[key] = account
+        return account
+
+
+def forget_account():
+    """Drop the cached Account, closing its HTTP session."""
+    with _accounts_lock:
+        account = _accounts.pop(os.path.join(TOKEN_PATH, TOKEN_FILENAME), None)
+    if account is not None and account.con.session is not None:
+        account.con.session.close()
 
 
 def outlook_index(request):
@@ -79,74 +103,49 @@ def outlook_dashboard(request):
     if not account.is_authenticated:
         return redirect("outlook_login")
 
-    # 1) Fetch calendar events for the next 30 days
-    schedule = account.schedule()
-    calendar = schedule.get_default_calendar()
-
-    now = datetime.now(timezone.utc)
-    future = now + timedelta(days=30)
-    q = (
-        calendar.new_query("start")
-        .greater_equal(now)
-        .chain("and")
-        .on_attribute("end")
-        .less_equal(future)
+    # Calendar events are fetched while the recordings index is synced, and
+    # both are cached; ?refresh=1 does both again
+    data = dashboard_data.load_dashboard(
+        account, refresh=request.GET.get("refresh") == "1"
     )
-    events_raw = calendar.get_events(query=q, include_recurring=True)
-
-    events = []
-    for ev in events_raw:
-        events.append(
-            {
-                "subject": ev.subject,
-                "start": ev.start,
-                "end": ev.end,
-                "online_meeting_url": ev.online_meeting_url,
-                "attachments": [
-                    {
-                        "name": att.name,
-                        "content_url": getattr(att, "content_url", None),
-                        "size": getattr(att, "size", None),
-                    }
-                    for att in getattr(ev, "attachments", [])
-                ],
-            }
-        )
 
-    # 2) Try fetching OneDrive "Recordings" folder by name
-    recordings = []
-    try:
-        storage = account.storage()
-        drive = storage.get_default_drive()
-        root_folder = drive.get_root_folder()
-        for item in root_folder.get_items():
-            if item.is_folder and item.name.lower() == "recordings":
-                for rec in item.get_items():
-                    recordings.append(
-                        {
-                            "name": rec.name,
-                            "item_id": rec.object_id,  # pass this to transcribe
-                            "web_url": rec.web_url,
-                        }
-                    )
-                break
-    except HTTPError:
-        recordings = []
+    # Recordings are read from the local index
+    sort = request.GET.get("sort", recording_index.DEFAULT_SORT)
+    if sort not in recording_index.SORT_FIELDS:
+        sort = recording_index.DEFAULT_SORT
+    paginator = Paginator(
+        recording_index.list_recordings(sort), settings.OUTLOOK_RECORDINGS_PAGE_SIZE
+    )
+    recordings = paginator.get_page(request.GET.get("page"))
 
     return render(
         request,
         "outlook_integration/dashboard.html",
         {
-            "events": events,
+            "events": data["events"],
             "recordings": recordings,
+            "sort": sort,
+            "sort_options": [
+                ("-modified", "Newest"),
+                ("modified", "Oldest"),
+                ("name", "Name"),
+                ("-size", "Largest"),
+            ],
         },
     )
 
 
+def _authenticated_account():
+    account = get_account()
+    return account if account.is_authenticated else None
+
+
 def transcribe_recording(request):
     """
-    Download the specified recording to a temp file, run speaker-aware transcription,
-    then extract action items from the joined transcript.
+    Show the stored transcript if this version of the recording has been
+    transcribed before. Otherwise queue it for speaker-aware transcription
+    and task extraction, then send the user to the job page, which shows
+    progress until the background worker has finished.
     """
     account = get_account()
     if not account.is_authenticated:
@@ -156,53 +155,113 @@ def transcribe_recording(request):
     if not item_id:
         return redirect("outlook_dashboard")
 
-    # Step 1) Retrieve and download the file from OneDrive
-    storage = account.storage()
-    drive = storage.get_default_drive()
-    item = drive.get_item(item_id)
-
-    tmp_dir = tempfile.mkdtemp()
-    filename = item.name
-    success = item.download(to_path=tmp_dir, name=filename)
-    if not success:
+    # A cheap metadata call identifies the file version (eTag + size)
+    metadata = get_item_metadata(account.con, item_id)
+    cached = transcript_cache.lookup(item_id, metadata.get("eTag"), metadata.get("size"))
+    if cached is not None:
         return render(
             request,
-            "outlook_integration/transcription_error.html",
-            {"message": "Could not download recording."},
+            "outlook_integration/transcription.html",
+            {
+                "segments": cached.segments,
+                "recording_name": cached.recording_name or metadata.get("name", ""),
+                "actionable_tasks": cached.actionable_tasks,
+                "sentiment_timeline": cached.sentiment_timeline,
+            },
         )
 
-    file_path = os.path.join(tmp_dir, filename)
+    job = jobs.enqueue(item_id)
+    return redirect("transcription_job", job_id=job.public_id)
+
 
-    # Step 2) Run Hugging Face + PyAnnote transcription
-    segments = transcribe_with_speaker_labels(mp3_path=file_path)
+async def transcribe_recording_async(request):
+    """
+    Async ``transcribe_recording`` for ASGI servers: the Graph metadata call
+    (and loading the token) is awaited on the I/O pool and the database work
+    runs through ``sync_to_async``, so no worker is held while Graph answers.
+    """
+    item_id = request.GET.get("item_id")
+    try:
+        account = await executors.run("io", _authenticated_account)
+        if account is None:
+            return redirect("outlook_login")
+        if not item_id:
+            return redirect("outlook_dashboard")
+        metadata = await executors.run("io", get_item_metadata, account.con, item_id)
+    except ExecutorBusy:
+        return HttpResponse("Too many requests in progress, please retry.", status=503)
+
+    cached = await sync_to_async(transcript_cache.lookup)(item_id, metadata.get("eTag"), metadata.get("size"))
+    if cached is not None:
+        return render(
+            request,
+            "outlook_integration/transcription.html",
+            {
+                "segments": cached.segments,
+                "recording_name": cached.recording_name or metadata.get("name", ""),
+                "actionable_tasks": cached.actionable_tasks,
+                "sentiment_timeline": cached.sentiment_timeline,
+            },
+        )
 
-    # Step 3) Combine all segments into one big text blob, e.g. "SpeakerA: text…"
-    full_text_lines = []
-    for seg in segments:
-        speaker = seg.get("speaker", "Speaker")
-        text = seg.get("text", "").strip()
-        if text:
-            full_text_lines.append(f"{speaker}: {text}")
-    full_text = "\n".join(full_text_lines)
+    job = await sync_to_async(jobs.enqueue)(item_id)
+    return redirect("transcription_job", job_id=job.public_id)
 
-    # Step 4) Use our spaCy-based extractor to get actionable tasks
-    actionable_tasks = extract_tasks_rule_based(full_text)
 
-    # Step 5) Render results, passing both segments and actionable_tasks
+def transcription_job(request, job_id):
+    """
+    Show a transcription job: its progress while it is queued or running,
+    then the per-speaker transcript, extracted action items and sentiment
+    timeline.
+    """
+    if _authenticated_account() is None:
+        return redirect("outlook_login")
+    job = get_object_or_404(TranscriptionJob, public_id=job_id)
     return render(
         request,
         "outlook_integration/transcription.html",
         {
-            "segments": segments,
-            "recording_name": filename,
-            "actionable_tasks": actionable_tasks,
+            "job": job,
+            "segments": job.segments,
+            "recording_name": job.recording_name or job.item_id,
+            "actionable_tasks": job.actionable_tasks,
+            "sentiment_timeline": job.sentiment_timeline,
         },
     )
 
 
+def transcription_job_status(request, job_id):
+    """JSON status of a transcription job, polled by the transcription page."""
+    if _authenticated_account() is None:
+        return JsonResponse({"error": "Not signed in to Outlook."}, status=401)
+    job = get_object_or_404(TranscriptionJob, public_id=job_id)
+    return JsonResponse(job.as_status())
+
+
+def transcription_job_events(request, job_id):
+    """
+    Server-Sent Events stream of a job's segments, action items and progress
+    as the worker produces them (see ``job_events``). Resumes from the
+    Last-Event-ID header on reconnect, or from ``?cursor=<segments>:<tasks>``.
+    Under ASGI the stream is an async generator, so an open tab holds no
+    worker while it waits for the next batch.
+    """
+    if _authenticated_account() is None:
+        return HttpResponse("Not signed in to Outlook.", status=401)
+    job = get_object_or_404(TranscriptionJob, public_id=job_id)
+    cursor = request.headers.get("Last-Event-ID") or request.GET.get("cursor", "")
+    events = job_events.ajob_events if isinstance(request, ASGIRequest) else job_events.job_events
+    response = StreamingHttpResponse(events(job.pk, cursor), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # don't let nginx buffer the stream
+    return response
+
+
 def outlook_logout(request):
     """Log out by deleting stored token and clearing session"""
-    tb = FileSystemTokenBackend(token_path=".", token_filename="o365_token.txt")
+    dashboard_data.invalidate(get_account())
+    forget_account()
+    tb = FileSystemTokenBackend(token_path=TOKEN_PATH, token_filename=TOKEN_FILENAME)
     tb.delete_token()
     request.session.flush()
     return redirect("outlook_index")
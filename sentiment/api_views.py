@@ -2,15 +2,11 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .serializers import SentimentSerializer
+from rest_framework.permissions import IsAdminUser
+from .serializers import SentimentSerializer, SentimentBatchSerializer
 
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-from scipy.special import softmax
+from .inference import result_cache, score_long_text, score_many, score_text
 
-# Load the pre-trained RoBERTa model and tokenizer locally
-MODEL = "cardiffnlp/twitter-roberta-base-sentiment"
-tokenizer = AutoTokenizer.from_pretrained(MODEL)
-model = AutoModelForSequenceClassification.from_pretrained(MODEL)
 
 class SentimentAnalysisAPIView(APIView):
     """
@@ -21,22 +17,51 @@ class SentimentAnalysisAPIView(APIView):
         serializer = SentimentSerializer(data=request.data)
         if serializer.is_valid():
             text = serializer.validated_data['text']
-            # The validated text is tokenized using a pre-trained tokenizer provided by 
-            # the Hugging Face Transformers library
-            encoded_text = tokenizer(text, return_tensors='pt')
-            # The tokenized text is passed to a pre-trained sentiment analysis model 
-            # (a RoBERTa model fine-tuned for sentiment analysis) from Hugging Face
-            output = model(**encoded_text)
-            scores = output[0][0].detach().numpy()
-            # use SciPy’s softmax function to transform the model’s raw output scores 
-            # into a normalized probability distribution across sentiment classes.
-            scores = softmax(scores)
+            if serializer.validated_data['long_text']:
+                # Long documents are scored window by window in one batched
+                # forward pass; the response carries both the aggregate and
+                # the per-window scores.
+                # {"text": "<transcript>", "long_text": true}
+                result = {'text': text}
+                result.update(score_long_text(text))
+                return Response(result, status=status.HTTP_200_OK)
+            # Repeated texts are answered from the result cache. Otherwise the
+            # text is queued on the shared micro-batcher, which tokenizes it
+            # together with any other concurrent requests, runs one padded
+            # forward pass of the RoBERTa model and applies SciPy's softmax to
+            # turn the raw output into neg/neu/pos probabilities.
             # {"text": "HI!"}
-            result = {
-                'text': text,
-                'neg': scores[0].item(),
-                'neu': scores[1].item(),
-                'pos': scores[2].item()
-            }
+            result = {'text': text}
+            result.update(score_text(text))
             return Response(result, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class SentimentBatchAPIView(APIView):
+    """
+    API endpoint that receives a list of texts via POST and returns sentiment
+    scores for each of them, in the same order.
+    """
+    def post(self, request, format=None):
+        serializer = SentimentBatchSerializer(data=request.data)
+        if serializer.is_valid():
+            texts = serializer.validated_data['texts']
+            # Cached texts are answered directly; the rest are grouped into
+            # length buckets so short inputs are not padded up to the longest
+            # one in the request.
+            scores = score_many(texts)
+            # {"texts": ["HI!", "This is terrible."]}
+            results = [dict(text=text, **score) for text, score in zip(texts, scores)]
+            return Response({'results': results}, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class SentimentCacheStatsAPIView(APIView):
+    """
+    API endpoint that reports the sentiment result cache's size, hit rate and
+    evictions for this worker process. Staff only, like the request profiles.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, format=None):
+        return Response(result_cache.stats(), status=status.HTTP_200_OK)
@@ -0,0 +1,89 @@
+# sentiment/async_views.py
+"""
+Async versions of the sentiment and Vosk API endpoints, for ASGI servers.
+
+They take the same input and return the same responses as ``api_views`` and
+``voice_api_views`` (JSON bodies only, where DRF also accepts forms), but
+await the model calls on the pools in ``XIRCLS.executors`` instead of holding
+a worker for the whole inference. Single texts wait for the shared
+micro-batcher without occupying any thread.
+"""
+import json
+
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from XIRCLS import executors
+from XIRCLS.executors import ExecutorBusy
+
+from .inference import score_long_text, score_many, score_text_async
+from .serializers import SentimentBatchSerializer, SentimentSerializer
+from .voice_api_views import RECOGNITION_EXCEPTIONS, recognition_error, recognition_payload
+from .vosk_pool import recognize_upload
+
+
+def _busy():
+    return JsonResponse({"error": "Too many requests in progress, please retry."}, status=503)
+
+
+def _validated(request, serializer_class):
+    """(validated data, None) for a valid JSON body, else (None, error response)."""
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError as e:
+        return None, JsonResponse({"detail": f"JSON parse error - {e}"}, status=400)
+    serializer = serializer_class(data=data)
+    if not serializer.is_valid():
+        return None, JsonResponse(serializer.errors, status=400)
+    return serializer.validated_data, None
+
+
+@csrf_exempt
+@require_POST
+async def sentiment_analysis(request):
+    """Async ``SentimentAnalysisAPIView``: {"text": "...", "long_text": false}."""
+    data, error = _validated(request, SentimentSerializer)
+    if error is not None:
+        return error
+    text = data["text"]
+    try:
+        if data["long_text"]:
+            scores = await executors.run("sentiment", score_long_text, text)
+        else:
+            scores = await score_text_async(text)
+    except ExecutorBusy:
+        return _busy()
+    return JsonResponse({"text": text, **scores})
+
+
+@csrf_exempt
+@require_POST
+async def sentiment_batch(request):
+    """Async ``SentimentBatchAPIView``: {"texts": ["...", ...]}."""
+    data, error = _validated(request, SentimentBatchSerializer)
+    if error is not None:
+        return error
+    texts = data["texts"]
+    try:
+        scores = await executors.run("sentiment", score_many, texts)
+    except ExecutorBusy:
+        return _busy()
+    results = [dict(text=text, **score) for text, score in zip(texts, scores)]
+    return JsonResponse({"results": results})
+
+
+@csrf_exempt
+@require_POST
+async def voice_vosk(request):
+    """Async ``VoiceVoskAPIView``: a multipart upload with an ``audio`` file."""
+    if "audio" not in request.FILES:
+        return JsonResponse({"error": "No audio file provided."}, status=400)
+    try:
+        result = await executors.run("vosk", recognize_upload, request.FILES["audio"])
+    except ExecutorBusy:
+        return _busy()
+    except RECOGNITION_EXCEPTIONS as e:
+        message, status_code = recognition_error(e)
+        return JsonResponse({"error": message}, status=status_code)
+    return JsonResponse(recognition_payload(result))
@@ -0,0 +1,135 @@
+# sentiment/audio.py
+"""
+ffmpeg helpers shared by the Vosk upload and streaming paths.
+
+Vosk expects 16 kHz mono 16-bit little-endian PCM, so every input format the
+browser may send (WebM/Opus, Ogg, WAV...) is decoded by ffmpeg into raw
+``s16le`` samples written to stdout.
+"""
+import subprocess
+import threading
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2
+
+# 4000 samples (0.25 s) of 16-bit mono PCM per recognizer call
+FRAME_BYTES = 4000 * BYTES_PER_SAMPLE
+
+# Of ffmpeg's error output, only this much (the end) goes into AudioDecodeError
+MAX_ERROR_BYTES = 4096
+
+
+class AudioDecodeError(Exception):
+    """Raised when ffmpeg cannot decode the uploaded audio."""
+
+
+def ffmpeg_pcm_command(source="pipe:0", low_latency=False, codec="s16le"):
+    """
+    Build an ffmpeg command that decodes ``source`` (a path, or ``pipe:0`` for
+    stdin) to raw 16 kHz mono PCM on stdout, as 16-bit integers or, with
+    ``codec="f32le"``, 32-bit floats.
+
+    With ``low_latency`` ffmpeg probes as little input as possible and does
+    not buffer, so samples come out while the input is still being written.
+    """
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error"]
+    if low_latency:
+        cmd += ["-fflags", "nobuffer", "-probesize", "4096", "-analyzeduration", "0"]
+    cmd += [
+        "-i",
+        source,
+        "-ar",
+        str(SAMPLE_RATE),
+        "-ac",
+        "1",
+        "-acodec",
+        f"pcm_{codec}",
+        "-f",
+        codec,
+        "pipe:1",
+    ]
+    return cmd
+
+
+def pcm_frames(chunks, frame_bytes=FRAME_BYTES, codec="s16le"):
+    """
+    Decode an iterable of encoded audio ``chunks`` (e.g. an upload's
+    ``chunks()``) through ffmpeg and yield raw PCM in ``frame_bytes`` pieces
+    (see ``ffmpeg_pcm_command`` for ``codec``).
+
+    Nothing touches the disk: the chunks are written to ffmpeg's stdin from a
+    helper thread while PCM is read from its stdout, so decoding starts with
+    the first chunk and no pipe can fill up and deadlock. Raises
+    ``AudioDecodeError`` if ffmpeg fails.
+    """
+    yield from _command_frames(ffmpeg_pcm_command(codec=codec), frame_bytes, chunks)
+
+
+def file_frames(path, frame_bytes=FRAME_BYTES, codec="s16le"):
+    """
+    Like ``pcm_frames``, for a file that ffmpeg reads itself. Unlike a pipe,
+    a file is seekable, so this also decodes containers whose index is at the
+    end (e.g. MP4 recordings).
+    """
+    yield from _command_frames(ffmpeg_pcm_command(path, codec=codec), frame_bytes)
+
+
+def _drain_tail(stream, tail):
+    """Read ``stream`` to the end, keeping only its last ``MAX_ERROR_BYTES`` in ``tail``."""
+    while data := stream.read1(65536):
+        tail += data
+        del tail[:-MAX_ERROR_BYTES]
+
+
+def _command_frames(cmd, frame_bytes, chunks=None):
+    """
+    Run ``cmd``, feeding it ``chunks`` on stdin if given, and yield its stdout
+    in ``frame_bytes`` pieces. stderr is drained by a helper thread as it
+    comes: a corrupt hour-long recording can log more errors than a pipe
+    holds, which would otherwise block ffmpeg and us with it. Only the tail
+    is kept in memory for ``AudioDecodeError``.
+    """
+    process = subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL if chunks is None else subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    errors = bytearray()
+    reader = threading.Thread(target=_drain_tail, args=(process.stderr, errors), daemon=True)
+    reader.start()
+    writer = None
+    if chunks is not None:
+        def feed():
+            try:
+                for chunk in chunks:
+                    process.stdin.write(chunk)
+            except (BrokenPipeError, ValueError):
+                pass  # ffmpeg gave up early; its exit status reports why
+            finally:
+                try:
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+
+    try:
+        while True:
+            data = process.stdout.read(frame_bytes)
+            if not data:
+                break
+            yield data
+        if writer is not None:
+            writer.join()
+        if process.wait() != 0:
+            reader.join()
+            raise AudioDecodeError(errors.decode("utf-8", errors="replace").strip())
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        reader.join()
+        process.stdout.close()
+        process.stderr.close()
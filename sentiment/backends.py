@@ -0,0 +1,156 @@
+# sentiment/backends.py
+"""
+Interchangeable inference backends for the RoBERTa sentiment model.
+
+Every backend takes the tokenizer's PyTorch tensors and returns raw logits as
+a (batch, 3) NumPy array, so the scoring code in ``sentiment.inference`` does
+not care which one is active. The backend is chosen by ``SENTIMENT_BACKEND``:
+
+- ``torch``: the eager Hugging Face model, run under ``inference_mode``.
+- ``torch-int8``: the same model with its Linear layers dynamically
+  quantized to int8.
+- ``onnx``: the model exported to an ONNX graph and run with onnxruntime.
+"""
+import os
+import uuid
+
+import numpy as np
+from scipy.special import softmax
+
+
+class TorchBackend:
+    name = "torch"
+
+    def __init__(self, model):
+        self.model = model.eval()
+
+    def logits(self, encoded) -> np.ndarray:
+        import torch
+
+        with torch.inference_mode():
+            output = self.model(**encoded)
+        return output[0].numpy()
+
+
+class QuantizedTorchBackend(TorchBackend):
+    name = "torch-int8"
+
+    def __init__(self, model):
+        import torch
+
+        quantized = torch.quantization.quantize_dynamic(
+            model.eval(), {torch.nn.Linear}, dtype=torch.qint8
+        )
+        super().__init__(quantized)
+
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, model, tokenizer, onnx_path, intra_op_threads=0):
+        import onnxruntime as ort
+
+        if not os.path.exists(onnx_path):
+            export_onnx(model, tokenizer, onnx_path)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # 0 lets onnxruntime pick one thread per physical core
+        options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(
+            str(onnx_path), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+    def logits(self, encoded) -> np.ndarray:
+        feeds = {
+            name: tensor.numpy().astype(np.int64)
+            for name, tensor in encoded.items()
+            if name in self.input_names
+        }
+        return self.session.run(None, feeds)[0]
+
+
+def export_onnx(model, tokenizer, onnx_path):
+    """Export ``model`` to ``onnx_path`` with dynamic batch and sequence axes."""
+    import torch
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    token_axes = {0: "batch", 1: "sequence"}
+
+    def export(path):
+        with torch.inference_mode():
+            torch.onnx.export(
+                model.eval(),
+                (sample["input_ids"], sample["attention_mask"]),
+                path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["logits"],
+                dynamic_axes={
+                    "input_ids": token_axes,
+                    "attention_mask": token_axes,
+                    "logits": {0: "batch"},
+                },
+                opset_version=14,
+            )
+
+    _write_atomically(onnx_path, export)
+
+
+def _write_atomically(path, write):
+    """
+    Call ``write`` with a temporary path next to ``path``, then rename the
+    result onto ``path``. Processes preloading at the same time may each
+    export, but none of them ever loads a half-written file: the last rename
+    wins and the others' complete files are replaced whole.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Left for ``write`` to create, so the file gets the usual permissions
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+BACKENDS = ("torch", "torch-int8", "onnx")
+
+
+def build_backend(name, model, tokenizer, onnx_path=None, intra_op_threads=0):
+    if name == "torch":
+        return TorchBackend(model)
+    if name == "torch-int8":
+        return QuantizedTorchBackend(model)
+    if name == "onnx":
+        return OnnxBackend(model, tokenizer, onnx_path, intra_op_threads)
+    raise ValueError(
+        f"Unknown sentiment backend '{name}'. Choose one of: {', '.join(BACKENDS)}"
+    )
+
+
+def parity_check(backend, reference, tokenizer, texts, tolerance, max_length=512) -> dict:
+    """
+    Score ``texts`` with both ``backend`` and the ``reference`` backend and
+    compare the resulting probabilities. The check passes when no score
+    differs by more than ``tolerance``.
+    """
+    encoded = tokenizer(
+        texts, padding=True, truncation=True, max_length=max_length, return_tensors="pt"
+    )
+    expected = softmax(reference.logits(encoded), axis=1)
+    actual = softmax(backend.logits(encoded), axis=1)
+    diff = np.abs(expected - actual)
+    return {
+        "backend": backend.name,
+        "texts": len(texts),
+        "max_abs_diff": float(diff.max()),
+        "mean_abs_diff": float(diff.mean()),
+        "label_agreement": float(
+            (expected.argmax(axis=1) == actual.argmax(axis=1)).mean()
+        ),
+        "tolerance": tolerance,
+        "ok": bool(diff.max() <= tolerance),
+    }
@@ -0,0 +1,74 @@
+# sentiment/batching.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from many request threads into a shared queue and
+    hands them to ``batch_fn`` in groups.
+
+    A single background worker takes the first queued item, then keeps pulling
+    until either ``max_batch_size`` items are collected or ``max_wait_ms`` has
+    elapsed, runs ``batch_fn`` once over the whole group and resolves each
+    caller's future with its own result.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=32, max_wait_ms=10):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0, max_wait_ms) / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def submit(self, item) -> Future:
+        """Queue ``item`` and return a future resolved with its result."""
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((item, future))
+        return future
+
+    def run(self, item, timeout=None):
+        """Submit ``item`` and block until its result is available."""
+        return self.submit(item).result(timeout=timeout)
+
+    def _ensure_worker(self):
+        # The worker is started lazily so that forked server processes each get
+        # their own thread instead of inheriting a dead one from the parent.
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._loop, name="sentiment-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+            try:
+                results = self.batch_fn(items)
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
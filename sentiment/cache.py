@@ -0,0 +1,162 @@
+# sentiment/cache.py
+import hashlib
+import json
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form used for cache keys: NFKC-normalized, trimmed and with runs
+    of whitespace collapsed, so trivially different copies of the same string
+    share one entry.
+    """
+    text = unicodedata.normalize("NFKC", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def cache_key(text: str, namespace: str = "") -> str:
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"sentiment:{namespace}:{digest}" if namespace else f"sentiment:{digest}"
+
+
+class SentimentResultCache:
+    """
+    In-process LRU cache of sentiment scores keyed on a hash of the normalized
+    text.
+
+    The cache is bounded both by number of entries and by an estimate of the
+    bytes it holds; the least recently used entries are evicted first. Entries
+    optionally expire after ``ttl`` seconds. When ``shared_alias`` names a
+    Django cache (see ``CACHES``), local misses fall through to it and new
+    scores are written to it, so several worker processes share their hits.
+
+    ``namespace`` goes into every key. It should name whatever produced the
+    scores (model, backend, format), so that shared entries written by a
+    different model are never read back.
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=16 * 1024 * 1024, ttl=None,
+                 shared_alias=None, namespace=""):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl or None
+        self.shared_alias = shared_alias or None
+        self.namespace = namespace
+        self._entries = OrderedDict()  # key -> (scores, size, expires_at)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias] if self.shared_alias else None
+
+    def get(self, text: str):
+        """Return the cached scores for ``text`` or ``None`` on a miss."""
+        key = cache_key(text, self.namespace)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                scores, size, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(scores)
+                self._remove(key)
+                self.expirations += 1
+
+        if self.shared is not None:
+            scores = self.shared.get(key)
+            if scores is not None:
+                with self._lock:
+                    self.shared_hits += 1
+                    self._store(key, scores)
+                return dict(scores)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, text: str, scores: dict):
+        key = cache_key(text, self.namespace)
+        scores = dict(scores)
+        with self._lock:
+            self._store(key, scores)
+        if self.shared is not None:
+            # Without a TTL of our own, fall back to the alias's TIMEOUT
+            # (an explicit None would store the entry forever)
+            self.shared.set(key, scores, timeout=self.ttl or DEFAULT_TIMEOUT)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @contextmanager
+    def isolated(self):
+        """
+        Inside the block, start from an empty local cache and never touch the
+        shared one; on exit, restore the entries held before. For stand-in
+        models, whose scores must not reach the real cache, and for cold-cache
+        measurements.
+        """
+        with self._lock:
+            saved = self._entries, self._bytes, self.shared_alias
+            self._entries, self._bytes, self.shared_alias = OrderedDict(), 0, None
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._entries, self._bytes, self.shared_alias = saved
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "shared_backend": self.shared_alias,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    # The helpers below expect self._lock to be held.
+
+    def _store(self, key, scores):
+        if key in self._entries:
+            self._remove(key)
+        size = len(key) + len(json.dumps(scores))
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        self._entries[key] = (scores, size, expires_at)
+        self._bytes += size
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
@@ -0,0 +1,236 @@
+# sentiment/inference.py
+import asyncio
+
+from django.conf import settings
+from scipy.special import softmax
+
+from XIRCLS import executors, metrics, model_registry
+
+from .backends import build_backend
+from .batching import MicroBatcher
+from .cache import SentimentResultCache
+
+MODEL = "cardiffnlp/twitter-roberta-base-sentiment"
+
+# RoBERTa's position embeddings stop at 512 tokens
+MAX_LENGTH = 512
+
+# Bump when the shape of the cached scores changes
+CACHE_FORMAT_VERSION = 1
+
+
+def load_pretrained():
+    """The pre-trained RoBERTa tokenizer and eager PyTorch model."""
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    tokenizer = AutoTokenizer.from_pretrained(MODEL)
+    model = AutoModelForSequenceClassification.from_pretrained(MODEL)
+    return tokenizer, model
+
+
+def load_sentiment_model():
+    """
+    Registry loader: the tokenizer plus the inference backend selected by
+    SENTIMENT_BACKEND (see sentiment/backends.py).
+    """
+    tokenizer, model = load_pretrained()
+    backend = build_backend(
+        settings.SENTIMENT_BACKEND,
+        model,
+        tokenizer,
+        onnx_path=settings.SENTIMENT_ONNX_PATH,
+        intra_op_threads=settings.SENTIMENT_ONNX_THREADS,
+    )
+    return tokenizer, backend
+
+
+def _forward(encoded):
+    """
+    Run the model over an already padded batch and return the softmax
+    probabilities as a (batch, 3) array.
+    """
+    _, backend = model_registry.get("sentiment")
+    with metrics.stage("sentiment", "forward"):
+        logits = backend.logits(encoded)
+    metrics.SENTIMENT_TEXTS.inc(len(logits))
+    return softmax(logits, axis=1)
+
+
+def _to_scores(probs) -> dict:
+    return {
+        'neg': probs[0].item(),
+        'neu': probs[1].item(),
+        'pos': probs[2].item(),
+    }
+
+
+def score_texts(texts: list[str]) -> list[dict]:
+    """
+    Score ``texts`` in a single padded forward pass and return one
+    {neg, neu, pos} dict per text, in input order.
+    """
+    tokenizer, _ = model_registry.get("sentiment")
+    with metrics.stage("sentiment", "tokenize"):
+        encoded = tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=MAX_LENGTH,
+            return_tensors='pt',
+        )
+    return [_to_scores(probs) for probs in _forward(encoded)]
+
+
+def score_texts_bucketed(texts: list[str], batch_size: int) -> list[dict]:
+    """
+    Score a large list of texts by sorting them by token length and running
+    one forward pass per bucket of ``batch_size`` neighbours, so short texts
+    are never padded to the length of the longest input. Results come back
+    in input order.
+    """
+    tokenizer, _ = model_registry.get("sentiment")
+    with metrics.stage("sentiment", "tokenize"):
+        encoded = tokenizer(texts, truncation=True, max_length=MAX_LENGTH)
+    input_ids = encoded['input_ids']
+    attention_mask = encoded['attention_mask']
+    order = sorted(range(len(texts)), key=lambda i: len(input_ids[i]))
+
+    results = [None] * len(texts)
+    for start in range(0, len(order), batch_size):
+        bucket = order[start:start + batch_size]
+        batch = tokenizer.pad(
+            {
+                'input_ids': [input_ids[i] for i in bucket],
+                'attention_mask': [attention_mask[i] for i in bucket],
+            },
+            return_tensors='pt',
+        )
+        for i, probs in zip(bucket, _forward(batch)):
+            results[i] = _to_scores(probs)
+    return results
+
+
+def _spread(count: int, limit: int) -> list[int]:
+    """Pick ``limit`` indices spread evenly over ``range(count)``."""
+    if count <= limit:
+        return list(range(count))
+    step = (count - 1) / (limit - 1) if limit > 1 else 0
+    return sorted({round(i * step) for i in range(limit)})
+
+
+def score_long_text(text: str, window: int = None, stride: int = None,
+                    max_windows: int = None) -> dict:
+    """
+    Score a text longer than the model's 512-token limit.
+
+    The text is split into windows of ``window`` tokens that overlap by
+    ``stride`` tokens, and all windows are scored in one batched forward pass.
+    If there are more than ``max_windows`` windows, an evenly spaced subset is
+    scored so that the latency stays bounded. The aggregate score is the
+    average of the window scores weighted by their token counts.
+    """
+    window = window or settings.SENTIMENT_LONG_WINDOW_TOKENS
+    stride = settings.SENTIMENT_LONG_STRIDE_TOKENS if stride is None else stride
+    max_windows = max_windows or settings.SENTIMENT_LONG_MAX_WINDOWS
+
+    tokenizer, _ = model_registry.get("sentiment")
+    encoded = tokenizer(
+        text,
+        truncation=True,
+        max_length=min(window, MAX_LENGTH),
+        stride=stride,
+        return_overflowing_tokens=True,
+        return_offsets_mapping=True,
+        padding=True,
+        return_tensors='pt',
+    )
+    offsets = encoded.pop('offset_mapping')
+    encoded.pop('overflow_to_sample_mapping', None)
+
+    total = len(encoded['input_ids'])
+    keep = _spread(total, max_windows)
+    if len(keep) < total:
+        encoded = {name: tensor[keep] for name, tensor in encoded.items()}
+        offsets = offsets[keep]
+
+    probs = _forward(encoded)
+    weights = encoded['attention_mask'].sum(dim=1).numpy()
+    aggregate = (probs * weights[:, None]).sum(axis=0) / weights.sum()
+
+    windows = []
+    for index, window_probs, spans in zip(keep, probs, offsets.tolist()):
+        # Special and padding tokens have (0, 0) offsets
+        spans = [span for span in spans if span[1] > span[0]]
+        windows.append({
+            'index': index,
+            'start_char': spans[0][0] if spans else 0,
+            'end_char': spans[-1][1] if spans else 0,
+            **_to_scores(window_probs),
+        })
+
+    result = _to_scores(aggregate)
+    result.update({
+        'windows': windows,
+        'windows_total': total,
+        'windows_scored': len(keep),
+    })
+    return result
+
+
+# Concurrent single-text requests are funnelled through one shared batcher so
+# that they share forward passes instead of each running a batch of one.
+batcher = MicroBatcher(
+    score_texts,
+    max_batch_size=settings.SENTIMENT_MAX_BATCH_SIZE,
+    max_wait_ms=settings.SENTIMENT_MAX_WAIT_MS,
+)
+
+# Scores for repeated strings ("Thanks!", templated replies) are served from
+# an LRU cache, optionally backed by a Django cache shared between workers.
+result_cache = SentimentResultCache(
+    max_entries=settings.SENTIMENT_CACHE_MAX_ENTRIES,
+    max_bytes=settings.SENTIMENT_CACHE_MAX_BYTES,
+    ttl=settings.SENTIMENT_CACHE_TTL,
+    shared_alias=settings.SENTIMENT_CACHE_SHARED_BACKEND,
+    # Scores from another model or backend must not be served from the
+    # shared cache, which outlives restarts
+    namespace=f"v{CACHE_FORMAT_VERSION}:{MODEL}:{settings.SENTIMENT_BACKEND}",
+)
+
+
+def score_text(text: str) -> dict:
+    """Score a single text, using the result cache and the shared batcher."""
+    scores = result_cache.get(text)
+    if scores is None:
+        scores = batcher.run(text)
+        result_cache.set(text, scores)
+    return scores
+
+
+async def score_text_async(text: str) -> dict:
+    """
+    ``score_text`` for async views: the cache is read on the I/O pool, then
+    the text waits for its micro-batch without holding any thread.
+    """
+    scores = await executors.run("io", result_cache.get, text)
+    if scores is None:
+        scores = await asyncio.wrap_future(batcher.submit(text))
+        await executors.run("io", result_cache.set, text, scores)
+    return scores
+
+
+def score_many(texts: list[str]) -> list[dict]:
+    """
+    Score a list of texts, looking each one up in the result cache and
+    running the misses through length-bucketed forward passes.
+    """
+    results = [result_cache.get(text) for text in texts]
+    missing = [i for i, scores in enumerate(results) if scores is None]
+    if missing:
+        scored = score_texts_bucketed(
+            [texts[i] for i in missing], settings.SENTIMENT_MAX_BATCH_SIZE
+        )
+        for i, scores in zip(missing, scored):
+            results[i] = scores
+            result_cache.set(texts[i], scores)
+    return results
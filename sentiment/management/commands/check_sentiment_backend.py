@@ -0,0 +1,81 @@
+# sentiment/management/commands/check_sentiment_backend.py
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from sentiment.backends import BACKENDS, TorchBackend, build_backend, parity_check
+from sentiment.inference import MAX_LENGTH, load_pretrained
+
+# A mix of short, long, positive, negative and neutral inputs
+SAMPLE_TEXTS = [
+    "I love this product!",
+    "This is terrible.",
+    "ok",
+    "Thanks!",
+    "The meeting has been moved to Thursday at 3pm.",
+    "I'm not sure how I feel about the new release, some parts are great but the UI is confusing.",
+    "Absolutely furious that the order arrived broken for the second time in a row.",
+    "Can you send me the budget report before the review?",
+    "Best support experience I've had in years, the team went above and beyond to fix it.",
+    "meh",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare a sentiment inference backend against the eager PyTorch model "
+        "and fail if any score differs by more than the tolerance."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "backend",
+            nargs="?",
+            default=None,
+            help=f"Backend to check ({', '.join(BACKENDS)}). Defaults to SENTIMENT_BACKEND.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=settings.SENTIMENT_PARITY_TOLERANCE,
+            help="Maximum allowed absolute difference between probabilities.",
+        )
+        parser.add_argument(
+            "--texts-file",
+            help="Optional file with one text per line to use instead of the built-in samples.",
+        )
+
+    def handle(self, *args, **options):
+        name = options["backend"] or settings.SENTIMENT_BACKEND
+        texts = SAMPLE_TEXTS
+        if options["texts_file"]:
+            with open(options["texts_file"], encoding="utf-8") as f:
+                texts = [line.strip() for line in f if line.strip()]
+
+        tokenizer, model = load_pretrained()
+        reference = TorchBackend(model)
+        try:
+            # The candidate gets its own copy of the weights so that nothing it
+            # does (quantization, export) can leak into the reference.
+            _, candidate_model = load_pretrained()
+            backend = build_backend(
+                name,
+                candidate_model,
+                tokenizer,
+                onnx_path=settings.SENTIMENT_ONNX_PATH,
+                intra_op_threads=settings.SENTIMENT_ONNX_THREADS,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        report = parity_check(
+            backend, reference, tokenizer, texts, options["tolerance"], max_length=MAX_LENGTH
+        )
+        self.stdout.write(json.dumps(report, indent=2))
+        if not report["ok"]:
+            raise CommandError(
+                f"Backend '{name}' differs from eager torch by {report['max_abs_diff']:.5f} "
+                f"(tolerance {report['tolerance']})."
+            )
+        self.stdout.write(self.style.SUCCESS(f"Backend '{name}' matches eager torch."))
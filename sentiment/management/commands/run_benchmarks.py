@@ -0,0 +1,82 @@
+# sentiment/management/commands/run_benchmarks.py
+from django.core.management.base import BaseCommand, CommandError
+
+from XIRCLS.benchmarks import harness
+from XIRCLS.benchmarks.cases import CASES
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the inference paths offline and report p50/p95/p99 latency, "
+        "throughput and peak RSS. Optionally compare against a saved run and "
+        "fail on regressions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "cases",
+            nargs="*",
+            help=f"Cases to run ({', '.join(CASES)}). Defaults to all; a prefix such as 'sentiment' selects a group.",
+        )
+        parser.add_argument(
+            "--models",
+            choices=["standin", "real"],
+            default="standin",
+            help="Tiny numpy stand-ins (default, no downloads) or the real models from the local cache.",
+        )
+        parser.add_argument("--scale", type=float, default=1.0, help="Multiply the amount of work per case.")
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+        parser.add_argument("--compare", help="JSON results of an earlier run to compare against.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Fraction by which a metric may get worse before it counts as a regression.",
+        )
+
+    def _select(self, requested):
+        if not requested:
+            return list(CASES)
+        names = []
+        for pattern in requested:
+            matches = [name for name in CASES if name == pattern or name.startswith(pattern + ".")]
+            if not matches:
+                raise CommandError(f"Unknown case '{pattern}'. Known cases: {', '.join(CASES)}")
+            names.extend(name for name in matches if name not in names)
+        return names
+
+    def _log(self, name, result, skipped):
+        if skipped:
+            self.stdout.write(self.style.WARNING(f"{name:<24} skipped: {skipped}"))
+            return
+        rss = f"{result['peak_rss_mb']:.0f} MB" if result["peak_rss_mb"] is not None else "n/a"
+        self.stdout.write(
+            f"{name:<24} p50 {result['p50_ms']:9.2f} ms  p95 {result['p95_ms']:9.2f} ms  "
+            f"p99 {result['p99_ms']:9.2f} ms  {result['throughput']:10.1f} {result['unit']}/s  "
+            f"peak RSS {rss}"
+        )
+
+    def handle(self, *args, **options):
+        names = self._select(options["cases"])
+        baseline = harness.load(options["compare"]) if options["compare"] else None
+
+        report = harness.run(CASES, names, options["models"], options["scale"], log=self._log)
+        if options["output"]:
+            harness.save(report, options["output"])
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is None:
+            return
+        if baseline.get("meta", {}).get("models") != options["models"]:
+            self.stdout.write(self.style.WARNING(
+                f"Baseline used --models {baseline.get('meta', {}).get('models')}; "
+                f"this run used --models {options['models']}."
+            ))
+        regressions = harness.compare(baseline, report, options["threshold"])
+        for r in regressions:
+            self.stdout.write(self.style.ERROR(
+                f"{r['case']} {r['metric']}: {r['baseline']:.2f} -> {r['current']:.2f} ({r['change']:+.0%})"
+            ))
+        if regressions:
+            raise CommandError(f"{len(regressions)} metric(s) regressed by more than {options['threshold']:.0%}.")
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
@@ -0,0 +1,33 @@
+# sentiment/management/commands/warmup_models.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from XIRCLS import model_registry
+
+
+class Command(BaseCommand):
+    help = (
+        "Load ML models into the registry ahead of the first request. "
+        "Defaults to the models listed in the PRELOAD_MODELS setting."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            help=f"Models to load ({', '.join(model_registry.LOADERS)} or 'all').",
+        )
+
+    def handle(self, *args, **options):
+        names = options["models"] or settings.PRELOAD_MODELS
+        if not names:
+            self.stdout.write("No models requested and PRELOAD_MODELS is empty.")
+            return
+        try:
+            names = model_registry.resolve(names)
+        except KeyError as e:
+            raise CommandError(e.args[0])
+
+        for name in names:
+            seconds = model_registry.preload([name])[name]
+            self.stdout.write(self.style.SUCCESS(f"Loaded {name} in {seconds:.1f}s"))
@@ -0,0 +1,72 @@
+# sentiment/recognition.py
+import json
+import os
+import time
+
+from vosk import KaldiRecognizer, Model
+
+from XIRCLS import metrics, model_registry
+
+from .audio import SAMPLE_RATE, pcm_frames
+
+# Determine project root from current file location (assuming sentiment/ is inside your project)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(
+    BASE_DIR, "vosk_model"
+)  # Make sure your Vosk model is extracted here
+
+
+def load_vosk_model():
+    """Registry loader: the Vosk model extracted under vosk_model/."""
+    if not os.path.exists(MODEL_PATH):
+        raise Exception(
+            "Vosk model not found. Please download and extract a model to the 'vosk_model' folder."
+        )
+    # Loading the Vosk model might take a few seconds
+    return Model(MODEL_PATH)
+
+
+def recognize_chunks(chunks, model=None) -> str:
+    """
+    Decode encoded audio ``chunks`` with ffmpeg and run the PCM straight into
+    a Vosk recognizer, frame by frame. Returns the recognized text.
+
+    Raises ``sentiment.audio.AudioDecodeError`` if the audio can't be decoded.
+    """
+    rec = KaldiRecognizer(model or model_registry.get("vosk"), SAMPLE_RATE)
+    rec.SetWords(True)
+
+    results = []
+    # ffmpeg and the recognizer run in step, so time them separately: waiting
+    # for the next decoded frame vs. feeding it to Vosk
+    frames = iter(pcm_frames(chunks))
+    decode_seconds = recognition_seconds = 0.0
+    # Which of the two a failure is counted against: bad uploads fail in ffmpeg
+    stage = "ffmpeg"
+    try:
+        while True:
+            stage = "ffmpeg"
+            start = time.perf_counter()
+            data = next(frames, None)
+            decode_seconds += time.perf_counter() - start
+            if data is None:
+                break
+            stage = "recognition"
+            start = time.perf_counter()
+            if rec.AcceptWaveform(data):
+                res = json.loads(rec.Result())
+                results.append(res.get("text", ""))
+            recognition_seconds += time.perf_counter() - start
+        stage = "recognition"
+        start = time.perf_counter()
+        final_res = json.loads(rec.FinalResult())
+        results.append(final_res.get("text", ""))
+        recognition_seconds += time.perf_counter() - start
+    except Exception:
+        metrics.STAGE_ERRORS.inc(pipeline="vosk", stage=stage)
+        raise
+    finally:
+        metrics.STAGE_SECONDS.observe(decode_seconds, pipeline="vosk", stage="ffmpeg")
+        metrics.STAGE_SECONDS.observe(recognition_seconds, pipeline="vosk", stage="recognition")
+
+    return " ".join(results).strip()
@@ -1,5 +1,15 @@
 # sentiment/serializers.py
+from django.conf import settings
 from rest_framework import serializers
 
 class SentimentSerializer(serializers.Serializer):
     text = serializers.CharField()
+    # Score texts over 512 tokens with overlapping windows instead of truncating
+    long_text = serializers.BooleanField(required=False, default=False)
+
+class SentimentBatchSerializer(serializers.Serializer):
+    texts = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=settings.SENTIMENT_BULK_MAX_TEXTS,
+    )
@@ -0,0 +1,157 @@
+# sentiment/streaming.py
+"""
+Real-time speech recognition over WebSocket.
+
+This is a plain ASGI application mounted next to Django in ``XIRCLS/asgi.py``
+at ``/ws/voice-vosk/``. The browser sends the MediaRecorder's WebM chunks as
+binary messages while it records; they are piped into a long-running ffmpeg
+process, and the PCM it produces is fed continuously to a ``KaldiRecognizer``.
+Messages sent back to the client are JSON objects:
+
+- ``{"type": "partial", "text": ...}``: hypothesis for the current utterance
+- ``{"type": "result", "text": ...}``: a finished utterance
+- ``{"type": "final", "text": ...}``: the whole transcript, after the client
+  sends the text message ``"stop"``; the socket is closed afterwards
+- ``{"type": "error", "text": ...}``: ffmpeg could not decode the audio; the
+  socket is closed with code 1011
+
+Recognition runs on the bounded ``vosk_stream`` pool of ``XIRCLS.executors``,
+so the number of open sockets doesn't set the number of threads. When the
+pool is full the socket is closed with code 1013 (try again later).
+"""
+import asyncio
+import json
+import logging
+
+from vosk import KaldiRecognizer
+
+from XIRCLS import executors, model_registry
+from XIRCLS.executors import ExecutorBusy
+
+from .audio import MAX_ERROR_BYTES, SAMPLE_RATE, ffmpeg_pcm_command
+
+logger = logging.getLogger(__name__)
+
+# 0.25 s of 16-bit mono PCM per AcceptWaveform call
+READ_BYTES = SAMPLE_RATE // 4 * 2
+
+
+async def _send_json(send, payload):
+    await send({"type": "websocket.send", "text": json.dumps(payload)})
+
+
+async def _recognize(stdout, rec, send):
+    """Feed ffmpeg's PCM output to ``rec`` and push results as they appear."""
+    results = []
+    last_partial = ""
+    while True:
+        data = await stdout.read(READ_BYTES)
+        if not data:
+            break
+        # Recognition is CPU-bound; keep it off the event loop
+        if await executors.run("vosk_stream", rec.AcceptWaveform, data):
+            text = json.loads(rec.Result()).get("text", "")
+            last_partial = ""
+            if text:
+                results.append(text)
+                await _send_json(send, {"type": "result", "text": text})
+        else:
+            partial = json.loads(rec.PartialResult()).get("partial", "")
+            if partial and partial != last_partial:
+                last_partial = partial
+                await _send_json(send, {"type": "partial", "text": partial})
+
+    final = json.loads(rec.FinalResult()).get("text", "")
+    if final:
+        results.append(final)
+    return " ".join(results).strip()
+
+
+async def _forward(receive, stdin):
+    """Pipe the client's audio into ffmpeg; True once it sends "stop", False if it leaves."""
+    while True:
+        message = await receive()
+        if message["type"] == "websocket.disconnect":
+            return False
+        if message.get("bytes"):
+            stdin.write(message["bytes"])
+            await stdin.drain()
+        elif message.get("text") == "stop":
+            return True
+
+
+async def _drain_tail(stream, tail):
+    """Read ``stream`` to the end, keeping only its last ``MAX_ERROR_BYTES`` in ``tail``."""
+    while data := await stream.read(65536):
+        tail += data
+        del tail[:-MAX_ERROR_BYTES]
+
+
+async def vosk_stream(scope, receive, send):
+    message = await receive()
+    if message["type"] != "websocket.connect":
+        return
+
+    try:
+        model = await executors.run("vosk_stream", model_registry.get, "vosk")
+    except ExecutorBusy:
+        # Before the handshake this refuses the connection
+        await send({"type": "websocket.close", "code": 1013})
+        return
+    await send({"type": "websocket.accept"})
+
+    rec = KaldiRecognizer(model, SAMPLE_RATE)
+    rec.SetWords(True)
+    process = await asyncio.create_subprocess_exec(
+        *ffmpeg_pcm_command(low_latency=True),
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    errors = bytearray()
+    stderr_reader = asyncio.create_task(_drain_tail(process.stderr, errors))
+    recognizer = asyncio.create_task(_recognize(process.stdout, rec, send))
+    forwarder = asyncio.create_task(_forward(receive, process.stdin))
+
+    try:
+        # Recognition can end first: if it fails, nothing reads ffmpeg's
+        # output any more and writing to it would soon block for good
+        await asyncio.wait({forwarder, recognizer}, return_when=asyncio.FIRST_COMPLETED)
+        if forwarder.done():
+            try:
+                if not forwarder.result():
+                    return
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # ffmpeg gave up; its exit status says why
+            # Closing stdin lets ffmpeg flush the remaining audio and exit,
+            # which in turn ends the recognizer loop with a final result.
+            process.stdin.close()
+        text = await recognizer
+        await process.wait()
+        await stderr_reader
+        if process.returncode != 0:
+            logger.warning(
+                "ffmpeg could not decode a voice stream: %s",
+                errors.decode("utf-8", errors="replace").strip(),
+            )
+            await _send_json(send, {"type": "error", "text": "Error converting audio file."})
+            await send({"type": "websocket.close", "code": 1011})
+            return
+        await _send_json(send, {"type": "final", "text": text})
+        await send({"type": "websocket.close", "code": 1000})
+    except ExecutorBusy:
+        await send({"type": "websocket.close", "code": 1013})
+    except Exception:
+        logger.exception("Voice stream failed")
+        await send({"type": "websocket.close", "code": 1011})
+    finally:
+        tasks = (forwarder, recognizer, stderr_reader)
+        for task in tasks:
+            task.cancel()
+        # They must be done before we read what is left of ffmpeg's output
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if process.returncode is None:
+            process.kill()
+        # Unlike wait(), this reads the pipes to the end, so a full one
+        # can't keep ffmpeg from being reaped
+        await process.communicate()
@@ -1,4 +1,16 @@
-from django.test import TestCase
+import asyncio
+import importlib.util
+import io
+import json
+import os
+import shutil
+import sys
+import time
+import unittest
+import wave
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
 
 # Create your tests here.
 # sentiment/tests.py
@@ -16,3 +28,627 @@ class SentimentAPITest(APITestCase):
         self.assertIn('neg', response.data)
         self.assertIn('neu', response.data)
         self.assertIn('pos', response.data)
+
+    def test_sentiment_api_long_text(self):
+        url = reverse('api_sentiment')
+        text = 'The quarterly review went well and everyone was happy. ' * 200
+        response = self.client.post(url, {'text': text, 'long_text': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(response.data['windows_total'], 1)
+        self.assertLessEqual(response.data['windows_scored'], 16)
+        self.assertEqual(len(response.data['windows']), response.data['windows_scored'])
+        total = response.data['neg'] + response.data['neu'] + response.data['pos']
+        self.assertAlmostEqual(total, 1.0, places=4)
+
+    def test_sentiment_batch_api(self):
+        url = reverse('api_sentiment_batch')
+        texts = ['I love this product!', 'This is terrible.', 'ok']
+        response = self.client.post(url, {'texts': texts}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Results come back in the same order as the submitted texts
+        results = response.data['results']
+        self.assertEqual([r['text'] for r in results], texts)
+        for result in results:
+            self.assertIn('neg', result)
+            self.assertIn('neu', result)
+            self.assertIn('pos', result)
+
+    def test_sentiment_batch_api_rejects_empty_list(self):
+        url = reverse('api_sentiment_batch')
+        response = self.client.post(url, {'texts': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class MicroBatcherTest(TestCase):
+    def test_concurrent_items_share_a_batch(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from sentiment.batching import MicroBatcher
+
+        batch_sizes = []
+
+        def batch_fn(items):
+            batch_sizes.append(len(items))
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=200)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(batcher.run, range(8)))
+
+        # Every caller gets its own result back...
+        self.assertEqual(results, [i * 2 for i in range(8)])
+        # ...from fewer forward passes than there were callers
+        self.assertLess(len(batch_sizes), 8)
+
+    def test_errors_are_propagated_to_every_caller(self):
+        from sentiment.batching import MicroBatcher
+
+        def batch_fn(items):
+            raise ValueError("boom")
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=1)
+        with self.assertRaises(ValueError):
+            batcher.run("text")
+
+
+class SentimentResultCacheTest(TestCase):
+    def make_cache(self, **kwargs):
+        from sentiment.cache import SentimentResultCache
+        return SentimentResultCache(**kwargs)
+
+    def test_hits_on_normalized_text(self):
+        cache = self.make_cache(max_entries=10)
+        cache.set('Thanks!', {'neg': 0.1, 'neu': 0.2, 'pos': 0.7})
+        self.assertEqual(cache.get('  Thanks! ')['pos'], 0.7)
+        self.assertIsNone(cache.get('No thanks'))
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_evicts_least_recently_used(self):
+        cache = self.make_cache(max_entries=2)
+        scores = {'neg': 0.0, 'neu': 0.0, 'pos': 1.0}
+        cache.set('a', scores)
+        cache.set('b', scores)
+        cache.get('a')
+        cache.set('c', scores)
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_bounded_by_bytes(self):
+        cache = self.make_cache(max_entries=1000, max_bytes=300)
+        for i in range(20):
+            cache.set(f'text {i}', {'neg': 0.0, 'neu': 0.0, 'pos': 1.0})
+        self.assertLessEqual(cache.stats()['bytes'], 300)
+
+    def test_shared_backend_serves_other_processes(self):
+        cache = self.make_cache(shared_alias='default')
+        cache.set('shared text', {'neg': 0.3, 'neu': 0.3, 'pos': 0.4})
+        other = self.make_cache(shared_alias='default')
+        self.assertEqual(other.get('shared text')['pos'], 0.4)
+        self.assertEqual(other.stats()['shared_hits'], 1)
+
+    def test_isolated_leaves_shared_and_local_entries_alone(self):
+        cache = self.make_cache(shared_alias='default')
+        cache.set('kept text', {'neg': 0.3, 'neu': 0.3, 'pos': 0.4})
+        with cache.isolated():
+            self.assertIsNone(cache.get('kept text'))
+            cache.set('stand-in text', {'neg': 1.0, 'neu': 0.0, 'pos': 0.0})
+        self.assertEqual(cache.get('kept text')['pos'], 0.4)
+        self.assertIsNone(cache.get('stand-in text'))
+        self.assertIsNone(self.make_cache(shared_alias='default').get('stand-in text'))
+
+    def test_stats_endpoint_is_staff_only(self):
+        from django.contrib.auth import get_user_model
+        url = reverse('api_sentiment_cache')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        user = get_user_model().objects.create_user('analyst', password='x')
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        user.is_staff = True
+        user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('hit_rate', response.json())
+
+    def test_namespaces_do_not_share_entries(self):
+        cache = self.make_cache(shared_alias='default', namespace='v1:model-a:torch')
+        cache.set('namespaced text', {'neg': 0.3, 'neu': 0.3, 'pos': 0.4})
+        other = self.make_cache(shared_alias='default', namespace='v1:model-a:onnx')
+        self.assertIsNone(other.get('namespaced text'))
+
+
+class SentimentTimelineTest(TestCase):
+    def test_averages_per_speaker_and_window(self):
+        from sentiment.timeline import build_timeline
+        segments = [
+            {'speaker': 'A', 'start': 0, 'end': 30, 'text': 'Great start.'},
+            {'speaker': 'A', 'start': 30, 'end': 40, 'text': 'Bad news.'},
+            {'speaker': 'B', 'start': 50, 'end': 80, 'text': 'Hmm.'},
+            {'speaker': 'A', 'start': 130, 'end': 150, 'text': 'Fine.'},
+        ]
+        positive = {'neg': 0.0, 'neu': 0.0, 'pos': 1.0}
+        negative = {'neg': 1.0, 'neu': 0.0, 'pos': 0.0}
+        neutral = {'neg': 0.0, 'neu': 1.0, 'pos': 0.0}
+        timeline = build_timeline(segments, [positive, negative, neutral, neutral], 60)
+
+        self.assertEqual(timeline['windows'], 3)
+        self.assertEqual([s['speaker'] for s in timeline['speakers']], ['A', 'B'])
+        a, b = timeline['speakers']
+        # Weighted by duration: 30 s positive, 10 s negative
+        self.assertAlmostEqual(a['points'][0]['score'], 0.5)
+        self.assertEqual(a['points'][0]['segments'], 2)
+        self.assertEqual([p['window'] for p in a['points']], [0, 2])
+        # B's segment is centred after the first minute
+        self.assertEqual(b['points'][0]['window'], 1)
+        self.assertAlmostEqual(a['overall']['neu'], 20 / 60)
+
+    def test_scores_segments_in_batches(self):
+        from sentiment.inference import result_cache
+        from sentiment.timeline import sentiment_timeline
+        from XIRCLS import model_registry
+        from XIRCLS.benchmarks.standins import standin_sentiment_model
+
+        segments = [
+            {'speaker': f'SPEAKER_0{i % 2}', 'start': i * 5, 'end': i * 5 + 5, 'text': f'Line number {i}.'}
+            for i in range(40)
+        ]
+        segments.append({'speaker': 'SPEAKER_00', 'start': 200, 'end': 201, 'text': ''})
+        # Stand-in scores must not reach the shared (on-disk) cache
+        with result_cache.isolated(), model_registry.override('sentiment', standin_sentiment_model()):
+            timeline = sentiment_timeline(segments, window_seconds=60)
+        self.assertEqual(timeline['windows'], 4)
+        self.assertEqual(sum(p['segments'] for s in timeline['speakers'] for p in s['points']), 40)
+        for speaker in timeline['speakers']:
+            total = speaker['overall']['neg'] + speaker['overall']['neu'] + speaker['overall']['pos']
+            self.assertAlmostEqual(total, 1.0, places=4)
+
+
+class AsyncSentimentViewsTest(TestCase):
+    def setUp(self):
+        from sentiment.inference import result_cache
+        from XIRCLS import model_registry
+        from XIRCLS.benchmarks.standins import standin_sentiment_model
+
+        self.enterContext(result_cache.isolated())
+        self.enterContext(model_registry.override('sentiment', standin_sentiment_model()))
+
+    async def test_sentiment(self):
+        response = await self.async_client.post(
+            reverse('api_async_sentiment'), {'text': 'I love this!'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['text'], 'I love this!')
+        self.assertAlmostEqual(data['neg'] + data['neu'] + data['pos'], 1.0, places=4)
+
+    async def test_batch(self):
+        texts = ['Good.', 'Bad.', 'Good.']
+        response = await self.async_client.post(
+            reverse('api_async_sentiment_batch'), {'texts': texts}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([r['text'] for r in results], texts)
+        self.assertEqual(results[0], results[2])
+
+    async def test_invalid_input(self):
+        response = await self.async_client.post(
+            reverse('api_async_sentiment_batch'), {'texts': []}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        response = await self.async_client.post(
+            reverse('api_async_sentiment'), 'not json', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        response = await self.async_client.post(reverse('api_async_voice_vosk'))
+        self.assertEqual(response.status_code, 400)
+        response = await self.async_client.get(reverse('api_async_sentiment'))
+        self.assertEqual(response.status_code, 405)
+
+
+def _sleep_job(audio, submitted_at):
+    """Stand-in recognition job: sleeps for ``float(audio)`` seconds."""
+    time.sleep(float(audio))
+    return {'text': audio.decode(), 'queue_wait': 0.0, 'recognition': float(audio)}
+
+
+def _crash_job(audio, submitted_at):
+    os._exit(1)
+
+
+class VoskWorkerPoolTest(SimpleTestCase):
+    def make_pool(self, job, max_pending=1, timeout=5):
+        from sentiment.vosk_pool import VoskWorkerPool
+        # "fork" so the workers can find the stand-in jobs defined here
+        pool = VoskWorkerPool(1, max_pending, timeout, job=job, initializer=None, start_method='fork')
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def test_busy_timeout_and_slot_release(self):
+        from sentiment.vosk_pool import PoolBusy, PoolTimeout
+        pool = self.make_pool(_sleep_job, timeout=0.2)
+        with self.assertRaises(PoolTimeout):
+            pool.recognize(b'0.6')
+        # The timed-out job still runs and holds the only slot
+        with self.assertRaises(PoolBusy):
+            pool.recognize(b'0')
+        # ...until it finishes
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                self.assertEqual(pool.recognize(b'0')['text'], '0')
+                break
+            except PoolBusy:
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.05)
+
+    def test_crashed_worker_is_replaced(self):
+        from sentiment.vosk_pool import PoolCrashed
+        from sentiment.voice_api_views import recognition_error
+        pool = self.make_pool(_crash_job)
+        with self.assertRaises(PoolCrashed) as raised:
+            pool.recognize(b'0')
+        self.assertEqual(recognition_error(raised.exception)[1], 503)
+        pool.job = _sleep_job
+        self.assertEqual(pool.recognize(b'0')['text'], '0')
+
+
+def make_wav(seconds, rate=44100):
+    """A silent 16-bit mono WAV file of ``seconds``."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(b'\0\0' * int(rate * seconds))
+    return buffer.getvalue()
+
+
+class AudioDecodeTest(SimpleTestCase):
+    def test_lots_of_error_output_does_not_block(self):
+        from sentiment.audio import MAX_ERROR_BYTES, AudioDecodeError, _command_frames
+        # More than a pipe buffer of errors, and nothing on stdout
+        script = "import sys; sys.stderr.write('x' * 1000000 + 'last error'); sys.exit(1)"
+        with self.assertRaises(AudioDecodeError) as raised:
+            list(_command_frames([sys.executable, '-c', script], 4096))
+        message = str(raised.exception)
+        self.assertTrue(message.endswith('last error'))
+        self.assertLessEqual(len(message), MAX_ERROR_BYTES)
+
+    def test_stopping_early_ends_the_process(self):
+        from sentiment.audio import _command_frames
+        script = "import sys\nwhile True: sys.stdout.buffer.write(b'x' * 4096); sys.stderr.write('warning\\n')"
+        frames = _command_frames([sys.executable, '-c', script], 4096)
+        self.assertEqual(len(next(frames)), 4096)
+        frames.close()
+
+    @unittest.skipUnless(shutil.which('ffmpeg'), 'ffmpeg is required to decode audio')
+    def test_pcm_frames(self):
+        from sentiment.audio import FRAME_BYTES, AudioDecodeError, pcm_frames
+        audio = make_wav(seconds=1.0)
+        chunks = [audio[i:i + 1000] for i in range(0, len(audio), 1000)]
+        frames = list(pcm_frames(chunks))
+        self.assertTrue(all(len(frame) == FRAME_BYTES for frame in frames[:-1]))
+        self.assertAlmostEqual(sum(map(len, frames)) / 2 / 16000, 1.0, delta=0.05)
+        with self.assertRaises(AudioDecodeError):
+            list(pcm_frames([b'not audio' * 100]))
+
+    @unittest.skipUnless(shutil.which('ffmpeg'), 'ffmpeg is required to decode audio')
+    @unittest.skipUnless(importlib.util.find_spec('vosk'), 'vosk is not installed')
+    def test_recognize_chunks(self):
+        from sentiment.recognition import MODEL_PATH, recognize_chunks
+        if not os.path.exists(MODEL_PATH):
+            self.skipTest('no Vosk model in vosk_model/')
+        self.assertEqual(recognize_chunks([make_wav(seconds=0.5)]), '')
+
+
+# Stand-in for ffmpeg: passes its input straight through, unbuffered
+PASSTHROUGH = (
+    "import os\n"
+    "while chunk := os.read(0, 65536):\n"
+    "    os.write(1, chunk)\n"
+)
+
+
+class StubRecognizer:
+    """Treats the "PCM" as text: an utterance ends at each ``.``."""
+
+    def __init__(self, model, sample_rate):
+        self.buffer = b''
+        self.text = ''
+
+    def SetWords(self, words):
+        pass
+
+    def AcceptWaveform(self, data):
+        self.buffer += data
+        if b'.' not in self.buffer:
+            return False
+        utterance, self.buffer = self.buffer.split(b'.', 1)
+        self.text = utterance.decode().strip()
+        return True
+
+    def Result(self):
+        return json.dumps({'text': self.text})
+
+    def PartialResult(self):
+        return json.dumps({'partial': self.buffer.decode().strip()})
+
+    def FinalResult(self):
+        return json.dumps({'text': self.buffer.decode().strip()})
+
+
+@unittest.skipUnless(importlib.util.find_spec('vosk'), 'vosk is not installed')
+class VoskStreamTest(SimpleTestCase):
+    """Drive the WebSocket handler through fake ``receive``/``send`` coroutines."""
+
+    def setUp(self):
+        from sentiment import streaming
+        from XIRCLS import model_registry
+        self.enterContext(mock.patch.object(streaming, 'KaldiRecognizer', StubRecognizer))
+        self.enterContext(mock.patch.object(
+            streaming, 'ffmpeg_pcm_command', lambda **kwargs: [sys.executable, '-c', PASSTHROUGH],
+        ))
+        self.enterContext(model_registry.override('vosk', object()))
+        self.incoming = asyncio.Queue()
+        self.outgoing = asyncio.Queue()
+
+    def start(self):
+        from sentiment.streaming import vosk_stream
+        return asyncio.create_task(vosk_stream({'type': 'websocket'}, self.incoming.get, self.outgoing.put))
+
+    async def sent(self):
+        message = await asyncio.wait_for(self.outgoing.get(), timeout=10)
+        if 'text' in message:
+            return json.loads(message['text'])
+        return message
+
+    async def test_streams_partials_results_and_the_final_transcript(self):
+        handler = self.start()
+        await self.incoming.put({'type': 'websocket.connect'})
+        self.assertEqual(await self.sent(), {'type': 'websocket.accept'})
+
+        await self.incoming.put({'type': 'websocket.receive', 'bytes': b'hello'})
+        self.assertEqual(await self.sent(), {'type': 'partial', 'text': 'hello'})
+        await self.incoming.put({'type': 'websocket.receive', 'bytes': b' world.'})
+        self.assertEqual(await self.sent(), {'type': 'result', 'text': 'hello world'})
+        await self.incoming.put({'type': 'websocket.receive', 'bytes': b'bye'})
+        self.assertEqual(await self.sent(), {'type': 'partial', 'text': 'bye'})
+
+        await self.incoming.put({'type': 'websocket.receive', 'text': 'stop'})
+        self.assertEqual(await self.sent(), {'type': 'final', 'text': 'hello world bye'})
+        self.assertEqual(await self.sent(), {'type': 'websocket.close', 'code': 1000})
+        await asyncio.wait_for(handler, timeout=10)
+
+    async def test_disconnect_stops_recognition(self):
+        handler = self.start()
+        await self.incoming.put({'type': 'websocket.connect'})
+        self.assertEqual(await self.sent(), {'type': 'websocket.accept'})
+        await self.incoming.put({'type': 'websocket.receive', 'bytes': b'hello'})
+        self.assertEqual(await self.sent(), {'type': 'partial', 'text': 'hello'})
+
+        await self.incoming.put({'type': 'websocket.disconnect', 'code': 1001})
+        await asyncio.wait_for(handler, timeout=10)
+        self.assertTrue(self.outgoing.empty())
+
+    async def test_full_pool_closes_with_try_again_later(self):
+        from XIRCLS import executors
+        pool = executors.BoundedExecutor('vosk_stream', workers=1, max_pending=1)
+        self.enterContext(mock.patch.dict(executors._executors, {'vosk_stream': pool}))
+
+        # Refused before the handshake...
+        pool._slots.acquire()
+        handler = self.start()
+        await self.incoming.put({'type': 'websocket.connect'})
+        self.assertEqual(await self.sent(), {'type': 'websocket.close', 'code': 1013})
+        await asyncio.wait_for(handler, timeout=10)
+
+        # ...or once the stream needs recognition
+        pool._slots.release()
+        handler = self.start()
+        await self.incoming.put({'type': 'websocket.connect'})
+        self.assertEqual(await self.sent(), {'type': 'websocket.accept'})
+        pool._slots.acquire()
+        await self.incoming.put({'type': 'websocket.receive', 'bytes': b'hello'})
+        self.assertEqual(await self.sent(), {'type': 'websocket.close', 'code': 1013})
+        await asyncio.wait_for(handler, timeout=10)
+        pool.shutdown()
+
+    async def test_recognition_failure_closes_while_audio_keeps_coming(self):
+        from sentiment import streaming
+
+        class BrokenRecognizer(StubRecognizer):
+            def AcceptWaveform(self, data):
+                raise RuntimeError('recognizer crashed')
+
+        self.enterContext(mock.patch.object(streaming, 'KaldiRecognizer', BrokenRecognizer))
+        handler = self.start()
+        await self.incoming.put({'type': 'websocket.connect'})
+        self.assertEqual(await self.sent(), {'type': 'websocket.accept'})
+        # Far more than the pipes hold, with nobody reading ffmpeg's output
+        for _ in range(64):
+            await self.incoming.put({'type': 'websocket.receive', 'bytes': b'x' * 65536})
+        with self.assertLogs(streaming.logger, 'ERROR'):
+            self.assertEqual(await self.sent(), {'type': 'websocket.close', 'code': 1011})
+            await asyncio.wait_for(handler, timeout=10)
+
+    async def test_decode_failure_sends_an_error(self):
+        from sentiment import streaming
+        script = "import sys; sys.stderr.write('Invalid data found when processing input'); sys.exit(1)"
+        self.enterContext(mock.patch.object(
+            streaming, 'ffmpeg_pcm_command', lambda **kwargs: [sys.executable, '-c', script],
+        ))
+        handler = self.start()
+        await self.incoming.put({'type': 'websocket.connect'})
+        self.assertEqual(await self.sent(), {'type': 'websocket.accept'})
+        await self.incoming.put({'type': 'websocket.receive', 'bytes': b'not audio'})
+        with self.assertLogs(streaming.logger, 'WARNING') as logs:
+            self.assertEqual(await self.sent(), {'type': 'error', 'text': 'Error converting audio file.'})
+            self.assertEqual(await self.sent(), {'type': 'websocket.close', 'code': 1011})
+            await asyncio.wait_for(handler, timeout=10)
+        self.assertIn('Invalid data found', logs.output[0])
+
+    async def test_ignores_anything_but_a_connect(self):
+        await self.incoming.put({'type': 'websocket.disconnect', 'code': 1001})
+        await asyncio.wait_for(self.start(), timeout=10)
+        self.assertTrue(self.outgoing.empty())
+
+
+# Stand-in for ffmpeg that rejects whatever it is given
+REJECT = (
+    "import sys\n"
+    "sys.stdin.buffer.read()\n"
+    "sys.stderr.write('Invalid data found when processing input')\n"
+    "sys.exit(1)\n"
+)
+
+
+@unittest.skipUnless(importlib.util.find_spec('vosk'), 'vosk is not installed')
+class RecognitionErrorsTest(SimpleTestCase):
+    def errors(self, stage):
+        from XIRCLS import metrics
+        return metrics.STAGE_ERRORS.samples.get(
+            metrics.STAGE_ERRORS._key({'pipeline': 'vosk', 'stage': stage}), 0
+        )
+
+    def recognize(self, recognizer, decoder):
+        from sentiment import recognition
+        from sentiment.audio import FRAME_BYTES, _command_frames
+        before = {stage: self.errors(stage) for stage in ('ffmpeg', 'recognition')}
+        with mock.patch.object(recognition, 'KaldiRecognizer', recognizer), \
+                mock.patch.object(
+                    recognition, 'pcm_frames',
+                    lambda chunks: _command_frames([sys.executable, '-c', decoder], FRAME_BYTES, chunks),
+                ):
+            try:
+                recognition.recognize_chunks([b'not audio' * 100], model=object())
+            finally:
+                self.increase = {stage: self.errors(stage) - count for stage, count in before.items()}
+
+    def test_undecodable_upload_counts_against_ffmpeg(self):
+        from sentiment.audio import AudioDecodeError
+        with self.assertRaises(AudioDecodeError):
+            self.recognize(StubRecognizer, REJECT)
+        self.assertEqual(self.increase, {'ffmpeg': 1, 'recognition': 0})
+
+    def test_recognizer_failure_counts_against_recognition(self):
+        class BrokenRecognizer(StubRecognizer):
+            def AcceptWaveform(self, data):
+                raise RuntimeError('recognizer crashed')
+
+        with self.assertRaises(RuntimeError):
+            self.recognize(BrokenRecognizer, PASSTHROUGH)
+        self.assertEqual(self.increase, {'ffmpeg': 0, 'recognition': 1})
+
+
+class ShiftedBackend:
+    """Stand-in candidate backend: the reference's logits plus ``shift`` on the first label."""
+    name = 'shifted'
+
+    def __init__(self, reference, shift):
+        self.reference = reference
+        self.shift = shift
+
+    def logits(self, encoded):
+        logits = self.reference.logits(encoded).copy()
+        logits[:, 0] += self.shift
+        return logits
+
+
+class SentimentBackendTest(SimpleTestCase):
+    texts = ['I love this product!', 'This is terrible.', 'ok']
+
+    def test_parity_check(self):
+        from sentiment.backends import parity_check
+        from XIRCLS.benchmarks.standins import standin_sentiment_model
+        tokenizer, reference = standin_sentiment_model()
+
+        report = parity_check(ShiftedBackend(reference, 1e-4), reference, tokenizer, self.texts, tolerance=1e-3)
+        self.assertTrue(report['ok'])
+        self.assertEqual((report['backend'], report['texts']), ('shifted', 3))
+        self.assertEqual(report['label_agreement'], 1.0)
+
+        report = parity_check(ShiftedBackend(reference, 5.0), reference, tokenizer, self.texts, tolerance=1e-3)
+        self.assertFalse(report['ok'])
+        self.assertGreater(report['max_abs_diff'], 1e-3)
+
+    def test_unknown_backend(self):
+        from sentiment.backends import build_backend
+        with self.assertRaisesMessage(ValueError, "Unknown sentiment backend 'tpu'"):
+            build_backend('tpu', model=None, tokenizer=None)
+
+    def test_check_command(self):
+        from unittest import mock
+
+        from django.core.management import CommandError, call_command
+
+        from sentiment.backends import build_backend
+        from sentiment.management.commands import check_sentiment_backend as command
+        from XIRCLS.benchmarks.standins import standin_sentiment_model
+        tokenizer, reference = standin_sentiment_model()
+
+        def run(backend, shift=0.0):
+            def build(name, model, tokenizer, **kwargs):
+                if name == 'shifted':
+                    return ShiftedBackend(reference, shift)
+                return build_backend(name, model, tokenizer, **kwargs)
+
+            out = io.StringIO()
+            with mock.patch.object(command, 'load_pretrained', return_value=(tokenizer, None)), \
+                    mock.patch.object(command, 'TorchBackend', return_value=reference), \
+                    mock.patch.object(command, 'build_backend', build):
+                call_command('check_sentiment_backend', backend, '--tolerance', '0.001', stdout=out)
+            return out.getvalue()
+
+        self.assertIn("Backend 'shifted' matches eager torch.", run('shifted'))
+        with self.assertRaisesMessage(CommandError, "differs from eager torch"):
+            run('shifted', shift=5.0)
+        with self.assertRaisesMessage(CommandError, "Unknown sentiment backend 'tpu'"):
+            run('tpu')
+
+    def test_export_never_leaves_a_partial_file(self):
+        import tempfile
+        import threading
+
+        from sentiment.backends import _write_atomically
+        graph = b'graph' * 20000
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        path = os.path.join(directory, 'model.onnx')
+
+        def slow_export(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                for i in range(0, len(graph), 10000):
+                    f.write(graph[i:i + 10000])
+                    f.flush()
+                    time.sleep(0.002)
+
+        # Several preloading processes exporting at once, and one loading
+        exporters = [
+            threading.Thread(target=_write_atomically, args=(path, slow_export)) for _ in range(4)
+        ]
+        for exporter in exporters:
+            exporter.start()
+        seen = []
+        while any(exporter.is_alive() for exporter in exporters):
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    seen.append(f.read())
+        for exporter in exporters:
+            exporter.join()
+
+        self.assertTrue(all(data == graph for data in seen))
+        self.assertEqual(os.listdir(directory), ['model.onnx'])
+
+        def failed_export(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                f.write(b'half')
+            raise RuntimeError('export failed')
+
+        os.remove(path)
+        with self.assertRaises(RuntimeError):
+            _write_atomically(path, failed_export)
+        self.assertEqual(os.listdir(directory), [])
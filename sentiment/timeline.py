@@ -0,0 +1,84 @@
+# sentiment/timeline.py
+"""
+Sentiment over a whole transcript: how each speaker's tone moves through a
+meeting.
+
+Every segment's text is scored with ``score_many``, i.e. in length-bucketed,
+padded forward passes of the same RoBERTa model the API uses (with repeated
+lines answered from the result cache), rather than one request per segment.
+The scores are then averaged per speaker over fixed time windows, weighted
+by how long each segment lasts.
+"""
+import math
+
+from django.conf import settings
+
+from .inference import score_many
+
+LABELS = ("neg", "neu", "pos")
+
+
+def _average(scored: list[tuple]) -> dict:
+    """Duration-weighted mean of (weight, scores) pairs, plus ``score`` = pos − neg."""
+    total = sum(weight for weight, _ in scored)
+    mean = {label: sum(weight * scores[label] for weight, scores in scored) / total for label in LABELS}
+    mean["score"] = mean["pos"] - mean["neg"]
+    return mean
+
+
+def build_timeline(segments: list[dict], scores: list[dict], window_seconds: float) -> dict:
+    """
+    Group scored ``segments`` (``scores[i]`` belongs to ``segments[i]``) by
+    speaker and by the ``window_seconds`` window their midpoint falls in.
+
+    Returns ``{"window_seconds", "windows", "speakers"}``, where ``windows``
+    is the number of windows the meeting spans and ``speakers`` lists, in
+    order of first appearance, each speaker's ``overall`` average and its
+    ``points``: one average per window in which the speaker talked, with
+    its ``window`` index, ``start``, ``end`` and ``segments`` count.
+    """
+    by_speaker = {}
+    duration = 0.0
+    for segment, segment_scores in zip(segments, scores):
+        start, end = segment["start"], segment["end"]
+        duration = max(duration, end)
+        # Very short segments still count a little
+        weight = max(end - start, 0.1)
+        window = int((start + end) / 2 // window_seconds)
+        by_speaker.setdefault(segment["speaker"], {}).setdefault(window, []).append((weight, segment_scores))
+
+    speakers = []
+    for speaker, windows in by_speaker.items():
+        points = [
+            {
+                "window": window,
+                "start": window * window_seconds,
+                "end": (window + 1) * window_seconds,
+                "segments": len(scored),
+                **_average(scored),
+            }
+            for window, scored in sorted(windows.items())
+        ]
+        speakers.append({
+            "speaker": speaker,
+            "overall": _average([item for scored in windows.values() for item in scored]),
+            "points": points,
+        })
+
+    return {
+        "window_seconds": window_seconds,
+        "windows": max(math.ceil(duration / window_seconds), 1) if segments else 0,
+        "speakers": speakers,
+    }
+
+
+def sentiment_timeline(segments: list[dict], window_seconds: float = None) -> dict:
+    """
+    Score every segment of a transcript (``{"speaker", "start", "end",
+    "text"}`` dicts) in batches and return the per-speaker timeline; see
+    ``build_timeline``.
+    """
+    window_seconds = window_seconds or settings.SENTIMENT_TIMELINE_WINDOW_SECONDS
+    segments = [segment for segment in segments if segment.get("text")]
+    scores = score_many([segment["text"] for segment in segments]) if segments else []
+    return build_timeline(segments, scores, window_seconds)
@@ -1,34 +1,49 @@
 # sentiment/voice_api_views.py
-import os
-import subprocess
-import wave
-import json
-
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
-from vosk import Model, KaldiRecognizer
+from XIRCLS import metrics
+
+from .audio import AudioDecodeError
+from .vosk_pool import PoolBusy, PoolCrashed, PoolTimeout, recognize_upload
+
+
+# Recognition failures and the response each one gets
+RECOGNITION_ERRORS = (
+    (AudioDecodeError, "Error converting audio file.", status.HTTP_500_INTERNAL_SERVER_ERROR),
+    (PoolBusy, "Too many voice requests in progress, please retry.", status.HTTP_503_SERVICE_UNAVAILABLE),
+    (PoolTimeout, "Voice recognition timed out.", status.HTTP_504_GATEWAY_TIMEOUT),
+    (PoolCrashed, "Voice recognition failed, please retry.", status.HTTP_503_SERVICE_UNAVAILABLE),
+)
+RECOGNITION_EXCEPTIONS = tuple(exc_type for exc_type, _, _ in RECOGNITION_ERRORS)
+
 
-# Determine project root from current file location (assuming sentiment/ is inside your project)
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-MODEL_PATH = os.path.join(
-    BASE_DIR, "vosk_model"
-)  # Make sure your Vosk model is extracted here
+def recognition_error(exc):
+    """The (error message, status code) for a recognition failure, or ``None``."""
+    for exc_type, message, status_code in RECOGNITION_ERRORS:
+        if isinstance(exc, exc_type):
+            return message, status_code
+    return None
 
-if not os.path.exists(MODEL_PATH):
-    raise Exception(
-        "Vosk model not found. Please download and extract a model to the 'vosk_model' folder."
-    )
 
-# Load the Vosk model (this might take a few seconds)
-vosk_model = Model(MODEL_PATH)
+def recognition_payload(result: dict) -> dict:
+    """The response body for a ``recognize_upload`` result."""
+    metrics.STAGE_SECONDS.observe(result["queue_wait"], pipeline="vosk", stage="queue_wait")
+    return {
+        "recognized_text": result["text"],
+        "timing": {
+            "queue_wait_ms": round(result["queue_wait"] * 1000, 1),
+            "recognition_ms": round(result["recognition"] * 1000, 1),
+        },
+    }
 
 
 class VoiceVoskAPIView(APIView):
     """
-    API endpoint that receives an audio file (WebM) via POST, converts it to WAV,
-    processes it with Vosk, and returns the recognized text.
+    API endpoint that receives an audio file (WebM) via POST, decodes it to
+    16 kHz mono PCM with ffmpeg, processes it with Vosk, and returns the
+    recognized text.
     """
 
     def post(self, request, format=None):
@@ -38,81 +53,14 @@ class VoiceVoskAPIView(APIView):
             )
 
         audio_file = request.FILES["audio"]
-        # Save the uploaded file temporarily
-        temp_webm_path = "temp_audio.webm"
-        with open(temp_webm_path, "wb+") as destination:
-            for chunk in audio_file.chunks():
-                destination.write(chunk)
-
-        # Convert the WebM file to a WAV file using ffmpeg with proper settings:
-        # -y: overwrite output file
-        # -i: input file
-        # -ar 16000: set sample rate to 16kHz
-        # -ac 1: mono channel
-        # -acodec pcm_s16le: 16-bit PCM encoding
-        temp_wav_path = "temp_audio.wav"
+        # The upload is streamed into ffmpeg's stdin and the PCM it writes to
+        # stdout goes straight into the recognizer, so no temp files are
+        # written and concurrent requests can't clobber each other. When
+        # VOSK_POOL_WORKERS is set this happens on a recognition worker process.
         try:
-            cmd = [
-                "ffmpeg",
-                "-y",
-                "-i",
-                temp_webm_path,
-                "-ar",
-                "16000",
-                "-ac",
-                "1",
-                "-acodec",
-                "pcm_s16le",
-                temp_wav_path,
-            ]
-            subprocess.run(
-                cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-            )
-        except subprocess.CalledProcessError as e:
-            os.remove(temp_webm_path)
-            return Response(
-                {"error": "Error converting audio file."},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
-
-        # Open the WAV file and process it with Vosk
-        try:
-            wf = wave.open(temp_wav_path, "rb")
-        except Exception as e:
-            os.remove(temp_webm_path)
-            os.remove(temp_wav_path)
-            return Response(
-                {"error": f"Error processing WAV file: {str(e)}"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # Ensure the WAV file is in the correct format (mono, 16-bit PCM)
-        if wf.getnchannels() != 1 or wf.getsampwidth() != 2:
-            wf.close()
-            os.remove(temp_webm_path)
-            os.remove(temp_wav_path)
-            return Response(
-                {"error": "Audio file must be mono PCM WAV (16-bit)."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        rec = KaldiRecognizer(vosk_model, wf.getframerate())
-        rec.SetWords(True)
-
-        results = []
-        while True:
-            data = wf.readframes(4000)
-            if len(data) == 0:
-                break
-            if rec.AcceptWaveform(data):
-                res = json.loads(rec.Result())
-                results.append(res.get("text", ""))
-        final_res = json.loads(rec.FinalResult())
-        results.append(final_res.get("text", ""))
-
-        wf.close()
-        os.remove(temp_webm_path)
-        os.remove(temp_wav_path)
+            result = recognize_upload(audio_file)
+        except RECOGNITION_EXCEPTIONS as e:
+            message, status_code = recognition_error(e)
+            return Response({"error": message}, status=status_code)
 
-        recognized_text = " ".join(results).strip()
-        return Response({"recognized_text": recognized_text}, status=status.HTTP_200_OK)
+        return Response(recognition_payload(result), status=status.HTTP_200_OK)
@@ -0,0 +1,134 @@
+# sentiment/vosk_pool.py
+"""
+Pool of Vosk recognition worker processes.
+
+Recognition is CPU-bound and holds its thread for roughly the length of the
+clip, so inside a single web worker one long clip delays everyone else. With
+``VOSK_POOL_WORKERS`` > 0 the API dispatches each upload to one of that many
+processes instead. Each process loads the Vosk model once at start-up and
+builds a fresh recognizer per job. At most ``VOSK_POOL_MAX_PENDING`` jobs may
+be running or queued at once; beyond that ``PoolBusy`` is raised rather than
+letting the backlog grow without bound. Callers wait at most
+``VOSK_POOL_TIMEOUT`` seconds for a result. If a worker dies mid-job the pool
+is restarted and ``PoolCrashed`` raised.
+"""
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from .recognition import load_vosk_model, recognize_chunks
+
+
+class PoolBusy(Exception):
+    """Raised when the pool already has VOSK_POOL_MAX_PENDING jobs."""
+
+
+class PoolTimeout(Exception):
+    """Raised when a job does not finish within VOSK_POOL_TIMEOUT seconds."""
+
+
+class PoolCrashed(Exception):
+    """Raised when a worker process died during a job (e.g. killed for memory)."""
+
+
+# Set in each worker process by _init_worker
+_worker_model = None
+
+
+def _init_worker():
+    global _worker_model
+    _worker_model = load_vosk_model()
+
+
+def _recognize_job(audio: bytes, submitted_at: float) -> dict:
+    started_at = time.time()
+    text = recognize_chunks([audio], model=_worker_model)
+    return {
+        "text": text,
+        "queue_wait": started_at - submitted_at,
+        "recognition": time.time() - started_at,
+    }
+
+
+class VoskWorkerPool:
+    def __init__(self, workers, max_pending, timeout, job=_recognize_job,
+                 initializer=_init_worker, start_method="spawn"):
+        self.workers = workers
+        self.max_pending = max(max_pending, workers)
+        self.timeout = timeout
+        self.job = job
+        self.initializer = initializer
+        self.start_method = start_method
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # "spawn" so workers don't inherit the web process's threads
+                # and already-loaded models.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=self.initializer,
+                )
+            return self._executor
+
+    def _reset(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def recognize(self, audio: bytes) -> dict:
+        """
+        Recognize ``audio`` (an encoded upload) on a worker process and return
+        ``{"text", "queue_wait", "recognition"}`` with the times in seconds.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise PoolBusy(f"{self.max_pending} voice jobs already pending.")
+        try:
+            future = self._get_executor().submit(self.job, audio, time.time())
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PoolTimeout(f"Voice job did not finish within {self.timeout}s.")
+        except BrokenProcessPool as e:
+            # A worker died (e.g. OOM); start a fresh pool for the next job.
+            self._reset()
+            raise PoolCrashed("A voice recognition worker stopped unexpectedly.") from e
+
+    def shutdown(self):
+        self._reset()
+
+
+pool = VoskWorkerPool(
+    workers=settings.VOSK_POOL_WORKERS,
+    max_pending=settings.VOSK_POOL_MAX_PENDING,
+    timeout=settings.VOSK_POOL_TIMEOUT,
+)
+
+
+def recognize_upload(audio_file) -> dict:
+    """
+    Recognize an uploaded audio file, on the worker pool if one is
+    configured or in this process otherwise. Returns the text together with
+    the queue wait and recognition times in seconds.
+    """
+    if pool.workers > 0:
+        return pool.recognize(audio_file.read())
+    started_at = time.time()
+    text = recognize_chunks(audio_file.chunks())
+    return {"text": text, "queue_wait": 0.0, "recognition": time.time() - started_at}
@@ -0,0 +1,113 @@
+# transcription/benchmark_modes.py
+"""
+Compare the transcription modes on one recording.
+
+Decoding and diarization are shared by both modes, so they run once; each
+mode's ASR stage is then timed separately (after a warm-up load of the
+Whisper pipeline) and the outputs are compared. Finally the "pipelined" mode
+is timed end to end against sequential diarization followed by "words".
+
+Usage (from the repository root):
+
+    python -m transcription.benchmark_modes meeting.mp3 [--batch-size 8] [--json out.json]
+"""
+import argparse
+import difflib
+import json
+import time
+
+from XIRCLS import model_registry
+from transcription.transcribe_with_speaker_labels_hf import (
+    ASR_BATCH_SIZE,
+    decode_and_diarize,
+    transcribe_pipelined,
+    transcribe_turns,
+    transcribe_words,
+)
+
+MODES = {
+    "segments": transcribe_turns,
+    "words": transcribe_words,
+}
+
+
+def _words(segments):
+    return " ".join(seg["text"] for seg in segments).lower().split()
+
+
+def _speaker_agreement(reference, other):
+    """Fraction of the reference's speech time labelled with the same speaker in ``other``."""
+    total = agree = 0.0
+    for ref in reference:
+        duration = ref["end"] - ref["start"]
+        total += duration
+        for seg in other:
+            if seg["speaker"] != ref["speaker"]:
+                continue
+            agree += max(0.0, min(ref["end"], seg["end"]) - max(ref["start"], seg["start"]))
+    return agree / total if total else 0.0
+
+
+def run(mp3_path, batch_size=ASR_BATCH_SIZE):
+    start = time.perf_counter()
+    waveform, turns = decode_and_diarize(mp3_path)
+    decode_and_diarize_seconds = time.perf_counter() - start
+    report = {
+        "audio_seconds": len(waveform) / 16000,
+        "speaker_turns": len(turns),
+        "decode_and_diarize_seconds": decode_and_diarize_seconds,
+        "modes": {},
+    }
+
+    # Load Whisper up front so neither mode pays for it
+    model_registry.get("asr")
+
+    outputs = {}
+    for name, transcribe in MODES.items():
+        start = time.perf_counter()
+        outputs[name] = transcribe(waveform, turns, batch_size)
+        report["modes"][name] = {
+            "asr_seconds": time.perf_counter() - start,
+            "segments": len(outputs[name]),
+            "words": len(_words(outputs[name])),
+        }
+
+    reference, other = outputs["segments"], outputs["words"]
+    report["comparison"] = {
+        "word_similarity": difflib.SequenceMatcher(
+            None, _words(reference), _words(other), autojunk=False
+        ).ratio(),
+        "speaker_agreement": _speaker_agreement(reference, other),
+        "speedup": report["modes"]["segments"]["asr_seconds"]
+        / max(report["modes"]["words"]["asr_seconds"], 1e-9),
+    }
+
+    start = time.perf_counter()
+    outputs["pipelined"] = transcribe_pipelined(mp3_path, batch_size)
+    pipelined_seconds = time.perf_counter() - start
+    sequential_seconds = decode_and_diarize_seconds + report["modes"]["words"]["asr_seconds"]
+    report["pipelined"] = {
+        "total_seconds": pipelined_seconds,
+        "sequential_words_seconds": sequential_seconds,
+        "speedup": sequential_seconds / max(pipelined_seconds, 1e-9),
+        "segments": len(outputs["pipelined"]),
+    }
+    return report, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("mp3_path")
+    parser.add_argument("--batch-size", type=int, default=ASR_BATCH_SIZE)
+    parser.add_argument("--json", help="Also write the report and both outputs to this file.")
+    args = parser.parse_args()
+
+    report, outputs = run(args.mp3_path, args.batch_size)
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"report": report, "outputs": outputs}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
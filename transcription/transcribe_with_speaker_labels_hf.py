@@ -1,15 +1,15 @@
 # transcription/transcribe_with_speaker_labels_hf.py
 
-import os
-import tempfile
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 from decouple import config
 from dotenv import load_dotenv
-from pydub import AudioSegment
-from pyannote.audio import Pipeline as PyannotePipeline
-from transformers import pipeline as hf_pipeline
-import torch  # needed to check for GPU availability
+
+from XIRCLS import metrics, model_registry
+from sentiment.audio import AudioDecodeError
+from transcription.waveform import decode_file, decode_stream
 
 # ─────────────────────────────────────────────────────────────────────────────
 # SUPPRESS NON-CRITICAL WARNINGS
@@ -36,139 +36,557 @@ ASR_MODEL = "openai/whisper-small"
 # How many seconds per internal Whisper chunk
 CHUNK_LENGTH_SECONDS = 60
 
+# How many speaker segments Whisper transcribes per forward pass
+ASR_BATCH_SIZE = config("ASR_BATCH_SIZE", default=8, cast=int)
+
+# All audio is resampled to 16 kHz mono before diarization and ASR
+SAMPLE_RATE = 16000
+
+# How speech is transcribed once the speaker turns are known:
+#   - "segments": Whisper runs separately on each diarized speaker turn
+#   - "words":    Whisper runs once over the whole recording with word-level
+#                 timestamps, and each word is assigned to the speaker turn it
+#                 overlaps most
+#   - "pipelined": like "words", but Whisper runs at the same time as
+#                 diarization instead of after it, so the wall time is close
+#                 to the slower of the two stages rather than their sum
+TRANSCRIPTION_MODES = ("segments", "words", "pipelined")
+TRANSCRIPTION_MODE = config("TRANSCRIPTION_MODE", default="segments")
+
 # Pyannote speaker‐diarization pipeline name
 DIARIZATION_MODEL = "pyannote/speaker-diarization"
 
+# Recordings of at least DIARIZATION_CHUNKED_MIN_SECONDS are diarized in
+# windows of DIARIZATION_WINDOW_SECONDS overlapping by
+# DIARIZATION_WINDOW_OVERLAP_SECONDS, so memory and time grow with the window
+# rather than the meeting. Speakers are linked across windows by clustering
+# their embeddings; window speakers closer than DIARIZATION_LINK_THRESHOLD
+# (cosine distance) are taken to be the same person. 0 disables chunking.
+DIARIZATION_CHUNKED_MIN_SECONDS = config("DIARIZATION_CHUNKED_MIN_SECONDS", default=3600, cast=float)
+DIARIZATION_WINDOW_SECONDS = config("DIARIZATION_WINDOW_SECONDS", default=1200, cast=float)
+DIARIZATION_WINDOW_OVERLAP_SECONDS = config("DIARIZATION_WINDOW_OVERLAP_SECONDS", default=60, cast=float)
+DIARIZATION_LINK_THRESHOLD = config("DIARIZATION_LINK_THRESHOLD", default=0.6, cast=float)
+
 # ─────────────────────────────────────────────────────────────────────────────
 # AUTH TOKEN (for gated HF + Pyannote models)
 # ─────────────────────────────────────────────────────────────────────────────
 HF_TOKEN = config("HUGGINGFACE_TOKEN", default=None)
 
 # ─────────────────────────────────────────────────────────────────────────────
-# DETECT GPU AVAILABILITY AND SET DEVICE INDEX
+# MODEL LOADERS (called lazily through XIRCLS.model_registry)
 # ─────────────────────────────────────────────────────────────────────────────
-# If a CUDA‐capable GPU is present, device_index = 0; otherwise -1 (CPU).
-DEVICE_INDEX = 0 if torch.cuda.is_available() else -1
+#
+# torch, pyannote and transformers are imported inside the loaders so that
+# importing this module (e.g. from outlook_integration.views during
+# `manage.py migrate`) stays cheap.
 
-# ─────────────────────────────────────────────────────────────────────────────
-# PRELOAD HEAVY MODELS AT MODULE LOAD
-# ─────────────────────────────────────────────────────────────────────────────
+def load_diarizer():
+    """Registry loader: the Pyannote diarization pipeline."""
+    from pyannote.audio import Pipeline as PyannotePipeline
+
+    return PyannotePipeline.from_pretrained(
+        DIARIZATION_MODEL,
+        use_auth_token=HF_TOKEN
+    )
+
+
+def load_asr():
+    """Registry loader: the Whisper ASR pipeline."""
+    import torch  # needed to check for GPU availability
+    from transformers import pipeline as hf_pipeline
 
-# 1) Pyannote diarization pipeline
-diarizer = PyannotePipeline.from_pretrained(
-    DIARIZATION_MODEL,
-    use_auth_token=HF_TOKEN
-)
+    # If a CUDA‐capable GPU is present, device_index = 0; otherwise -1 (CPU).
+    device_index = 0 if torch.cuda.is_available() else -1
 
-# 2) Whisper ASR pipeline (chunk_length_s controls how we internally batch)
-asr = hf_pipeline(
-    "automatic-speech-recognition",
-    model=ASR_MODEL,
-    chunk_length_s=CHUNK_LENGTH_SECONDS,
-    device=DEVICE_INDEX,      # 0 if GPU is available, else -1 (CPU)
-    trust_remote_code=True
-)
+    # chunk_length_s controls how we internally batch
+    return hf_pipeline(
+        "automatic-speech-recognition",
+        model=ASR_MODEL,
+        chunk_length_s=CHUNK_LENGTH_SECONDS,
+        device=device_index,      # 0 if GPU is available, else -1 (CPU)
+        trust_remote_code=True
+    )
 
 # ─────────────────────────────────────────────────────────────────────────────
-# MAIN FUNCTION: TRANSCRIBE WITH SPEAKER LABELS
+# HELPERS
 # ─────────────────────────────────────────────────────────────────────────────
 
-def transcribe_with_speaker_labels(mp3_path: str) -> list[dict]:
+def _report(progress, stage: str, fraction: float):
+    """Call the optional ``progress(stage, fraction)`` callback."""
+    if progress is not None:
+        progress(stage, fraction)
+
+
+def _transcribe_batch(asr, group: list[np.ndarray], batch_size: int) -> list[str]:
     """
-    1) Convert MP3 → WAV (mono, 16 kHz).
-    2) Run Pyannote diarization on the full WAV to get speaker segments.
-    3) For each speaker segment:
-         a) Slice out that time interval from the full audio.
-         b) Export it to a temp WAV file.
-         c) Run Whisper (chunked) on that slice → get text.
-         d) Append { "speaker", "start", "end", "text" } if text is non-empty.
-    4) Clean up temp files.
-    5) Return a list of speaker‐labeled segments.
+    Run Whisper over one batch of in-memory waveform slices. If the batch
+    fails, its slices are retried one by one so a single bad slice only
+    loses its own text.
     """
+    def inputs(slices):
+        # The pipeline consumes these dicts, so build fresh ones per call
+        return [{"raw": audio, "sampling_rate": SAMPLE_RATE} for audio in slices]
 
-    # ─────────────────────────────────────────────────────────────────────────
-    # 1) CONVERT MP3 → WAV (mono, 16 kHz)
-    # ─────────────────────────────────────────────────────────────────────────
-    tmp_wav_handle = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
     try:
-        audio = AudioSegment.from_file(mp3_path, format="mp3")
-        audio = audio.set_frame_rate(16000).set_channels(1)
-        audio.export(tmp_wav_handle.name, format="wav")
-    except Exception as e:
-        tmp_wav_handle.close()
-        os.remove(tmp_wav_handle.name)
-        raise RuntimeError(f"[Transcription] Failed converting MP3 to WAV: {e}")
-    finally:
-        tmp_wav_handle.close()
-
-    wav_path = tmp_wav_handle.name
-
-    # ─────────────────────────────────────────────────────────────────────────
-    # 2) RUN PYANNOTE DIARIZATION ON THE FULL WAV
-    # ─────────────────────────────────────────────────────────────────────────
-    diarization = diarizer(wav_path)
-
-    # ─────────────────────────────────────────────────────────────────────────
-    # 3) LOAD FULL WAV INTO PYDUB FOR SLICING
-    # ─────────────────────────────────────────────────────────────────────────
-    try:
-        full_audio = AudioSegment.from_wav(wav_path)
-    except Exception as e:
-        os.remove(wav_path)
-        raise RuntimeError(f"[Transcription] Failed loading WAV into pydub: {e}")
+        results = asr(inputs(group), batch_size=batch_size)
+    except Exception:
+        results = []
+        for audio in group:
+            try:
+                results.append(asr(inputs([audio])[0]))
+            except Exception:
+                results.append({})
+    return [result.get("text", "").strip() for result in results]
 
+
+def assign_words_to_speakers(words: list[tuple], turns: list[tuple]) -> list[dict]:
+    """
+    Attach each timestamped word to a diarized speaker turn and merge runs of
+    words from the same speaker into segments.
+
+    ``words`` is a time-ordered list of (start, end, text) and ``turns`` a
+    list of (speaker, start, end). A word goes to the turn it overlaps most;
+    words that fall in a gap between turns go to the nearest turn.
+    """
+    turns = sorted(turns, key=lambda turn: turn[1])
     segments = []
+    lo = 0
+    for w_start, w_end, text in words:
+        if not turns:
+            break
+        while lo < len(turns) - 1 and turns[lo][2] <= w_start:
+            lo += 1
+
+        best, best_overlap = None, 0.0
+        j = lo
+        while j < len(turns) and turns[j][1] < w_end:
+            overlap = min(w_end, turns[j][2]) - max(w_start, turns[j][1])
+            if overlap > best_overlap:
+                best, best_overlap = turns[j], overlap
+            j += 1
+        if best is None:
+            # No overlap: pick the closest turn on either side of the word
+            candidates = turns[max(lo - 1, 0):lo + 2]
+            best = min(
+                candidates,
+                key=lambda turn: max(turn[1] - w_end, w_start - turn[2], 0.0),
+            )
 
-    # 3a) Iterate over each speaker segment
-    for segment, _, speaker_label in diarization.itertracks(yield_label=True):
-        st, et = segment.start, segment.end  # floats in seconds
-        start_ms = int(st * 1000)
-        end_ms   = int(et * 1000)
-
-        # 3b) Slice that portion out of the full audio
-        slice_audio = full_audio[start_ms:end_ms]
-
-        # 3c) Export slice to its own temp WAV
-        tmp_slice_handle = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-        try:
-            slice_audio.export(tmp_slice_handle.name, format="wav")
-        except Exception as e:
-            tmp_slice_handle.close()
-            os.remove(tmp_slice_handle.name)
-            continue  # skip this segment on failure
-        finally:
-            tmp_slice_handle.close()
-
-        slice_path = tmp_slice_handle.name
-
-        # 3d) Run Whisper (chunked) on that slice
-        try:
-            result = asr(slice_path)
-            text = result.get("text", "").strip()
-        except Exception:
-            text = ""
-
-        # 3e) Record if non-empty
-        if text:
+        speaker = best[0]
+        if segments and segments[-1]["speaker"] == speaker:
+            segments[-1]["end"] = w_end
+            segments[-1]["text"] += text
+        else:
             segments.append({
+                "speaker": speaker,
+                "start": w_start,
+                "end": w_end,
+                "text": text
+            })
+
+    for segment in segments:
+        segment["text"] = segment["text"].strip()
+    return [segment for segment in segments if segment["text"]]
+
+
+def _word_timestamps(result: dict, duration: float, offset: float = 0.0) -> list[tuple]:
+    """
+    Turn a Whisper ``return_timestamps="word"`` result into (start, end, text)
+    tuples, shifted by ``offset`` seconds. Missing end times (the last word of
+    a chunk) are clamped to ``duration``.
+    """
+    words = []
+    for chunk in result.get("chunks", []):
+        w_start, w_end = chunk["timestamp"]
+        if w_start is None:
+            continue
+        if w_end is None:
+            w_end = duration
+        words.append((offset + w_start, offset + w_end, chunk["text"]))
+    return words
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PIPELINE STAGES
+# ─────────────────────────────────────────────────────────────────────────────
+
+def decode_audio(mp3_path: str) -> np.ndarray:
+    """
+    Decode the recording once to a 16 kHz mono float32 waveform, memory-mapped
+    rather than held in memory (see ``transcription.waveform``). Slices of it
+    are views, so neither diarization nor Whisper copies the recording.
+    """
+    try:
+        with metrics.stage("transcription", "decode"):
+            return decode_file(mp3_path)
+    except AudioDecodeError as e:
+        raise RuntimeError(f"[Transcription] Failed decoding {mp3_path}: {e}")
+
+
+def decode_audio_stream(chunks, block_seconds: float = 1.0) -> np.ndarray:
+    """
+    Decode encoded audio that arrives as an iterable of byte ``chunks`` (e.g.
+    an HTTP download's ``iter_content``) to a memory-mapped 16 kHz mono
+    float32 waveform, like ``decode_audio``.
+
+    The chunks are piped through ffmpeg as they arrive, so decoding overlaps
+    the transfer, and the samples are written out in blocks of
+    ``block_seconds``. The encoded file is never written to disk. Raises
+    ``sentiment.audio.AudioDecodeError`` if ffmpeg can't decode the stream
+    (e.g. an MP4 whose index is at the end of the file, which needs a
+    seekable input).
+    """
+    with metrics.stage("transcription", "decode_stream"):
+        return decode_stream(chunks, block_seconds)
+
+
+def _run_diarizer(diarizer, waveform: np.ndarray, **kwargs):
+    import torch
+
+    return diarizer({
+        "waveform": torch.from_numpy(waveform).unsqueeze(0),
+        "sample_rate": SAMPLE_RATE,
+    }, **kwargs)
+
+
+def diarize(waveform: np.ndarray) -> list[tuple]:
+    """
+    Run Pyannote diarization on the full 16 kHz float32 ``waveform`` (handed
+    to Pyannote in memory, sharing its buffer) and return
+    (speaker, start, end) turns. Recordings longer than
+    DIARIZATION_CHUNKED_MIN_SECONDS go through ``diarize_chunked``.
+    """
+    duration = len(waveform) / SAMPLE_RATE
+    if DIARIZATION_CHUNKED_MIN_SECONDS and duration >= DIARIZATION_CHUNKED_MIN_SECONDS:
+        return diarize_chunked(waveform)
+
+    diarizer = model_registry.get("diarization")
+    with metrics.stage("transcription", "diarization"):
+        diarization = _run_diarizer(diarizer, waveform)
+
+    return [
+        (speaker_label, segment.start, segment.end)  # floats in seconds
+        for segment, _, speaker_label in diarization.itertracks(yield_label=True)
+    ]
+
+
+def diarization_windows(duration: float, window: float, overlap: float) -> list[tuple]:
+    """
+    Split ``duration`` seconds into (start, end, keep_start, keep_end) windows
+    of ``window`` seconds overlapping by ``overlap``. Each window's turns are
+    kept between ``keep_start`` and ``keep_end``, which meet in the middle of
+    each overlap, so every instant is kept from exactly one window.
+    """
+    if overlap >= window:
+        raise ValueError("The diarization window must be longer than its overlap.")
+    if duration <= window:
+        return [(0.0, duration, 0.0, duration)]
+    step = window - overlap
+    windows = []
+    start = 0.0
+    while True:
+        end = min(start + window, duration)
+        keep_start = windows[-1][3] if windows else 0.0
+        keep_end = duration if end >= duration else end - overlap / 2
+        windows.append((start, end, keep_start, keep_end))
+        if end >= duration:
+            return windows
+        start += step
+
+
+def link_speakers(embeddings: np.ndarray, threshold: float = DIARIZATION_LINK_THRESHOLD,
+                  groups=None) -> np.ndarray:
+    """
+    Cluster per-window speaker ``embeddings`` (one row per window speaker)
+    and return a global speaker index for each row. Rows closer than
+    ``threshold`` in average cosine distance share an index, except rows of
+    the same group (``groups[i]``, e.g. the window index): Pyannote already
+    told those speakers apart, so they are never merged. Rows without a
+    usable embedding (NaN, which Pyannote returns for speakers with very
+    little speech) join the nearest cluster their group doesn't use yet.
+    """
+    from scipy.cluster.hierarchy import fcluster, linkage
+    from scipy.spatial.distance import pdist, squareform
+
+    groups = np.arange(len(embeddings)) if groups is None else np.asarray(groups)
+    valid = np.flatnonzero(~np.isnan(embeddings).any(axis=1))
+    labels = np.full(len(embeddings), -1)
+    if len(valid) == 1:
+        labels[valid] = 0
+    elif len(valid) > 1:
+        distances = squareform(pdist(embeddings[valid], metric="cosine"))
+        # Cannot-link: big enough that any average including such a pair is
+        # above the threshold (linkage needs finite distances)
+        same_group = groups[valid][:, None] == groups[valid][None, :]
+        distances[same_group] = (threshold + 2) * len(valid) ** 2 + 1
+        np.fill_diagonal(distances, 0)
+        tree = linkage(squareform(distances, checks=False), method="average")
+        labels[valid] = fcluster(tree, t=threshold, criterion="distance") - 1
+
+    clusters = labels.max() + 1
+    centroids = [embeddings[labels == k].mean(axis=0) for k in range(clusters)]
+    centroids = [centroid / np.linalg.norm(centroid) for centroid in centroids]
+    for row in np.flatnonzero(labels == -1):
+        taken = set(labels[(groups == groups[row]) & (labels >= 0)])
+        vector = np.nan_to_num(embeddings[row])
+        free = [k for k in range(len(centroids)) if k not in taken]
+        if free and vector.any():
+            labels[row] = max(free, key=lambda k: float(centroids[k] @ vector))
+        elif free:
+            labels[row] = free[0]
+        else:
+            # Every cluster is taken by another speaker of this group
+            labels[row] = len(centroids)
+            centroids.append(np.zeros(embeddings.shape[1]))
+    return labels
+
+
+def stitch_windows(windows: list[tuple], threshold: float = DIARIZATION_LINK_THRESHOLD) -> list[tuple]:
+    """
+    Combine per-window diarization into (speaker, start, end) turns over the
+    whole recording. ``windows`` holds (keep_start, keep_end, turns,
+    embeddings) per window, with ``turns`` in recording time and labelled with
+    the window's own speaker labels, and ``embeddings`` mapping those labels
+    to embedding vectors. Speakers are renamed SPEAKER_00, SPEAKER_01... in
+    order of first appearance, and turns cut at a window boundary are joined.
+    """
+    keys = [(i, label) for i, window in enumerate(windows) for label in window[3]]
+    if not keys:
+        return []
+    clusters = link_speakers(
+        np.stack([windows[i][3][label] for i, label in keys]),
+        threshold,
+        groups=[i for i, _ in keys],
+    )
+    cluster_of = dict(zip(keys, clusters))
+
+    turns = []
+    for i, (keep_start, keep_end, window_turns, _) in enumerate(windows):
+        for label, start, end in window_turns:
+            start, end = max(start, keep_start), min(end, keep_end)
+            if end > start:
+                turns.append((cluster_of[(i, label)], start, end))
+    turns.sort(key=lambda turn: turn[1])
+
+    names = {}
+    stitched = []
+    for cluster, start, end in turns:
+        speaker = names.setdefault(cluster, f"SPEAKER_{len(names):02d}")
+        previous = stitched[-1] if stitched else None
+        if previous and previous[0] == speaker and start - previous[2] < 1e-3:
+            stitched[-1] = (speaker, previous[1], max(previous[2], end))
+        else:
+            stitched.append((speaker, start, end))
+    return stitched
+
+
+def diarize_chunked(waveform: np.ndarray,
+                    window: float = DIARIZATION_WINDOW_SECONDS,
+                    overlap: float = DIARIZATION_WINDOW_OVERLAP_SECONDS) -> list[tuple]:
+    """
+    Long-recording diarization: run Pyannote on overlapping windows of the
+    waveform (views, so only one window's worth of model state is alive at a
+    time) and link the windows' speakers with ``stitch_windows``. Needs
+    pyannote.audio 3.1+, which returns the speaker embeddings.
+    """
+    diarizer = model_registry.get("diarization")
+    windows = []
+    for start, end, keep_start, keep_end in diarization_windows(len(waveform) / SAMPLE_RATE, window, overlap):
+        # The README's "diarization" stage, once per window
+        with metrics.stage("transcription", "diarization"):
+            diarization, embeddings = _run_diarizer(
+                diarizer,
+                waveform[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)],
+                return_embeddings=True,
+            )
+        windows.append((
+            keep_start,
+            keep_end,
+            [
+                (label, start + segment.start, start + segment.end)
+                for segment, _, label in diarization.itertracks(yield_label=True)
+            ],
+            dict(zip(diarization.labels(), embeddings)),
+        ))
+    with metrics.stage("transcription", "speaker_linking"):
+        return stitch_windows(windows)
+
+
+def decode_and_diarize(mp3_path: str) -> tuple[np.ndarray, list[tuple]]:
+    """Decode the MP3, then diarize it. Returns the waveform and speaker turns."""
+    waveform = decode_audio(mp3_path)
+    return waveform, diarize(waveform)
+
+
+def iter_turn_segments(waveform: np.ndarray, turns: list[tuple], batch_size: int,
+                       on_batch=None):
+    """
+    "segments" mode: slice each speaker turn out of the waveform as a NumPy
+    view (no intermediate files) and run Whisper over the slices in batches.
+    Yields each batch's segments (a list, possibly empty) as soon as the
+    batch is transcribed; ``on_batch(done, total)`` is called before.
+    """
+    kept = []
+    slices = []
+    with metrics.stage("transcription", "slicing"):
+        for speaker_label, st, et in turns:
+            audio_slice = waveform[int(st * SAMPLE_RATE):int(et * SAMPLE_RATE)]
+            if len(audio_slice) == 0:
+                continue
+            kept.append((speaker_label, st, et))
+            slices.append(audio_slice)
+
+    asr = model_registry.get("asr")
+    for start in range(0, len(slices), batch_size):
+        # Observed per batch; the histogram's sum is the total ASR time
+        with metrics.stage("transcription", "asr"):
+            texts = _transcribe_batch(asr, slices[start:start + batch_size], batch_size)
+        if on_batch is not None:
+            on_batch(start + len(texts), len(slices))
+        yield [
+            {
                 "speaker": speaker_label,
                 "start": st,
                 "end": et,
                 "text": text
-            })
+            }
+            for (speaker_label, st, et), text in zip(kept[start:start + batch_size], texts)
+            if text
+        ]
 
-        # 3f) Clean up the slice WAV
-        try:
-            os.remove(slice_path)
-        except Exception:
-            pass
 
-    # ─────────────────────────────────────────────────────────────────────────
-    # 4) CLEAN UP MAIN WAV FILE
-    # ─────────────────────────────────────────────────────────────────────────
-    try:
-        os.remove(wav_path)
-    except Exception:
-        pass
+def transcribe_turns(waveform: np.ndarray, turns: list[tuple], batch_size: int,
+                     on_batch=None) -> list[dict]:
+    """"segments" mode over the whole recording; see ``iter_turn_segments``."""
+    return [
+        segment
+        for batch in iter_turn_segments(waveform, turns, batch_size, on_batch)
+        for segment in batch
+    ]
 
+
+def recognize_words(waveform: np.ndarray, batch_size: int) -> list[tuple]:
+    """Run Whisper once over the whole waveform and return (start, end, text) words."""
+    asr = model_registry.get("asr")
+    with metrics.stage("transcription", "asr"):
+        result = asr(
+            {"raw": waveform, "sampling_rate": SAMPLE_RATE},
+            return_timestamps="word",
+            batch_size=batch_size,
+        )
+    return _word_timestamps(result, duration=len(waveform) / SAMPLE_RATE)
+
+
+def transcribe_words(waveform: np.ndarray, turns: list[tuple], batch_size: int) -> list[dict]:
+    """
+    "words" mode: run Whisper once over the whole waveform with word-level
+    timestamps, then assign the words to speaker turns.
+    """
+    words = recognize_words(waveform, batch_size)
+    with metrics.stage("transcription", "alignment"):
+        return assign_words_to_speakers(words, turns)
+
+
+def transcribe_pipelined(mp3_path: str, batch_size: int, progress=None,
+                         waveform: np.ndarray = None) -> list[dict]:
+    """
+    "pipelined" mode: diarization runs on a background thread while Whisper
+    transcribes the same audio on this one. Both spend their time in torch
+    ops that release the GIL, so the two stages overlap on the CPU (or GPU).
+    Speaker labels are attached to the words once diarization finishes.
+    """
+    _report(progress, "decoding", 0.0)
+    waveform = _prepare(mp3_path, waveform)
+    _report(progress, "diarizing+transcribing", 0.05)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="diarization") as pool:
+        turns_future = pool.submit(diarize, waveform)
+        words = recognize_words(waveform, batch_size)
+        _report(progress, "diarizing", 0.9)
+        turns = turns_future.result()
+    _report(progress, "aligning", 0.95)
+    with metrics.stage("transcription", "alignment"):
+        segments = assign_words_to_speakers(words, turns)
+    _report(progress, "done", 1.0)
     return segments
+
+
+def _prepare(mp3_path: str, waveform: np.ndarray) -> np.ndarray:
+    """The already decoded ``waveform`` if given, else the decoded MP3."""
+    if waveform is not None:
+        return waveform
+    return decode_audio(mp3_path)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MAIN FUNCTION: TRANSCRIBE WITH SPEAKER LABELS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def iter_speaker_segments(
+    mp3_path: str = None,
+    batch_size: int = ASR_BATCH_SIZE,
+    mode: str = TRANSCRIPTION_MODE,
+    progress=None,
+    waveform: np.ndarray = None,
+):
+    """
+    Generator form of ``transcribe_with_speaker_labels``: yields lists of
+    segments as they finish, so callers can show the first lines of a long
+    meeting before the rest is transcribed. In "segments" mode a list is
+    yielded after every Whisper batch; "words" and "pipelined" recognise the
+    whole recording in one pass, so they yield once at the end.
+    """
+    if mode not in TRANSCRIPTION_MODES:
+        raise ValueError(
+            f"[Transcription] Unknown mode '{mode}'. Choose one of: {', '.join(TRANSCRIPTION_MODES)}"
+        )
+
+    if mode == "pipelined":
+        yield transcribe_pipelined(mp3_path, batch_size, progress, waveform)
+        return
+
+    _report(progress, "decoding", 0.0)
+    waveform = _prepare(mp3_path, waveform)
+    _report(progress, "diarizing", 0.05)
+    turns = diarize(waveform)
+    _report(progress, "transcribing", 0.4)
+    if mode == "words":
+        yield transcribe_words(waveform, turns, batch_size)
+    else:
+        yield from iter_turn_segments(
+            waveform,
+            turns,
+            batch_size,
+            on_batch=lambda done, total: _report(
+                progress, "transcribing", 0.4 + 0.6 * done / max(total, 1)
+            ),
+        )
+    _report(progress, "done", 1.0)
+
+
+def transcribe_with_speaker_labels(
+    mp3_path: str = None,
+    batch_size: int = ASR_BATCH_SIZE,
+    mode: str = TRANSCRIPTION_MODE,
+    progress=None,
+    waveform: np.ndarray = None,
+) -> list[dict]:
+    """
+    1) Decode the MP3 once to a memory-mapped waveform (or take an already
+       decoded 16 kHz mono float32 ``waveform``, see ``decode_audio_stream``)
+       and run Pyannote diarization on it to get speaker turns.
+    2) Transcribe with Whisper, either per speaker turn ("segments" mode) or
+       in a single pass with word timestamps aligned to the turns ("words"
+       mode, or "pipelined" to run it concurrently with diarization); see
+       TRANSCRIPTION_MODES.
+    3) Return a list of { "speaker", "start", "end", "text" } segments,
+       skipping segments whose text is empty.
+
+    If given, ``progress(stage, fraction)`` is called as the work advances,
+    with ``fraction`` going from 0.0 to 1.0. ``iter_speaker_segments``
+    yields the segments as they finish instead.
+    """
+    return [
+        segment
+        for batch in iter_speaker_segments(mp3_path, batch_size, mode, progress, waveform)
+        for segment in batch
+    ]
@@ -0,0 +1,69 @@
+# transcription/waveform.py
+"""
+Decoded recordings kept in a memory-mapped file instead of process memory.
+
+ffmpeg decodes a recording once, straight to 16 kHz mono float32 (the format
+Pyannote and Whisper both take), and the samples are written block by block
+to an anonymous temporary file that is then mapped as a NumPy array. Speaker
+turns are sliced out of it as views, and the models read the pages they
+need from the page cache, which the kernel can drop and re-read under
+memory pressure. Resident memory therefore stays flat however long the
+meeting is, where a pydub decode held the whole recording (several times
+over, as bytes, int16 and float32 copies).
+
+The file has no name on disk and disappears once the array and every view
+of it are garbage collected.
+"""
+import tempfile
+
+import numpy as np
+from decouple import config
+
+from sentiment.audio import SAMPLE_RATE, file_frames, pcm_frames
+
+DTYPE = np.float32
+CODEC = "f32le"
+
+# Where the temporary sample files go; defaults to the system temp dir.
+# A 2-hour meeting takes about 460 MB.
+WAVEFORM_DIR = config("TRANSCRIPTION_WAVEFORM_DIR", default="") or None
+
+
+def map_pcm(blocks) -> np.ndarray:
+    """
+    Write raw float32 PCM ``blocks`` (bytes) to a temporary file and return
+    it mapped as a 1-D array. Writes to the array stay in this process
+    (copy-on-write) and never reach the file.
+    """
+    with tempfile.TemporaryFile(dir=WAVEFORM_DIR) as f:
+        written = 0
+        for block in blocks:
+            f.write(block)
+            written += len(block)
+        samples = written // DTYPE().itemsize
+        if not samples:
+            return np.zeros(0, dtype=DTYPE)
+        f.flush()
+        # The mapping keeps its own handle on the file, so it outlives ``f``
+        return np.memmap(f, dtype=DTYPE, mode="c", shape=(samples,))
+
+
+def decode_file(path: str, block_seconds: float = 1.0) -> np.ndarray:
+    """
+    Decode the audio file at ``path`` to a memory-mapped 16 kHz waveform.
+    Raises ``sentiment.audio.AudioDecodeError`` if ffmpeg can't decode it.
+    """
+    return map_pcm(file_frames(path, _block_bytes(block_seconds), codec=CODEC))
+
+
+def decode_stream(chunks, block_seconds: float = 1.0) -> np.ndarray:
+    """
+    Decode encoded audio arriving as an iterable of byte ``chunks`` to a
+    memory-mapped 16 kHz waveform, while the chunks are still arriving.
+    Raises ``sentiment.audio.AudioDecodeError`` if ffmpeg can't decode it.
+    """
+    return map_pcm(pcm_frames(chunks, _block_bytes(block_seconds), codec=CODEC))
+
+
+def _block_bytes(block_seconds: float) -> int:
+    return int(SAMPLE_RATE * block_seconds) * DTYPE().itemsize